@@ -4,22 +4,28 @@ Streamlit App for Twitter Sentiment Analysis
 """
 import streamlit as st
 import pandas as pd
+import numpy as np
 from datetime import datetime
 import os
 import time
-from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import uuid
 
 # Import components
 from src.data_fetcher import TwitterDataFetcher
-from src.text_cleaner import TextCleaner
-from src.sentiment_analyzer import SentimentAnalyzer
+from src.sentiment_analyzer import get_sentiment_analyzer, warm_up_engines
 from src.visualizer import SentimentVisualizer
-from utils.error_handler import validate_input, handle_api_error
+from src.scoring_service import ScoringClient
+from src.result_store import get_result_store
+from src.pipeline import get_pipeline_cache
+from src.exporter import EXPORT_FORMATS, export_frame
+from src.jobs import get_job_manager, JOB_QUEUED, JOB_RUNNING, JOB_FAILED, JOB_CANCELLED
+from utils.error_handler import validate_input, handle_api_error, AnalysisError
 from utils.logger import app_logger
 from config.settings import (
     PAGE_TITLE, PAGE_ICON, LAYOUT,
     MIN_TWEETS, MAX_TWEETS, DEFAULT_TWEETS,
-    LANGUAGE_MAP
+    LANGUAGE_MAP, WARM_UP_ON_START, COMPACT_RESULTS, SENTIMENT_LABELS, JOB_POLL_INTERVAL, JOB_STOP_GRACE,
+    COMPARE_MAX_QUERIES
 )
 from config.translations import get_text, get_direction
 
@@ -31,6 +37,10 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Preload sentiment lexicons once per process, shared by all sessions
+if WARM_UP_ON_START:
+    warm_up_engines(background=True)
+
 
 def init_session_state():
     """Initialize session state"""
@@ -38,12 +48,24 @@ def init_session_state():
         st.session_state.app_lang = 'en'  # Default to English
     if 'analysis_done' not in st.session_state:
         st.session_state.analysis_done = False
-    if 'results_df' not in st.session_state:
-        st.session_state.results_df = None
+    if 'store_key' not in st.session_state:
+        # Result frames live in the shared, memory-capped result store under this key;
+        # it also identifies this session among the subscribers of a shared job
+        st.session_state.store_key = uuid.uuid4().hex
     if 'stats' not in st.session_state:
         st.session_state.stats = None
-    if 'word_freq_df' not in st.session_state:
-        st.session_state.word_freq_df = None
+    if 'result_id' not in st.session_state:
+        st.session_state.result_id = 0
+    if 'result_query' not in st.session_state:
+        st.session_state.result_query = ''
+    if 'tab_cache' not in st.session_state:
+        st.session_state.tab_cache = {}
+    if 'job_id' not in st.session_state:
+        st.session_state.job_id = None
+    if 'comparison_job_ids' not in st.session_state:
+        st.session_state.comparison_job_ids = None
+    if 'comparison' not in st.session_state:
+        st.session_state.comparison = None
 
 
 def apply_custom_css(lang='en'):
@@ -102,21 +124,25 @@ def check_api_connection():
         return False, f"❌ API Error: {str(e)}"
 
 
-def fetch_with_timeout(fetcher, search_type, query, count, lang_code, timeout=60):
-    """Fetch tweets with timeout"""
-    with ThreadPoolExecutor(max_workers=1) as executor:
-        if search_type == "hashtag":
-            future = executor.submit(fetcher.fetch_by_hashtag, query, count, lang_code)
-        else:
-            future = executor.submit(fetcher.fetch_by_keyword, query, count, lang_code)
-
+def score_tweets(analyzer, tweets_df, method):
+    """Score tweets via the local scoring service when configured, else in-process"""
+    scoring_url = os.getenv('SCORING_SERVICE_URL')
+    if scoring_url:
         try:
-            result = future.result(timeout=timeout)
-            return result, None
-        except FutureTimeoutError:
-            return None, "timeout"
-        except Exception as e:
-            return None, str(e)
+            return ScoringClient(scoring_url).analyze_dataframe(
+                tweets_df, method=method, compact=COMPACT_RESULTS
+            )
+        except AnalysisError as e:
+            app_logger.warning(f"Scoring service unavailable, scoring locally: {str(e)}")
+
+    return analyzer.analyze_dataframe(tweets_df, method=method, compact=COMPACT_RESULTS)
+
+
+def get_jobs():
+    """Process-wide background job manager shared by all sessions"""
+    return get_job_manager(
+        score=lambda df, method: score_tweets(get_sentiment_analyzer(), df, method)
+    )
 
 
 def main():
@@ -171,12 +197,20 @@ def main():
             help=get_text('search_help', lang)
         )
 
-        # Query input
-        query = st.text_input(
-            get_text('search_input', lang),
-            placeholder=get_text('search_placeholder', lang),
-            help=get_text('search_help', lang)
-        )
+        # Query input: one query, or one per line in comparison mode
+        compare_mode = st.checkbox(get_text('compare_mode', lang), key='compare_mode')
+        if compare_mode:
+            query = st.text_area(
+                get_text('compare_queries', lang),
+                placeholder=get_text('search_placeholder', lang),
+                help=get_text('compare_queries_help', lang, max=COMPARE_MAX_QUERIES)
+            )
+        else:
+            query = st.text_input(
+                get_text('search_input', lang),
+                placeholder=get_text('search_placeholder', lang),
+                help=get_text('search_help', lang)
+            )
 
         # Tweet count
         tweet_count = st.slider(
@@ -204,7 +238,8 @@ def main():
         method_options = [
             get_text('method_textblob', lang),
             get_text('method_vader', lang),
-            get_text('method_both', lang)
+            get_text('method_both', lang),
+            get_text('method_cascade', lang)
         ]
         analysis_method = st.selectbox(
             get_text('analysis_method', lang),
@@ -222,6 +257,8 @@ def main():
         )
 
         st.markdown("---")
+        render_memory_usage(lang)
+
         st.markdown(f"""
         <div style='text-align: center; font-size: 11px; color: gray;'>
         {get_text('footer', lang)}
@@ -230,7 +267,30 @@ def main():
 
     # Main area
     if not analyze_button:
-        show_welcome_page(lang)
+        if st.session_state.job_id:
+            # A background analysis is still running (survives reruns and refreshes of this session)
+            follow_job(st.session_state.job_id, lang)
+        elif st.session_state.comparison_job_ids:
+            follow_comparison(st.session_state.comparison_job_ids, lang)
+        elif st.session_state.comparison is not None:
+            display_comparison(st.session_state.comparison, lang)
+        elif st.session_state.analysis_done:
+            # Widget interactions rerun the script; keep showing the last results
+            frames = get_result_store().get(st.session_state.store_key)
+            if frames is None:
+                # Expired from the result store after a long idle period
+                st.session_state.analysis_done = False
+                show_welcome_page(lang)
+            else:
+                display_results(
+                    frames['results_df'],
+                    st.session_state.stats,
+                    frames['word_freq_df'],
+                    st.session_state.result_query,
+                    lang
+                )
+        else:
+            show_welcome_page(lang)
     else:
         # Convert search type
         search_type_en = 'hashtag' if search_type == search_type_options[1] else 'keyword'
@@ -243,9 +303,32 @@ def main():
         }
         selected_lang = lang_map[language]
 
+        if compare_mode:
+            query = [line.strip() for line in query.splitlines() if line.strip()]
+
         perform_analysis(query, tweet_count, search_type_en, selected_lang, analysis_method, lang)
 
 
+def render_memory_usage(lang='en'):
+    """Server memory: process RSS, session result store and pipeline cache"""
+    store = get_result_store().get_stats()
+    cache = get_pipeline_cache().get_stats()
+    mb = 1024 * 1024
+
+    with st.expander(get_text('memory_usage', lang)):
+        if store['rss_bytes'] is not None:
+            st.caption(get_text('memory_rss', lang, size=store['rss_bytes'] / mb))
+        st.caption(get_text(
+            'memory_results', lang,
+            size=store['memory_bytes'] / mb, limit=store['max_bytes'] / mb,
+            in_memory=store['in_memory'], on_disk=store['on_disk'], disk=store['disk_bytes'] / mb
+        ))
+        st.caption(get_text(
+            'memory_cache', lang,
+            size=cache['bytes'] / mb, limit=cache['max_bytes'] / mb, entries=cache['entries']
+        ))
+
+
 def show_welcome_page(lang='en'):
     """Display welcome page"""
     st.info(f"""
@@ -276,7 +359,7 @@ def show_welcome_page(lang='en'):
     with col2:
         st.metric(
             get_text('metrics_methods', lang),
-            "3",
+            "4",
             delta=get_text('metrics_methods_delta', lang)
         )
     with col3:
@@ -289,106 +372,293 @@ def show_welcome_page(lang='en'):
 
 def perform_analysis(query, tweet_count, search_type, language, analysis_method, lang='en'):
     """
-    Perform complete analysis with timeout and progress indicators
+    Submit the analysis as a background job and follow its progress
+
+    A list of queries starts comparison mode: one job per query, all running
+    at once in the shared worker pool and drawing on the shared rate budget.
     """
+    queries = list(dict.fromkeys(query)) if isinstance(query, (list, tuple)) else [query]
+
+    if isinstance(query, (list, tuple)):
+        if len(queries) < 2:
+            st.error(get_text('compare_need_two', lang))
+            return
+        if len(queries) > COMPARE_MAX_QUERIES:
+            st.error(get_text('compare_too_many', lang, max=COMPARE_MAX_QUERIES))
+            return
+
     # Validate input
-    valid, message = validate_input(query, tweet_count)
-    if not valid:
-        st.error(message)
-        return
+    for item in queries:
+        valid, message = validate_input(item, tweet_count)
+        if not valid:
+            st.error(message)
+            return
 
-    try:
-        # Progress container
-        progress_container = st.container()
-        status_text = st.empty()
-        progress_bar = st.progress(0)
+    # Determine method
+    if get_text('method_textblob', lang) in analysis_method:
+        method = 'textblob'
+    elif get_text('method_vader', lang) in analysis_method:
+        method = 'vader'
+    elif get_text('method_cascade', lang) in analysis_method:
+        method = 'cascade'
+    else:
+        method = 'both'
 
-        # 1. Fetch tweets with timeout
-        status_text.text(get_text('fetching_tweets', lang))
-        progress_bar.progress(10)
+    # Fetch deadline based on tweet count; pages received before it are still analyzed
+    timeout = min(120, 30 + (tweet_count // 10))  # 30s base + 1s per 10 tweets, max 120s
 
-        start_time = time.time()
-        fetcher = TwitterDataFetcher()
+    # The job runs in the shared worker pool; identical running requests share one job
+    lang_code = LANGUAGE_MAP.get(language, 'all')
+    job_ids = [
+        get_jobs().submit(
+            item, tweet_count, search_type, lang_code, method,
+            timeout=timeout, subscriber=st.session_state.store_key
+        )
+        for item in queries
+    ]
 
-        # Determine timeout based on tweet count
-        timeout = min(120, 30 + (tweet_count // 10))  # 30s base + 1s per 10 tweets, max 120s
+    if len(job_ids) > 1:
+        st.session_state.job_id = None
+        st.session_state.comparison_job_ids = job_ids
+        follow_comparison(job_ids, lang)
+    else:
+        st.session_state.comparison_job_ids = None
+        st.session_state.job_id = job_ids[0]
+        follow_job(st.session_state.job_id, lang)
 
-        lang_code = LANGUAGE_MAP.get(language, 'all')
-        tweets_df, error = fetch_with_timeout(fetcher, search_type, query, tweet_count, lang_code, timeout)
 
-        elapsed = time.time() - start_time
+def job_overdue(status):
+    """A job still running well past its deadline or cancellation (e.g. a hung API call)"""
+    return status['stop_by'] is not None and time.time() > status['stop_by'] + JOB_STOP_GRACE
 
-        if error == "timeout":
-            st.error(get_text('error_timeout', lang))
-            st.warning(f"⏱️ Timeout after {elapsed:.1f}s. Try with fewer tweets or check your internet connection.")
-            progress_bar.empty()
-            status_text.empty()
-            return
-        elif error:
-            st.error(get_text('error_occurred', lang, error=error))
-            progress_bar.empty()
-            status_text.empty()
-            return
 
-        if tweets_df is None or tweets_df.empty:
-            st.warning(get_text('no_tweets_found', lang))
-            progress_bar.empty()
-            status_text.empty()
-            return
+def follow_job(job_id, lang='en'):
+    """
+    Poll a background job, showing live progress until it finishes
+    """
+    jobs = get_jobs()
 
-        st.success(get_text('tweets_fetched', lang, count=len(tweets_df)))
-        progress_bar.progress(30)
+    if st.button(get_text('cancel_analysis', lang), key='cancel_job'):
+        # Leaves the job; it only stops if no other session is following it
+        jobs.cancel(job_id, subscriber=st.session_state.store_key)
+        st.session_state.job_id = None
+        st.info(get_text('analysis_cancelled', lang))
+        return
 
-        # 2. Clean text
-        status_text.text(get_text('cleaning_text', lang))
-        cleaner = TextCleaner()
-        tweets_df = cleaner.clean_dataframe(tweets_df)
-        progress_bar.progress(50)
+    status_text = st.empty()
+    progress_bar = st.progress(0)
+
+    # Live preview updated after each fetched page has been cleaned and scored
+    preview = st.empty()
+    page = 0
+    last_fetched = -1
+
+    status = jobs.get_status(job_id)
+    while status is not None and status['status'] in (JOB_QUEUED, JOB_RUNNING):
+        if job_overdue(status):
+            break
+
+        if status['fetched'] != last_fetched and status['aggregate'] is not None:
+            page += 1
+            last_fetched = status['fetched']
+            progress_bar.progress(status['progress'])
+            status_text.text(get_text('tweets_fetched', lang, count=status['fetched']))
+            with preview.container():
+                render_live_preview(status['aggregate'], page, lang)
+        elif last_fetched < 0:
+            status_text.text(get_text('fetching_tweets', lang))
+
+        time.sleep(JOB_POLL_INTERVAL)
+        status = jobs.get_status(job_id)
+
+    st.session_state.job_id = None
+    preview.empty()
+    progress_bar.empty()
+    status_text.empty()
+
+    if status is not None and status['status'] in (JOB_QUEUED, JOB_RUNNING):
+        # Stop waiting on a job that ignores its deadline; it is cancelled and its result discarded
+        jobs.cancel(job_id, subscriber=st.session_state.store_key)
+        app_logger.error(f"Job {job_id} did not stop {JOB_STOP_GRACE}s after its deadline")
+        st.error(get_text('job_stalled', lang))
+        return
+
+    if status is None or status['status'] == JOB_CANCELLED:
+        st.info(get_text('analysis_cancelled', lang))
+        return
+
+    if status['status'] == JOB_FAILED:
+        app_logger.error(f"Analysis error: {status['error']}")
+        st.error(get_text('error_occurred', lang, error=status['error']))
+        return
 
-        # 3. Analyze sentiments
-        status_text.text(get_text('analyzing_sentiment', lang))
-        analyzer = SentimentAnalyzer()
+    result = jobs.get_result(job_id)
+    tweets_df = result['results_df']
+    stats = result['stats']
+    word_freq_df = result['word_freq_df']
 
-        # Determine method
-        if get_text('method_textblob', lang) in analysis_method:
-            method = 'textblob'
-        elif get_text('method_vader', lang) in analysis_method:
-            method = 'vader'
+    if tweets_df.empty:
+        if status['partial']:
+            # The deadline passed before the first page arrived
+            st.error(get_text('error_timeout', lang))
         else:
-            method = 'both'
+            st.warning(get_text('no_tweets_found', lang))
+        return
 
-        tweets_df = analyzer.analyze_dataframe(tweets_df, method=method)
-        stats = analyzer.get_sentiment_statistics(tweets_df)
-        word_freq_df = cleaner.get_word_frequency(tweets_df, top_n=20)
+    if status['partial']:
+        st.warning(get_text(
+            'partial_results', lang,
+            count=len(tweets_df), requested=status['params']['count']
+        ))
 
-        progress_bar.progress(90)
+    st.success(get_text('tweets_fetched', lang, count=len(tweets_df)))
 
-        # Save results
-        st.session_state.results_df = tweets_df
-        st.session_state.stats = stats
-        st.session_state.word_freq_df = word_freq_df
-        st.session_state.analysis_done = True
+    # Save results: frames go to the shared store, which spills idle sessions to disk
+    get_result_store().put(st.session_state.store_key, results_df=tweets_df, word_freq_df=word_freq_df)
+    st.session_state.stats = stats
+    st.session_state.result_query = status['params']['query']
+    st.session_state.analysis_done = True
+    st.session_state.comparison = None
 
-        progress_bar.progress(100)
-        time.sleep(0.5)
-        progress_bar.empty()
-        status_text.empty()
+    # New result set: drop tab content computed for the previous one
+    st.session_state.result_id += 1
+    st.session_state.tab_cache = {}
 
-        # 4. Display results
-        display_results(tweets_df, stats, word_freq_df, query, lang)
+    # Display results
+    display_results(tweets_df, stats, word_freq_df, st.session_state.result_query, lang)
 
-    except Exception as e:
-        app_logger.error(f"Analysis error: {str(e)}")
-        st.error(get_text('error_occurred', lang, error=str(e)))
 
+def follow_comparison(job_ids, lang='en'):
+    """
+    Poll the jobs of a comparison together, one progress bar per query
+    """
+    jobs = get_jobs()
 
-def display_results(df, stats, word_freq_df, query, lang='en'):
-    """Display analysis results"""
+    if st.button(get_text('cancel_analysis', lang), key='cancel_comparison'):
+        for job_id in job_ids:
+            jobs.cancel(job_id, subscriber=st.session_state.store_key)
+        st.session_state.comparison_job_ids = None
+        st.info(get_text('analysis_cancelled', lang))
+        return
+
+    rows = []
+    for job_id in job_ids:
+        status = jobs.get_status(job_id)
+        label = status['params']['query'] if status else job_id
+        rows.append((job_id, label, st.empty(), st.progress(0)))
+
+    statuses = {}
+    while True:
+        statuses = {job_id: jobs.get_status(job_id) for job_id in job_ids}
+        for job_id, label, text, bar in rows:
+            status = statuses[job_id]
+            if status is None:
+                continue
+            bar.progress(status['progress'])
+            text.text(f"{label}: {get_text('tweets_fetched', lang, count=status['fetched'])}")
+
+        running = [
+            status for status in statuses.values()
+            if status is not None and status['status'] in (JOB_QUEUED, JOB_RUNNING) and not job_overdue(status)
+        ]
+        if not running:
+            break
+        time.sleep(JOB_POLL_INTERVAL)
+
+    st.session_state.comparison_job_ids = None
+    for _, _, text, bar in rows:
+        text.empty()
+        bar.empty()
+
+    # Jobs still running here are stuck past their deadline: stop them, they count as missing
+    for job_id, status in statuses.items():
+        if status is not None and status['status'] in (JOB_QUEUED, JOB_RUNNING):
+            jobs.cancel(job_id, subscriber=st.session_state.store_key)
+
+    if all(status is None or status['status'] == JOB_CANCELLED for status in statuses.values()):
+        st.info(get_text('analysis_cancelled', lang))
+        return
+
+    analyzer = get_sentiment_analyzer()
+    comparison = {'stats': {}, 'timelines': {}, 'partial': {}}
+    missing = []
+
+    for job_id in job_ids:
+        status = statuses[job_id]
+        result = None
+        if status is not None and status['status'] not in (JOB_FAILED, JOB_CANCELLED):
+            result = jobs.get_result(job_id)
+
+        if result is None or result['results_df'].empty:
+            if status is not None and status['status'] == JOB_FAILED:
+                app_logger.error(f"Comparison error for {status['params']['query']}: {status['error']}")
+            missing.append(status['params']['query'] if status else job_id)
+            continue
 
+        label = status['params']['query']
+        comparison['stats'][label] = result['stats']
+        comparison['timelines'][label] = analyzer.analyze_sentiment_over_time(result['results_df'])
+        if status['partial']:
+            comparison['partial'][label] = status['params']['count']
+
+    if missing:
+        st.warning(get_text('comparison_failed', lang, queries=', '.join(missing)))
+
+    if not comparison['stats']:
+        return
+
+    # Save results; the comparison replaces any single-query result on screen
+    st.session_state.comparison = comparison
+    st.session_state.analysis_done = False
+    get_result_store().drop(st.session_state.store_key)
+    st.session_state.result_id += 1
+    st.session_state.tab_cache = {}
+
+    display_comparison(comparison, lang)
+
+
+def display_comparison(comparison, lang='en'):
+    """Side-by-side statistics, distributions and overlaid timelines for several queries"""
     st.markdown("---")
-    st.subheader(get_text('results', lang))
+    st.subheader(get_text('comparison_results', lang))
+
+    for label, requested in comparison['partial'].items():
+        count = comparison['stats'][label]['total']
+        st.warning(f"{label}: {get_text('partial_results', lang, count=count, requested=requested)}")
+
+    columns = {
+        'total': get_text('total_tweets', lang),
+        'positive_pct': f"{get_text('positive', lang)} %",
+        'negative_pct': f"{get_text('negative', lang)} %",
+        'neutral_pct': f"{get_text('neutral', lang)} %"
+    }
+    table = pd.DataFrame.from_dict(comparison['stats'], orient='index')[list(columns)].rename(columns=columns)
+    table.index.name = get_text('column_query', lang)
+    st.dataframe(table, use_container_width=True)
+
+    fig = tab_memo(
+        ('comparison_dist', lang),
+        lambda: SentimentVisualizer().plot_comparison_distribution(
+            comparison['stats'], get_text('chart_comparison_dist', lang)
+        )
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+    timelines = {label: timeline for label, timeline in comparison['timelines'].items() if not timeline.empty}
+    if timelines:
+        fig = tab_memo(
+            ('comparison_timeline', lang),
+            lambda: SentimentVisualizer().plot_comparison_timeline(
+                timelines, get_text('chart_comparison_timeline', lang)
+            )
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.info(get_text('no_timeline_data', lang))
 
-    # 1. Metrics cards
+
+def render_metrics(stats, lang='en'):
+    """Metrics cards for total and per-sentiment counts"""
     col1, col2, col3, col4 = st.columns(4)
 
     with col1:
@@ -412,114 +682,234 @@ def display_results(df, stats, word_freq_df, query, lang='en'):
             f"{stats['neutral']} ({stats['neutral_pct']}%)"
         )
 
+
+def render_live_preview(aggregate, page, lang='en'):
+    """Running metrics, pie and timeline from the incremental aggregate"""
+    stats = aggregate.to_stats()
+    if not stats:
+        return
+
+    render_metrics(stats, lang)
+
+    visualizer = SentimentVisualizer(use_cache=False)
+    col1, col2 = st.columns(2)
+
+    with col1:
+        counts = {label: stats[key] for label, key in zip(SENTIMENT_LABELS, ('positive', 'negative', 'neutral'))}
+        fig = visualizer.plot_sentiment_pie(counts, get_text('chart_sentiment_dist', lang))
+        st.plotly_chart(fig, use_container_width=True, key=f"live_pie_{page}")
+
+    with col2:
+        timeline = aggregate.to_timeline()
+        if not timeline.empty:
+            fig = visualizer.plot_sentiment_timeline(timeline, get_text('chart_timeline', lang))
+            st.plotly_chart(fig, use_container_width=True, key=f"live_timeline_{page}")
+
+
+def display_results(df, stats, word_freq_df, query, lang='en'):
+    """Display analysis results"""
+
+    st.markdown("---")
+    st.subheader(get_text('results', lang))
+
+    # 1. Metrics cards
+    render_metrics(stats, lang)
+
     st.markdown("---")
 
-    # 2. Tabs for visualizations
-    tab1, tab2, tab3, tab4, tab5 = st.tabs([
-        get_text('tab_distribution', lang),
-        get_text('tab_keywords', lang),
-        get_text('tab_timeline', lang),
-        get_text('tab_tweets', lang),
-        get_text('tab_export', lang)
-    ])
-
-    visualizer = SentimentVisualizer()
-
-    with tab1:
-        st.subheader(get_text('chart_sentiment_dist', lang))
-        sentiment_counts = df['sentiment'].value_counts()
-        fig = visualizer.plot_sentiment_pie(sentiment_counts, get_text('chart_sentiment_dist', lang))
+    # 2. Sections for visualizations: only the selected one is computed on each rerun
+    sections = {
+        'tab_distribution': render_distribution_tab,
+        'tab_keywords': render_keywords_tab,
+        'tab_timeline': render_timeline_tab,
+        'tab_tweets': render_tweets_tab,
+        'tab_export': render_export_tab
+    }
+    active_tab = st.radio(
+        get_text('results', lang),
+        list(sections),
+        format_func=lambda key: get_text(key, lang),
+        horizontal=True,
+        label_visibility="collapsed",
+        key='active_tab'
+    )
+
+    sections[active_tab](df, stats, word_freq_df, query, lang)
+
+
+def tab_memo(name, compute):
+    """Compute a tab item once per result set and reuse it on later reruns"""
+    key = (st.session_state.result_id, name)
+    cache = st.session_state.tab_cache
+    if key not in cache:
+        cache[key] = compute()
+    return cache[key]
+
+
+def render_distribution_tab(df, stats, word_freq_df, query, lang='en'):
+    """Sentiment distribution pie chart"""
+    st.subheader(get_text('chart_sentiment_dist', lang))
+    fig = tab_memo(
+        ('pie', lang),
+        lambda: SentimentVisualizer().plot_sentiment_pie(
+            df['sentiment'].value_counts(), get_text('chart_sentiment_dist', lang)
+        )
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def render_keywords_tab(df, stats, word_freq_df, query, lang='en'):
+    """Most frequent words bar chart"""
+    st.subheader(get_text('chart_word_freq', lang))
+    if not word_freq_df.empty:
+        fig = tab_memo(
+            ('keywords', lang),
+            lambda: SentimentVisualizer().plot_word_frequency_bar(
+                word_freq_df, get_text('chart_word_freq', lang), top_n=15
+            )
+        )
         st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.info(get_text('no_keywords', lang))
 
-    with tab2:
-        st.subheader(get_text('chart_word_freq', lang))
-        if not word_freq_df.empty:
-            fig = visualizer.plot_word_frequency_bar(word_freq_df, get_text('chart_word_freq', lang), top_n=15)
+
+def render_timeline_tab(df, stats, word_freq_df, query, lang='en'):
+    """Sentiment evolution over time"""
+    st.subheader(get_text('chart_timeline', lang))
+    try:
+        time_sentiment = tab_memo(
+            'timeline_data',
+            lambda: get_sentiment_analyzer().analyze_sentiment_over_time(df)
+        )
+        if not time_sentiment.empty:
+            fig = tab_memo(
+                ('timeline', lang),
+                lambda: SentimentVisualizer().plot_sentiment_timeline(
+                    time_sentiment, get_text('chart_timeline', lang)
+                )
+            )
             st.plotly_chart(fig, use_container_width=True)
         else:
-            st.info(get_text('no_keywords', lang))
+            st.info(get_text('no_timeline_data', lang))
+    except Exception as e:
+        st.warning(get_text('timeline_error', lang, error=str(e)))
 
-    with tab3:
-        st.subheader(get_text('chart_timeline', lang))
-        try:
-            analyzer = SentimentAnalyzer()
-            time_sentiment = analyzer.analyze_sentiment_over_time(df)
-            if not time_sentiment.empty:
-                fig = visualizer.plot_sentiment_timeline(time_sentiment, get_text('chart_timeline', lang))
-                st.plotly_chart(fig, use_container_width=True)
-            else:
-                st.info(get_text('no_timeline_data', lang))
-        except Exception as e:
-            st.warning(get_text('timeline_error', lang, error=str(e)))
-
-    with tab4:
-        st.subheader(get_text('tab_tweets', lang))
-
-        # Sentiment filter
-        sentiment_options = [
-            get_text('sentiment_positive', lang),
-            get_text('sentiment_negative', lang),
-            get_text('sentiment_neutral', lang)
-        ]
 
-        # Map display names to actual values
-        sentiment_map = {
-            get_text('sentiment_positive', lang): 'إيجابي',
-            get_text('sentiment_negative', lang): 'سلبي',
-            get_text('sentiment_neutral', lang): 'محايد'
-        }
+def render_tweets_tab(df, stats, word_freq_df, query, lang='en'):
+    """Filterable tweets table"""
+    st.subheader(get_text('tab_tweets', lang))
 
-        selected_sentiments = st.multiselect(
-            get_text('filter_sentiment', lang),
-            options=sentiment_options,
-            default=sentiment_options
-        )
+    # Sentiment filter
+    sentiment_options = [
+        get_text('sentiment_positive', lang),
+        get_text('sentiment_negative', lang),
+        get_text('sentiment_neutral', lang)
+    ]
+
+    # Map display names to actual values
+    sentiment_map = {
+        get_text('sentiment_positive', lang): 'إيجابي',
+        get_text('sentiment_negative', lang): 'سلبي',
+        get_text('sentiment_neutral', lang): 'محايد'
+    }
+
+    selected_sentiments = st.multiselect(
+        get_text('filter_sentiment', lang),
+        options=sentiment_options,
+        default=sentiment_options
+    )
+
+    # Convert back to original sentiment values
+    filter_values = tuple(sorted(sentiment_map[s] for s in selected_sentiments))
 
-        # Convert back to original sentiment values
-        filter_values = [sentiment_map[s] for s in selected_sentiments]
-        filtered_df = df[df['sentiment'].isin(filter_values)]
+    # Display table: only the matching row positions are kept per filter, not a frame copy
+    display_columns = ['text', 'sentiment', 'likes', 'retweets', 'created_at']
+    available_columns = [col for col in display_columns if col in df.columns]
+    rows = tab_memo(
+        ('tweets', filter_values),
+        lambda: np.flatnonzero(df['sentiment'].isin(filter_values).to_numpy())
+    )
+    filtered_df = df.iloc[rows][available_columns]
 
-        # Display table
-        display_columns = ['text', 'sentiment', 'likes', 'retweets', 'created_at']
-        available_columns = [col for col in display_columns if col in filtered_df.columns]
+    st.dataframe(
+        filtered_df,
+        use_container_width=True,
+        height=400
+    )
 
-        st.dataframe(
-            filtered_df[available_columns],
-            use_container_width=True,
-            height=400
+    st.info(get_text('showing_tweets', lang, filtered=len(filtered_df), total=len(df)))
+
+
+def render_export_tab(df, stats, word_freq_df, query, lang='en'):
+    """Downloads built only on request, in the chosen format and columns"""
+    st.subheader(get_text('export_title', lang))
+
+    col1, col2 = st.columns([1, 2])
+
+    with col1:
+        fmt = st.selectbox(
+            get_text('export_format', lang),
+            list(EXPORT_FORMATS),
+            format_func=lambda key: EXPORT_FORMATS[key]['label'],
+            key='export_format'
         )
 
-        st.info(get_text('showing_tweets', lang, filtered=len(filtered_df), total=len(df)))
+    with col2:
+        # Keyed per result set: a new result may have different columns
+        columns = st.multiselect(
+            get_text('export_columns', lang),
+            list(df.columns),
+            default=list(df.columns),
+            key=f"export_columns_{st.session_state.result_id}"
+        )
 
-    with tab5:
-        st.subheader(get_text('export_title', lang))
+    if not columns:
+        st.info(get_text('export_no_columns', lang))
+        return
 
-        col1, col2 = st.columns(2)
+    # The file is written to the session's folder of the result store and read back only in the run
+    # where it was requested: later reruns (including the one triggered by the download) drop it
+    path = get_result_store().file_path(st.session_state.store_key, 'export')
+    if path is None or not st.button(get_text('export_prepare', lang), use_container_width=True):
+        return
 
-        with col1:
-            # Export full results
-            csv = df.to_csv(index=False).encode('utf-8-sig')
-            st.download_button(
-                label=get_text('export_full', lang),
-                data=csv,
-                file_name=f"sentiment_analysis_{query}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                mime="text/csv",
-                use_container_width=True
-            )
+    try:
+        # Written chunk by chunk, never encoded in full in memory
+        export_frame(df, path, fmt, columns)
+        with open(path, 'rb') as export_file:
+            data = export_file.read()
+    except Exception as e:
+        app_logger.error(f"Export error: {str(e)}")
+        st.error(get_text('error_occurred', lang, error=str(e)))
+        return
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
 
-        with col2:
-            # Export statistics
-            stats_df = pd.DataFrame([stats])
-            stats_csv = stats_df.to_csv(index=False).encode('utf-8-sig')
-            st.download_button(
-                label=get_text('export_stats', lang),
-                data=stats_csv,
-                file_name=f"stats_{query}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                mime="text/csv",
-                use_container_width=True
-            )
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    col1, col2 = st.columns(2)
+
+    with col1:
+        # Export full results
+        st.download_button(
+            label=get_text('export_full', lang, format=EXPORT_FORMATS[fmt]['label']),
+            data=data,
+            file_name=f"sentiment_analysis_{query}_{timestamp}.{EXPORT_FORMATS[fmt]['extension']}",
+            mime=EXPORT_FORMATS[fmt]['mime'],
+            use_container_width=True
+        )
+
+    with col2:
+        # Export statistics
+        st.download_button(
+            label=get_text('export_stats', lang),
+            data=pd.DataFrame([stats]).to_csv(index=False).encode('utf-8-sig'),
+            file_name=f"stats_{query}_{timestamp}.csv",
+            mime="text/csv",
+            use_container_width=True
+        )
 
-        st.success(get_text('export_success', lang))
+    st.success(get_text('export_success', lang, count=len(df), size=len(data) / 1024))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,108 @@
+"""
+اختبار حمل لواجهة التحليل (src.api): الطلبات في الثانية وزمن الاستجابة p50/p99
+
+الاستخدام:
+    python -m src.api --port 8000 &
+    python -m benchmarks.api_load_test --url http://127.0.0.1:8000 --requests 500 --concurrency 16
+"""
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import requests
+from benchmarks.engine_benchmark import SAMPLE_TEXTS
+
+
+def _payload(endpoint, batch, method, query):
+    """جسم الطلب لكل نقطة"""
+    if endpoint == 'score':
+        texts = (SAMPLE_TEXTS * (batch // len(SAMPLE_TEXTS) + 1))[:batch]
+        return {'texts': texts, 'method': method}
+    return {'query': query, 'count': batch, 'method': method}
+
+
+def run_load_test(url, endpoint='score', total=500, concurrency=16, batch=20, method='vader', query='python'):
+    """
+    إرسال الطلبات بالتوازي وقياس زمن كل طلب
+
+    Args:
+        url: عنوان الواجهة
+        endpoint: 'score' أو 'analyze'
+        total: عدد الطلبات
+        concurrency: عدد الطلبات المتزامنة
+        batch: عدد النصوص لكل طلب (أو عدد التغريدات لـ analyze)
+        method: طريقة التحليل
+        query: الاستعلام لـ analyze
+
+    Returns:
+        dict: النتائج (rps, p50, p95, p99, errors)
+    """
+    target = f"{url.rstrip('/')}/{endpoint}"
+    body = json.dumps(_payload(endpoint, batch, method, query))
+    headers = {'Content-Type': 'application/json'}
+    local = threading.local()
+
+    def send(_):
+        # جلسة لكل خيط لإعادة استخدام الاتصال
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()
+
+        start = time.perf_counter()
+        try:
+            response = session.post(target, data=body, headers=headers, timeout=120)
+            ok = response.status_code == 200
+        except requests.RequestException:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    # طلب تمهيدي حتى تبدأ العمليات العاملة قبل القياس
+    send(None)
+
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        samples = list(executor.map(send, range(total)))
+    elapsed = time.perf_counter() - start_time
+
+    latencies = np.array([latency for latency, ok in samples if ok]) * 1000
+    errors = sum(1 for _, ok in samples if not ok)
+
+    return {
+        'requests': total,
+        'errors': errors,
+        'elapsed_s': elapsed,
+        'rps': total / elapsed,
+        'texts_per_s': (total - errors) * batch / elapsed if endpoint == 'score' else None,
+        'p50_ms': float(np.percentile(latencies, 50)) if latencies.size else None,
+        'p95_ms': float(np.percentile(latencies, 95)) if latencies.size else None,
+        'p99_ms': float(np.percentile(latencies, 99)) if latencies.size else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test for the sentiment API")
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--endpoint', choices=['score', 'analyze'], default='score')
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--batch', type=int, default=20, help="texts per /score request (tweets per /analyze)")
+    parser.add_argument('--method', default='vader')
+    parser.add_argument('--query', default='python')
+    args = parser.parse_args()
+
+    result = run_load_test(
+        args.url, args.endpoint, args.requests, args.concurrency, args.batch, args.method, args.query
+    )
+
+    print(f"{args.endpoint}: {result['requests']} requests, concurrency {args.concurrency}, "
+          f"{result['errors']} errors in {result['elapsed_s']:.2f}s")
+    print(f"  {result['rps']:.1f} req/s" +
+          (f", {result['texts_per_s']:.0f} texts/s" if result['texts_per_s'] else ""))
+    if result['p50_ms'] is not None:
+        print(f"  latency p50 {result['p50_ms']:.1f} ms | p95 {result['p95_ms']:.1f} ms | p99 {result['p99_ms']:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
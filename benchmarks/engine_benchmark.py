@@ -0,0 +1,65 @@
+"""
+مقارنة إنتاجية محركات التحليل المسجلة مع تقسيم الدفعات
+
+الاستخدام:
+    python -m benchmarks.engine_benchmark [عدد النصوص]
+"""
+import sys
+import time
+from src.engines import MicroBatcher, available_engines
+from src.sentiment_analyzer import get_sentiment_analyzer, warm_up_engines
+
+SAMPLE_TEXTS = [
+    "I love this new phone it is amazing",
+    "Worst customer service ever never again",
+    "The update is okay I guess",
+    "Really disappointed with the battery life",
+    "Great job team the launch went smoothly",
+    "هذا المنتج رائع جدا",
+    "الخدمة سيئة للاسف",
+]
+
+
+def benchmark_engine(name, texts, target_latency):
+    """
+    قياس محرك واحد
+
+    Args:
+        name: اسم المحرك
+        texts: النصوص
+        target_latency: الزمن المستهدف لكل دفعة (None لأعلى إنتاجية)
+
+    Returns:
+        tuple: (نص/ثانية، أكبر زمن دفعة بالملي ثانية، عدد الدفعات)
+    """
+    engine = get_sentiment_analyzer().get_engine(name)
+    batcher = MicroBatcher(engine, target_latency=target_latency)
+
+    batch_times = []
+    start_time = time.perf_counter()
+    last = start_time
+    for _ in batcher.iter_batches(texts):
+        now = time.perf_counter()
+        batch_times.append(now - last)
+        last = now
+    elapsed = time.perf_counter() - start_time
+
+    return len(texts) / elapsed, max(batch_times) * 1000, len(batch_times)
+
+
+def main():
+    """تشغيل القياس وطباعة النتائج"""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    texts = (SAMPLE_TEXTS * (count // len(SAMPLE_TEXTS) + 1))[:count]
+
+    warm_up_engines()
+
+    print(f"{'engine':<16}{'mode':<12}{'texts/s':>10}{'max batch ms':>14}{'batches':>9}")
+    for name in available_engines():
+        for mode, target_latency in (('latency', 0.05), ('throughput', None)):
+            rate, worst, batches = benchmark_engine(name, texts, target_latency)
+            print(f"{name:<16}{mode:<12}{rate:>10.0f}{worst:>14.1f}{batches:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+قياس زمن أول نتيجة (time-to-first-result) قبل وبعد التجهيز المسبق للمحركات
+
+الاستخدام:
+    python -m benchmarks.startup_benchmark
+"""
+import json
+import subprocess
+import sys
+
+# كل وضع يعمل في عملية مستقلة حتى لا تؤثر القواميس المحملة على القياس
+SCENARIOS = {
+    # السلوك السابق: محلل جديد لكل تحليل، والقواميس تُحمل داخل المسار المقاس
+    'cold': """
+import time
+import pandas as pd
+from src.sentiment_analyzer import SentimentAnalyzer
+from src.text_cleaner import TextCleaner
+df = pd.DataFrame({'text': TEXTS, 'lang': 'en'})
+start = time.perf_counter()
+df = TextCleaner().clean_dataframe(df)
+SentimentAnalyzer().analyze_dataframe(df, method=METHOD)
+RESULT = time.perf_counter() - start
+""",
+    # السلوك الجديد: التجهيز الخلفي عند بدء التطبيق ثم استخدام المحركات المشتركة
+    'warm': """
+import time
+import pandas as pd
+from src.sentiment_analyzer import get_sentiment_analyzer, warm_up_engines
+from src.text_cleaner import get_text_cleaner
+warm_up_engines(background=True).join()
+df = pd.DataFrame({'text': TEXTS, 'lang': 'en'})
+start = time.perf_counter()
+df = get_text_cleaner().clean_dataframe(df)
+get_sentiment_analyzer().analyze_dataframe(df, method=METHOD)
+RESULT = time.perf_counter() - start
+""",
+}
+
+SAMPLE_TEXTS = [
+    "I love this new phone, it's amazing!",
+    "Worst customer service ever, never again",
+    "The update is okay I guess",
+    "Really disappointed with the battery life",
+    "Great job team, the launch went smoothly",
+]
+
+
+def run_scenario(name, method, repeats):
+    """
+    تشغيل سيناريو في عملية جديدة وإرجاع الأزمنة
+
+    Args:
+        name: اسم السيناريو ('cold' أو 'warm')
+        method: طريقة التحليل
+        repeats: عدد مرات التكرار
+
+    Returns:
+        list: الأزمنة بالثواني
+    """
+    code = (
+        f"TEXTS = {SAMPLE_TEXTS!r}\nMETHOD = {method!r}\n"
+        + SCENARIOS[name]
+        + "\nimport json; print(json.dumps(RESULT))"
+    )
+
+    timings = []
+    for _ in range(repeats):
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True, text=True, check=True
+        ).stdout
+        timings.append(json.loads(output.strip().splitlines()[-1]))
+
+    return timings
+
+
+def main():
+    """تشغيل القياس وطباعة النتائج"""
+    repeats = 3
+
+    print(f"{'method':<10}{'cold (ms)':>12}{'warm (ms)':>12}{'speedup':>10}")
+    for method in ('textblob', 'vader', 'both'):
+        cold = min(run_scenario('cold', method, repeats)) * 1000
+        warm = min(run_scenario('warm', method, repeats)) * 1000
+        print(f"{method:<10}{cold:>12.1f}{warm:>12.1f}{cold / warm:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,39 @@ MAX_REQUESTS_PER_WINDOW = 450
 POSITIVE_THRESHOLD = 0.1
 NEGATIVE_THRESHOLD = -0.1
 
+# التحليل المتدرج ('cascade'): إحالة النص إلى المحرك الثاني إذا كانت درجة
+# المحرك الأول ضمن هذا الهامش من حدود التصنيف
+CASCADE_MARGIN = 0.1
+
+# تقسيم الدفعات لمحركات التحليل (زمن مستهدف لكل دفعة بالثواني)
+ENGINE_BATCH_LATENCY = 0.05
+ENGINE_MIN_BATCH = 16
+ENGINE_MAX_BATCH = 2048
+
+# خدمة التحليل المحلية (src/scoring_service.py)
+SCORING_SERVICE_HOST = '127.0.0.1'
+SCORING_SERVICE_PORT = 8765
+SCORING_SERVICE_WORKERS = 2
+SCORING_SERVICE_MAX_WAIT = 0.01  # ثانية لتجميع الطلبات المتزامنة
+SCORING_SERVICE_MAX_BATCH = 4096
+SCORING_SERVICE_TIMEOUT = 60
+
+# تجهيز محركات التحليل في الخلفية عند بدء التطبيق
+WARM_UP_ON_START = True
+
+# تسميات المشاعر (بالترتيب المستخدم في الإحصائيات التراكمية)
+SENTIMENT_LABELS = ['إيجابي', 'سلبي', 'محايد']
+
+# نتائج مضغوطة (درجات float32 وتسميات category) لتقليل ذاكرة الجلسات
+COMPACT_RESULTS = True
+
+# دقة التجميع الزمني (بالثواني)
+TIMELINE_FREQUENCIES = {
+    'minute': 60,
+    'hour': 3600,
+    'day': 86400
+}
+
 # إعدادات اللغة
 SUPPORTED_LANGUAGES = ['ar', 'en', 'all']
 LANGUAGE_MAP = {
@@ -29,10 +62,50 @@ REMOVE_MENTIONS = True
 REMOVE_HASHTAGS = False  # نحتفظ بالهاشتاغات للتحليل
 REMOVE_SPECIAL_CHARS = True
 
+# ذاكرة مؤقتة مشتركة لنتائج السلسلة (جلب ← تنظيف ← تحليل): مدة الصلاحية بالثواني والحجم الأقصى
+PIPELINE_CACHE_TTL = 600
+PIPELINE_CACHE_MAX_MB = 256
+PIPELINE_WORD_FREQ_TOP_N = 20
+
+# مهام التحليل في الخلفية: عدد العمال، عدد المهام في الذاكرة، مجلد النتائج ومدة بقائها بالثواني، فترة الاستعلام عن الحالة
+JOB_WORKERS = 4
+JOB_HISTORY_SIZE = 100
+JOB_RESULTS_DIR = 'output/jobs'
+JOB_RESULTS_TTL = 24 * 3600
+JOB_POLL_INTERVAL = 0.5
+# مهلة إضافية بالثواني بعد الموعد النهائي أو الإلغاء قبل أن تتوقف الواجهة عن انتظار مهمة عالقة
+JOB_STOP_GRACE = 15
+
+# وضع المقارنة: أقصى عدد استعلامات تعمل معاً (لا يتجاوز JOB_WORKERS حتى تبدأ كلها فوراً)
+COMPARE_MAX_QUERIES = 4
+
+# نتائج الجلسات: الحد الأقصى للذاكرة لكل الجلسات، مجلد النقل إلى القرص، مدة بقاء الجلسة غير المستخدمة بالثواني
+RESULT_STORE_MAX_MB = 512
+RESULT_STORE_DIR = 'output/sessions'
+RESULT_STORE_TTL = 6 * 3600
+
+# واجهة HTTP (ASGI): العنوان والمنفذ، عمليات التحليل، عدد النتائج المحفوظة، الحد الأقصى لحجم الطلب
+API_HOST = '127.0.0.1'
+API_PORT = 8000
+API_WORKERS = 2
+API_RESULTS_SIZE = 32
+API_MAX_BODY_MB = 10
+
+# التشغيل الدفعي من سطر الأوامر (python -m src.batch): عدد الاستعلامات المتوازية
+BATCH_WORKERS = 4
+
 # إعدادات التصدير
 OUTPUT_DIR = 'output'
 CSV_ENCODING = 'utf-8-sig'  # للدعم الكامل للعربية
 
+# تصدير النتائج من التطبيق: عدد الصفوف في كل دفعة وضغط Parquet و Feather
+EXPORT_CHUNK_ROWS = 5000
+EXPORT_COMPRESSION = 'zstd'
+
+# تقارير HTML: عدد التغريدات المتطرفة في الجدول وعدد العمليات عند إنشاء عدة تقارير
+REPORT_EXTREMES_COUNT = 5
+REPORT_WORKERS = 4
+
 # إعدادات الرسوم البيانية
 CHART_COLORS = {
     'positive': '#28a745',  # أخضر
@@ -40,6 +113,21 @@ CHART_COLORS = {
     'neutral': '#6c757d'    # رمادي
 }
 
+# رسم التفاعل: WebGL فوق هذا العدد من النقاط، وخلايا كثافة مجمعة فوق الحد الثاني
+ENGAGEMENT_WEBGL_THRESHOLD = 2000
+ENGAGEMENT_DENSITY_THRESHOLD = 50000
+ENGAGEMENT_DENSITY_BINS = 40
+
+# أقصى عدد نقاط لكل سلسلة في الرسم الزمني (اختصار LTTB فوقه)
+TIMELINE_MAX_POINTS = 1000
+TIMELINE_MARKERS_MAX_POINTS = 200
+
+# حجم الذاكرة المؤقتة لإعادة تشكيل النصوص العربية في الرسوم
+ARABIC_TEXT_CACHE_SIZE = 4096
+
+# عدد الرسوم المحفوظة في الذاكرة المؤقتة (LRU)
+FIGURE_CACHE_SIZE = 64
+
 # إعدادات Streamlit
 PAGE_TITLE = "محلل مشاعر تويتر"
 PAGE_ICON = "🐦"
@@ -53,3 +141,41 @@ ARABIC_STOP_WORDS = [
     'ما', 'ماذا', 'متى', 'أين', 'كيف', 'لماذا', 'من', 'عن',
     'مع', 'بدون', 'لكن', 'لكن', 'أو', 'و', 'ف', 'ب', 'ل', 'ك'
 ]
+
+# توجيه التحليل حسب اللغة
+# اللغات التي لها محرك خاص
+LANGUAGE_ENGINES = {
+    'ar': 'arabic_lexicon'
+}
+
+# اللغات التي تقرؤها الطريقة المختارة (TextBlob/VADER إنجليزية فقط)؛ أي لغة أخرى بدون
+# محرك في LANGUAGE_ENGINES (مثل 'fr' أو 'mixed') تُعطى نتيجة محايدة بدون درجات
+METHOD_LANGUAGES = ['en']
+UNSUPPORTED_LANGUAGE_ENGINE = 'unsupported'
+
+# رموز اللغة التي لا تحدد لغة فعلية في Twitter (يتم كشف اللغة من النص)
+UNDETERMINED_LANGUAGES = ['', 'und', 'unknown', 'qme', 'qam', 'qht', 'qst', 'zxx']
+
+# قاموس المشاعر العربي (يتم توحيد الأحرف عند التحميل)
+ARABIC_POSITIVE_WORDS = [
+    'جميل', 'رائع', 'ممتاز', 'جيد', 'حلو', 'سعيد', 'سعاده', 'فرح', 'فرحه', 'احب',
+    'حب', 'أحببت', 'شكرا', 'شكر', 'مبروك', 'مبارك', 'نجاح', 'ناجح', 'افضل', 'أفضل',
+    'عظيم', 'مذهل', 'مميز', 'رهيب', 'ابداع', 'إبداع', 'مبدع', 'تميز', 'فخر', 'فخور',
+    'أمل', 'متفائل', 'تفاؤل', 'راضي', 'رضا', 'سهل', 'مفيد', 'نظيف', 'لطيف', 'طيب',
+    'خير', 'بخير', 'الحمدلله', 'الحمد', 'ماشاءالله', 'يسلمو', 'روعه', 'رائعه', 'جميله',
+    'ممتازه', 'احسن', 'أحسن', 'قوي', 'صادق', 'موفق', 'توفيق', 'فوز', 'انتصار', 'سلام',
+    'ضحك', 'متعه', 'ممتع', 'انجاز', 'إنجاز', 'تقدم', 'اعجبني', 'أعجبني', 'يستاهل'
+]
+
+ARABIC_NEGATIVE_WORDS = [
+    'سيء', 'سيئ', 'سيئه', 'سئ', 'زفت', 'فاشل', 'فشل', 'حزين', 'حزن', 'غضب',
+    'غاضب', 'زعلان', 'كره', 'اكره', 'أكره', 'مشكله', 'مشاكل', 'خطأ', 'غلط', 'اسوأ',
+    'أسوأ', 'مزعج', 'ازعاج', 'إزعاج', 'ضعيف', 'بطيء', 'ممل', 'مقرف', 'كارثه', 'خساره',
+    'خسر', 'ظلم', 'ظالم', 'فساد', 'فاسد', 'كذب', 'كذاب', 'حرام', 'للاسف', 'للأسف',
+    'مؤسف', 'خايف', 'خوف', 'قلق', 'تعبان', 'تعب', 'ألم', 'الم', 'موت', 'قتل',
+    'حرب', 'دمار', 'غالي', 'نصب', 'احتيال', 'رديء', 'تافه', 'مخيب', 'خيبه', 'يأس',
+    'مستحيل', 'ضرر', 'خطير', 'عنصري', 'وسخ', 'قبيح', 'مريض', 'مرض', 'كئيب', 'اكتئاب'
+]
+
+# كلمات النفي العربية (تعكس قطبية الكلمة التالية)
+ARABIC_NEGATION_WORDS = ['لا', 'لم', 'لن', 'ليس', 'ليست', 'غير', 'ما', 'مش', 'مو', 'بدون']
@@ -21,10 +21,11 @@ TRANSLATIONS = {
         'language': 'Language:',
         'language_help': 'Select the language of tweets',
         'analysis_method': 'Analysis Method:',
-        'analysis_method_help': 'TextBlob: Fast\nVADER: Better for English\nBoth: More accurate but slower',
+        'analysis_method_help': 'TextBlob: Fast\nVADER: Better for English\nBoth: More accurate but slower\nCascade: VADER first, TextBlob only for borderline tweets',
         'method_textblob': 'TextBlob (Faster)',
         'method_vader': 'VADER (Balanced)',
         'method_both': 'Both (Most Accurate)',
+        'method_cascade': 'Cascade (Fast + Accurate)',
         'start_analysis': '🚀 Start Analysis',
         'footer': 'By: Twitter Sentiment Analyzer<br>Phase 1 - v1.0',
 
@@ -49,7 +50,7 @@ TRANSLATIONS = {
         'metrics_languages': 'Language Support',
         'metrics_languages_delta': 'Arabic & English',
         'metrics_methods': 'Analysis Methods',
-        'metrics_methods_delta': 'TextBlob, VADER, Both',
+        'metrics_methods_delta': 'TextBlob, VADER, Both, Cascade',
         'metrics_accuracy': 'Analysis Accuracy',
         'metrics_accuracy_delta': 'Improvable',
 
@@ -92,6 +93,7 @@ TRANSLATIONS = {
         'chart_sentiment_dist': 'Sentiment Distribution',
         'chart_word_freq': 'Most Frequent Words',
         'chart_timeline': 'Sentiment Evolution Over Time',
+        'chart_engagement': 'Engagement vs Sentiment',
         'no_keywords': 'No enough keywords found',
         'no_timeline_data': 'Not enough timeline data to display',
         'timeline_error': 'Could not create timeline chart: {error}',
@@ -102,15 +104,51 @@ TRANSLATIONS = {
 
         # Export
         'export_title': 'Export Results',
-        'export_full': '📥 Download Full Results (CSV)',
+        'export_full': '📥 Download Results ({format})',
         'export_stats': '📊 Download Statistics (CSV)',
-        'export_success': '✅ You can now download the results in CSV format',
+        'export_success': '✅ {count} tweets ready to download ({size:.0f} KB)',
+        'export_format': 'Format:',
+        'export_columns': 'Columns:',
+        'export_prepare': '⚙️ Prepare export',
+        'export_no_columns': 'Select at least one column to export',
+
+        # Background jobs
+        'cancel_analysis': '⏹️ Cancel analysis',
+        'analysis_cancelled': 'Analysis cancelled',
+        'job_stalled': '⏰ Twitter API is not responding; the analysis was stopped. Please try again later.',
+        'partial_results': '⏱️ Time limit reached: showing {count} of {requested} requested tweets',
+
+        # Comparison mode
+        'compare_mode': 'Compare several queries',
+        'compare_queries': 'Queries (one per line):',
+        'compare_queries_help': 'Up to {max} queries, fetched and analyzed at the same time',
+        'compare_too_many': '⚠️ Compare up to {max} queries at a time',
+        'compare_need_two': '⚠️ Enter at least two different queries to compare',
+        'comparison_results': '⚖️ Comparison',
+        'comparison_failed': '⚠️ No results for: {queries}',
+        'chart_comparison_dist': 'Sentiment Distribution by Query',
+        'chart_comparison_timeline': 'Net Sentiment Over Time (positive - negative)',
+        'column_query': 'Query',
+
+        # Memory usage
+        'memory_usage': '🧠 Server memory',
+        'memory_rss': 'Process: {size:.0f} MB',
+        'memory_results': 'Session results: {size:.1f} / {limit:.0f} MB ({in_memory} in memory, {on_disk} on disk, {disk:.1f} MB)',
+        'memory_cache': 'Pipeline cache: {size:.1f} / {limit:.0f} MB ({entries} entries)',
 
         # Sentiment labels
         'sentiment_positive': 'Positive',
         'sentiment_negative': 'Negative',
         'sentiment_neutral': 'Neutral',
 
+        # Report
+        'report_title': 'Sentiment Report: {query}',
+        'report_generated': 'Generated {time}',
+        'most_positive': 'Most Positive Tweets',
+        'most_negative': 'Most Negative Tweets',
+        'column_sentiment': 'Sentiment',
+        'column_score': 'Score',
+
         # UI
         'app_language': 'App Language',
     },
@@ -132,10 +170,11 @@ TRANSLATIONS = {
         'language': 'اللغة:',
         'language_help': 'حدد لغة التغريدات المراد جلبها',
         'analysis_method': 'طريقة التحليل:',
-        'analysis_method_help': 'TextBlob: سريع وبسيط\nVADER: أفضل للغة الإنجليزية\nكلاهما: أدق لكن أبطأ',
+        'analysis_method_help': 'TextBlob: سريع وبسيط\nVADER: أفضل للغة الإنجليزية\nكلاهما: أدق لكن أبطأ\nمتدرج: VADER أولاً ثم TextBlob للتغريدات غير المحسومة فقط',
         'method_textblob': 'TextBlob (أسرع)',
         'method_vader': 'VADER (متوازن)',
         'method_both': 'كلاهما (أدق)',
+        'method_cascade': 'متدرج (سريع ودقيق)',
         'start_analysis': '🚀 ابدأ التحليل',
         'footer': 'بواسطة: Twitter Sentiment Analyzer<br>المرحلة الأولى - v1.0',
 
@@ -160,7 +199,7 @@ TRANSLATIONS = {
         'metrics_languages': 'دعم اللغات',
         'metrics_languages_delta': 'العربية والإنجليزية',
         'metrics_methods': 'طرق التحليل',
-        'metrics_methods_delta': 'TextBlob, VADER, كلاهما',
+        'metrics_methods_delta': 'TextBlob, VADER, كلاهما, متدرج',
         'metrics_accuracy': 'دقة التحليل',
         'metrics_accuracy_delta': 'قابلة للتحسين',
 
@@ -203,6 +242,7 @@ TRANSLATIONS = {
         'chart_sentiment_dist': 'توزيع المشاعر',
         'chart_word_freq': 'الكلمات الأكثر تكراراً',
         'chart_timeline': 'تطور المشاعر عبر الزمن',
+        'chart_engagement': 'التفاعل مقابل المشاعر',
         'no_keywords': 'لم يتم العثور على كلمات مفتاحية كافية',
         'no_timeline_data': 'لا توجد بيانات زمنية كافية للعرض',
         'timeline_error': 'تعذر إنشاء الرسم الزمني: {error}',
@@ -213,15 +253,51 @@ TRANSLATIONS = {
 
         # Export
         'export_title': 'تصدير النتائج',
-        'export_full': '📥 تحميل النتائج الكاملة (CSV)',
+        'export_full': '📥 تحميل النتائج ({format})',
         'export_stats': '📊 تحميل الإحصائيات (CSV)',
-        'export_success': '✅ يمكنك الآن تحميل النتائج بتنسيق CSV لاستخدامها في برامج أخرى',
+        'export_success': '✅ {count} تغريدة جاهزة للتحميل ({size:.0f} KB)',
+        'export_format': 'الصيغة:',
+        'export_columns': 'الأعمدة:',
+        'export_prepare': '⚙️ تجهيز الملف',
+        'export_no_columns': 'اختر عموداً واحداً على الأقل للتصدير',
+
+        # Background jobs
+        'cancel_analysis': '⏹️ إلغاء التحليل',
+        'analysis_cancelled': 'تم إلغاء التحليل',
+        'job_stalled': '⏰ واجهة Twitter لا تستجيب، تم إيقاف التحليل. الرجاء المحاولة لاحقاً.',
+        'partial_results': '⏱️ انتهت المهلة: عرض {count} من {requested} تغريدة مطلوبة',
+
+        # Comparison mode
+        'compare_mode': 'مقارنة عدة استعلامات',
+        'compare_queries': 'الاستعلامات (واحد في كل سطر):',
+        'compare_queries_help': 'حتى {max} استعلامات تُجلب وتُحلل في نفس الوقت',
+        'compare_too_many': '⚠️ يمكن مقارنة {max} استعلامات كحد أقصى',
+        'compare_need_two': '⚠️ أدخل استعلامين مختلفين على الأقل للمقارنة',
+        'comparison_results': '⚖️ المقارنة',
+        'comparison_failed': '⚠️ لا توجد نتائج لـ: {queries}',
+        'chart_comparison_dist': 'توزيع المشاعر حسب الاستعلام',
+        'chart_comparison_timeline': 'صافي المشاعر عبر الزمن (الإيجابي - السلبي)',
+        'column_query': 'الاستعلام',
+
+        # Memory usage
+        'memory_usage': '🧠 ذاكرة الخادم',
+        'memory_rss': 'العملية: {size:.0f} MB',
+        'memory_results': 'نتائج الجلسات: {size:.1f} / {limit:.0f} MB ({in_memory} في الذاكرة، {on_disk} على القرص، {disk:.1f} MB)',
+        'memory_cache': 'ذاكرة السلسلة المؤقتة: {size:.1f} / {limit:.0f} MB ({entries} عنصر)',
 
         # Sentiment labels
         'sentiment_positive': 'إيجابي',
         'sentiment_negative': 'سلبي',
         'sentiment_neutral': 'محايد',
 
+        # Report
+        'report_title': 'تقرير المشاعر: {query}',
+        'report_generated': 'تاريخ الإنشاء {time}',
+        'most_positive': 'أكثر التغريدات إيجابية',
+        'most_negative': 'أكثر التغريدات سلبية',
+        'column_sentiment': 'المشاعر',
+        'column_score': 'الدرجة',
+
         # UI
         'app_language': 'لغة التطبيق',
     }
@@ -0,0 +1,516 @@
+"""
+إحصائيات مشاعر تراكمية قابلة للدمج والحفظ (للتحليل المتدفق)
+"""
+import heapq
+import json
+import numpy as np
+import pandas as pd
+from config.settings import SENTIMENT_LABELS, TIMELINE_FREQUENCIES
+from utils.error_handler import AnalysisError
+
+
+# أعمدة الدرجات التي تُجمع إحصائياتها إن وجدت
+SCORE_COLUMNS = ['polarity', 'compound', 'tb_polarity', 'vader_compound']
+
+
+def to_utc_nanoseconds(times):
+    """
+    تحويل عمود زمني إلى نانوثانية UTC كأعداد صحيحة
+
+    Args:
+        times: Series من التواريخ
+
+    Returns:
+        ndarray: القيم كـ int64 (NaT تصبح أصغر قيمة int64)
+    """
+    if not pd.api.types.is_datetime64_any_dtype(times):
+        times = pd.to_datetime(times)
+
+    if times.dt.tz is not None:
+        times = times.dt.tz_convert('UTC').dt.tz_localize(None)
+
+    return times.to_numpy(dtype='datetime64[ns]').view(np.int64)
+
+
+def label_codes(labels):
+    """
+    تحويل تسميات المشاعر إلى أرقام حسب ترتيب SENTIMENT_LABELS
+
+    Args:
+        labels: Series التسميات
+
+    Returns:
+        ndarray: رقم كل تسمية (-1 للتسميات غير المعروفة)
+    """
+    # factorize أسرع بكثير من مطابقة الفئات مباشرة على النصوص
+    codes, uniques = pd.factorize(labels)
+    mapping = np.array(
+        [SENTIMENT_LABELS.index(label) if label in SENTIMENT_LABELS else -1 for label in uniques]
+        + [-1],
+        dtype=np.int64
+    )
+
+    # الرمز -1 (قيم مفقودة) يقابل العنصر الأخير في mapping
+    return mapping[codes]
+
+
+def build_timeline_frame(starts, counts, timezone=None, freq='hour',
+                         sentiment_column='sentiment'):
+    """
+    بناء DataFrame النسب الزمنية من مصفوفة العدّ
+
+    Args:
+        starts: بداية كل فترة (نانوثانية UTC)
+        counts: مصفوفة (فترات × تسميات) بترتيب SENTIMENT_LABELS
+        timezone: المنطقة الزمنية للفهرس (None لتواريخ بدون منطقة)
+        freq: دقة التجميع (اسم الفهرس)
+        sentiment_column: اسم محور الأعمدة
+
+    Returns:
+        DataFrame: نسبة كل تسمية في كل فترة زمنية
+    """
+    index = pd.to_datetime(np.asarray(starts, dtype=np.int64), unit='ns')
+    if timezone:
+        index = index.tz_localize('UTC').tz_convert(timezone)
+    index.name = freq
+
+    # الإبقاء على التسميات الموجودة فقط
+    present = counts.sum(axis=0) > 0
+    columns = pd.Index(
+        [label for label, keep in zip(SENTIMENT_LABELS, present) if keep],
+        name=sentiment_column
+    )
+    counts = counts[:, present]
+
+    percentages = counts / counts.sum(axis=1, keepdims=True) * 100
+
+    return pd.DataFrame(percentages, index=index, columns=columns)
+
+
+class SentimentAggregate:
+    """حالة إحصائية تراكمية للمشاعر تُحدّث بكل دفعة وتُدمج بين العمال"""
+
+    def __init__(self, freq='hour'):
+        """
+        تهيئة الحالة
+
+        Args:
+            freq: دقة التجميع الزمني ('minute', 'hour', 'day')
+        """
+        if freq not in TIMELINE_FREQUENCIES:
+            raise AnalysisError(f"دقة زمنية غير مدعومة: {freq}")
+
+        self.freq = freq
+        self.total = 0
+        self.label_counts = np.zeros(len(SENTIMENT_LABELS), dtype=np.int64)
+
+        # لكل عمود درجات: [العدد، المجموع، مجموع المربعات]
+        self.score_sums = {}
+
+        # بداية كل فترة زمنية (نانوثانية UTC) -> عدد كل تسمية
+        self.buckets = {}
+        self.timezone = None
+
+    @property
+    def _step(self):
+        """طول الفترة الزمنية بالنانوثانية"""
+        return TIMELINE_FREQUENCIES[self.freq] * 1_000_000_000
+
+    def update(self, df, sentiment_column='sentiment', time_column='created_at'):
+        """
+        إضافة دفعة نتائج إلى الحالة (التكلفة تعتمد على حجم الدفعة فقط)
+
+        Args:
+            df: DataFrame مع نتائج التحليل
+            sentiment_column: عمود المشاعر
+            time_column: عمود التاريخ
+
+        Returns:
+            SentimentAggregate: نفس الكائن
+        """
+        if df.empty or sentiment_column not in df.columns:
+            return self
+
+        codes = label_codes(df[sentiment_column])
+        known = codes >= 0
+
+        self.total += len(df)
+        self.label_counts += np.bincount(codes[known], minlength=len(SENTIMENT_LABELS))
+
+        for column in SCORE_COLUMNS:
+            if column not in df.columns:
+                continue
+            values = df[column].to_numpy(dtype=np.float64)
+            values = values[~np.isnan(values)]
+            sums = self.score_sums.setdefault(column, [0, 0.0, 0.0])
+            sums[0] += int(values.size)
+            sums[1] += float(values.sum())
+            sums[2] += float(np.square(values).sum())
+
+        if time_column in df.columns:
+            times = df[time_column]
+            if not pd.api.types.is_datetime64_any_dtype(times):
+                times = pd.to_datetime(times)
+            if self.timezone is None and times.dt.tz is not None:
+                self.timezone = str(times.dt.tz)
+
+            nanoseconds = to_utc_nanoseconds(times)
+            valid = known & (nanoseconds != np.iinfo(np.int64).min)
+            bucket_ids = nanoseconds[valid] // self._step
+
+            if bucket_ids.size:
+                keys, inverse = np.unique(bucket_ids, return_inverse=True)
+                counts = np.bincount(
+                    inverse * len(SENTIMENT_LABELS) + codes[valid],
+                    minlength=len(keys) * len(SENTIMENT_LABELS)
+                ).reshape(len(keys), len(SENTIMENT_LABELS))
+
+                for key, row in zip(keys.tolist(), counts):
+                    start = key * self._step
+                    if start in self.buckets:
+                        self.buckets[start] += row
+                    else:
+                        self.buckets[start] = row.copy()
+
+        return self
+
+    def merge(self, other):
+        """
+        دمج حالة أخرى (من عامل آخر أو تشغيل سابق)
+
+        Args:
+            other: SentimentAggregate
+
+        Returns:
+            SentimentAggregate: نفس الكائن بعد الدمج
+        """
+        if other.freq != self.freq:
+            raise AnalysisError(f"لا يمكن دمج دقتين زمنيتين مختلفتين: {self.freq} و {other.freq}")
+
+        self.total += other.total
+        self.label_counts += other.label_counts
+
+        for column, (count, total, squares) in other.score_sums.items():
+            sums = self.score_sums.setdefault(column, [0, 0.0, 0.0])
+            sums[0] += count
+            sums[1] += total
+            sums[2] += squares
+
+        for start, row in other.buckets.items():
+            if start in self.buckets:
+                self.buckets[start] += row
+            else:
+                self.buckets[start] = row.copy()
+
+        if self.timezone is None:
+            self.timezone = other.timezone
+
+        return self
+
+    def score_mean(self, column):
+        """متوسط عمود درجات (None إذا لم يُسجل)"""
+        count, total, _ = self.score_sums.get(column, [0, 0.0, 0.0])
+        return total / count if count else None
+
+    def score_std(self, column):
+        """الانحراف المعياري لعمود درجات (None إذا لم يُسجل)"""
+        count, total, squares = self.score_sums.get(column, [0, 0.0, 0.0])
+        if not count:
+            return None
+        mean = total / count
+        return float(np.sqrt(max(squares / count - mean * mean, 0.0)))
+
+    def to_stats(self):
+        """
+        إخراج الإحصائيات بنفس صيغة SentimentAnalyzer.get_sentiment_statistics
+
+        Returns:
+            dict: الإحصائيات
+        """
+        if self.total == 0:
+            return {}
+
+        positive, negative, neutral = (int(count) for count in self.label_counts)
+
+        stats = {
+            'total': self.total,
+            'positive': positive,
+            'negative': negative,
+            'neutral': neutral,
+            'positive_pct': round((positive / self.total) * 100, 2),
+            'negative_pct': round((negative / self.total) * 100, 2),
+            'neutral_pct': round((neutral / self.total) * 100, 2)
+        }
+
+        if self.score_mean('polarity') is not None:
+            stats['avg_polarity'] = round(self.score_mean('polarity'), 3)
+
+        if self.score_mean('compound') is not None:
+            stats['avg_compound'] = round(self.score_mean('compound'), 3)
+
+        return stats
+
+    def to_timeline(self, sentiment_column='sentiment'):
+        """
+        إخراج التوزيع الزمني بنفس صيغة analyze_sentiment_over_time
+
+        Args:
+            sentiment_column: اسم محور الأعمدة
+
+        Returns:
+            DataFrame: نسبة كل تسمية في كل فترة زمنية
+        """
+        if not self.buckets:
+            return pd.DataFrame()
+
+        starts = sorted(self.buckets)
+        counts = np.vstack([self.buckets[start] for start in starts])
+
+        return build_timeline_frame(starts, counts, self.timezone, self.freq, sentiment_column)
+
+    def to_dict(self):
+        """
+        تحويل الحالة إلى dict قابل للتحويل إلى JSON
+
+        Returns:
+            dict: الحالة
+        """
+        return {
+            'freq': self.freq,
+            'total': self.total,
+            'label_counts': self.label_counts.tolist(),
+            'score_sums': self.score_sums,
+            'buckets': {str(start): row.tolist() for start, row in self.buckets.items()},
+            'timezone': self.timezone
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        إنشاء حالة من dict محفوظ
+
+        Args:
+            data: dict من to_dict
+
+        Returns:
+            SentimentAggregate: الحالة
+        """
+        aggregate = cls(freq=data.get('freq', 'hour'))
+        aggregate.total = int(data.get('total', 0))
+        aggregate.label_counts = np.array(data.get('label_counts', aggregate.label_counts), dtype=np.int64)
+        aggregate.score_sums = {
+            column: [int(sums[0]), float(sums[1]), float(sums[2])]
+            for column, sums in data.get('score_sums', {}).items()
+        }
+        aggregate.buckets = {
+            int(start): np.array(row, dtype=np.int64)
+            for start, row in data.get('buckets', {}).items()
+        }
+        aggregate.timezone = data.get('timezone')
+        return aggregate
+
+    def save(self, path):
+        """
+        حفظ الحالة في ملف JSON
+
+        Args:
+            path: مسار الملف
+        """
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path):
+        """
+        تحميل الحالة من ملف JSON
+
+        Args:
+            path: مسار الملف
+
+        Returns:
+            SentimentAggregate: الحالة
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+
+class ExtremeSentimentTracker:
+    """تتبع أكثر التغريدات إيجابية وسلبية بكومات محدودة الحجم أثناء التدفق"""
+
+    # الأعمدة المحفوظة لكل تغريدة (إن وجدت)
+    KEEP_COLUMNS = ['id', 'text', 'username', 'created_at', 'likes', 'retweets', 'sentiment']
+
+    def __init__(self, n=5, score_column=None):
+        """
+        تهيئة المتتبع
+
+        Args:
+            n: عدد التغريدات لكل فئة
+            score_column: عمود الترتيب (يُحدد تلقائياً: polarity ثم compound)
+        """
+        self.n = n
+        self.score_column = score_column
+        self._counter = 0
+
+        # كومة صغرى لأعلى الدرجات، وكومة صغرى للدرجات المعكوسة لأدناها
+        # كل عنصر: (الدرجة، رقم تسلسلي، بيانات التغريدة)
+        self.positive_heap = []
+        self.negative_heap = []
+
+    def _push(self, heap, key, row):
+        """إضافة عنصر مع الإبقاء على أفضل n عناصر فقط"""
+        self._counter += 1
+        item = (key, self._counter, row)
+        if len(heap) < self.n:
+            heapq.heappush(heap, item)
+        elif key > heap[0][0]:
+            heapq.heapreplace(heap, item)
+
+    def update(self, df):
+        """
+        إضافة دفعة نتائج (يُفحص أفضل n من الدفعة فقط)
+
+        Args:
+            df: DataFrame مع نتائج التحليل
+
+        Returns:
+            ExtremeSentimentTracker: نفس الكائن
+        """
+        if df.empty or 'sentiment' not in df.columns:
+            return self
+
+        if self.score_column is None:
+            if 'polarity' in df.columns:
+                self.score_column = 'polarity'
+            elif 'compound' in df.columns:
+                self.score_column = 'compound'
+            else:
+                return self
+
+        if self.score_column not in df.columns:
+            return self
+
+        columns = [col for col in self.KEEP_COLUMNS if col in df.columns] + [self.score_column]
+
+        positive = df[df['sentiment'] == 'إيجابي'].nlargest(self.n, self.score_column)
+        for row in positive[columns].to_dict('records'):
+            self._push(self.positive_heap, row[self.score_column], row)
+
+        negative = df[df['sentiment'] == 'سلبي'].nsmallest(self.n, self.score_column)
+        for row in negative[columns].to_dict('records'):
+            self._push(self.negative_heap, -row[self.score_column], row)
+
+        return self
+
+    def merge(self, other):
+        """
+        دمج متتبع آخر (من عامل آخر أو تشغيل سابق)
+
+        Args:
+            other: ExtremeSentimentTracker
+
+        Returns:
+            ExtremeSentimentTracker: نفس الكائن
+        """
+        if self.score_column is None:
+            self.score_column = other.score_column
+        elif other.score_column not in (None, self.score_column):
+            raise AnalysisError(
+                f"لا يمكن دمج عمودي ترتيب مختلفين: {self.score_column} و {other.score_column}"
+            )
+
+        for key, _, row in other.positive_heap:
+            self._push(self.positive_heap, key, row)
+
+        for key, _, row in other.negative_heap:
+            self._push(self.negative_heap, key, row)
+
+        return self
+
+    def _heap_to_frame(self, heap):
+        """تحويل كومة إلى DataFrame مرتب من الأكثر تطرفاً"""
+        rows = [row for _, _, row in sorted(heap, key=lambda item: (-item[0], item[1]))]
+        frame = pd.DataFrame(rows)
+
+        if 'created_at' in frame.columns:
+            frame['created_at'] = pd.to_datetime(frame['created_at'])
+
+        return frame
+
+    def get_extremes(self):
+        """
+        إخراج النتائج بنفس صيغة SentimentAnalyzer.get_extreme_sentiments
+
+        Returns:
+            dict: most_positive و most_negative
+        """
+        return {
+            'most_positive': self._heap_to_frame(self.positive_heap),
+            'most_negative': self._heap_to_frame(self.negative_heap)
+        }
+
+    def to_dict(self):
+        """
+        تحويل الحالة إلى dict قابل للتحويل إلى JSON
+
+        Returns:
+            dict: الحالة
+        """
+        def serialize(heap):
+            return [
+                [key, {col: (value.isoformat() if hasattr(value, 'isoformat') else value)
+                       for col, value in row.items()}]
+                for key, _, row in sorted(heap, key=lambda item: (-item[0], item[1]))
+            ]
+
+        return {
+            'n': self.n,
+            'score_column': self.score_column,
+            'positive': serialize(self.positive_heap),
+            'negative': serialize(self.negative_heap)
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        إنشاء متتبع من dict محفوظ
+
+        Args:
+            data: dict من to_dict
+
+        Returns:
+            ExtremeSentimentTracker: المتتبع
+        """
+        tracker = cls(n=data.get('n', 5), score_column=data.get('score_column'))
+
+        for key, row in data.get('positive', []):
+            tracker._push(tracker.positive_heap, key, row)
+
+        for key, row in data.get('negative', []):
+            tracker._push(tracker.negative_heap, key, row)
+
+        return tracker
+
+    def save(self, path):
+        """
+        حفظ الحالة في ملف JSON
+
+        Args:
+            path: مسار الملف
+        """
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, default=str)
+
+    @classmethod
+    def load(cls, path):
+        """
+        تحميل الحالة من ملف JSON
+
+        Args:
+            path: مسار الملف
+
+        Returns:
+            ExtremeSentimentTracker: المتتبع
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
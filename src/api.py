@@ -0,0 +1,350 @@
+"""
+واجهة HTTP غير متزامنة (ASGI) لسلسلة التحليل بدون إطار عمل
+
+التشغيل (يتطلب uvicorn أو أي خادم ASGI):
+    python -m src.api --port 8000 --workers 2
+    uvicorn src.api:app --port 8000
+
+النقاط:
+    GET  /health
+    POST /score            {"texts": [...], "langs": [...], "method": "vader"}
+    POST /analyze          {"query": "...", "count": 100, "search_type": "keyword", "lang": "all",
+                            "method": "textblob", "timeout": 60}
+    GET  /stats/<id>
+    GET  /timeline/<id>?freq=hour
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs
+import numpy as np
+import pandas as pd
+from config.settings import (
+    API_HOST, API_PORT, API_WORKERS, API_RESULTS_SIZE, API_MAX_BODY_MB,
+    SCORING_SERVICE_TIMEOUT, TIMELINE_FREQUENCIES
+)
+from utils.logger import app_logger
+from utils.error_handler import AnalysisError
+from src.scoring_service import RequestCoalescer, _init_worker, _parse_score_payload, _json_columns
+from src.text_cleaner import get_text_cleaner
+from src.sentiment_analyzer import get_sentiment_analyzer
+from src.pipeline import run_pipeline, pipeline_key
+from src.data_fetcher import CancellationToken
+
+
+class HTTPError(Exception):
+    """خطأ يُعاد للعميل برمز حالة HTTP"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _json_default(value):
+    """تحويل قيم NumPy و pandas إلى JSON"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    raise TypeError(f"غير قابل للتحويل إلى JSON: {type(value).__name__}")
+
+
+def _finite(value):
+    """قيمة رقمية صالحة في JSON (NaN و inf تصبح None)"""
+    if isinstance(value, (float, np.floating)) and not math.isfinite(value):
+        return None
+    return value
+
+
+def _result_id(key):
+    """معرف قصير ثابت لنتيجة تحليل"""
+    return hashlib.blake2b(repr(key).encode('utf-8'), digest_size=8).hexdigest()
+
+
+class SentimentAPI:
+    """تطبيق ASGI: تحليل النصوص والاستعلامات في مجمع عمليات مع تجميع الطلبات"""
+
+    def __init__(self, workers=API_WORKERS, results_size=API_RESULTS_SIZE):
+        """
+        تهيئة التطبيق (العمال يبدأون عند أول طلب أو عند lifespan startup)
+
+        Args:
+            workers: عدد العمليات العاملة للتحليل
+            results_size: عدد نتائج /analyze المحفوظة لـ /stats و /timeline
+        """
+        self.workers = workers
+        self.results_size = results_size
+        self._executor = None
+        self._coalescer = None
+        self._start_lock = threading.Lock()
+        self._results = OrderedDict()
+        self._inflight = {}
+
+    # ------------------------------------------------------------------
+    # دورة الحياة
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """تشغيل مجمع العمليات (مرة واحدة)"""
+        if self._coalescer is not None:
+            return
+
+        with self._start_lock:
+            if self._coalescer is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+                self._coalescer = RequestCoalescer(self._executor)
+                # المنظف والمحلل المشتركان في عملية الخادم (للتنظيف والإحصائيات)
+                get_text_cleaner()
+                get_sentiment_analyzer()
+                app_logger.info(f"واجهة التحليل جاهزة ({self.workers} عامل)")
+
+    def stop(self):
+        """إيقاف مجمع العمليات"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._coalescer = None
+
+    async def _lifespan(self, receive, send):
+        """أحداث بدء وإيقاف الخادم"""
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await asyncio.get_running_loop().run_in_executor(None, self.start)
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.stop()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    # ------------------------------------------------------------------
+    # التحليل
+    # ------------------------------------------------------------------
+
+    async def _score_texts(self, texts, langs, method):
+        """تحليل نصوص خام: التنظيف في خيط والتحليل في مجمع العمليات"""
+        loop = asyncio.get_running_loop()
+        cleaner = get_text_cleaner()
+
+        cleaned = await loop.run_in_executor(None, lambda: [cleaner.clean_text(text) for text in texts])
+        future = self._coalescer.submit(cleaned, langs, method)
+        columns = await asyncio.wait_for(asyncio.wrap_future(future), SCORING_SERVICE_TIMEOUT)
+        # أعمدة 'cascade' فيها NaN للنصوص غير المحالة
+        return _json_columns(columns)
+
+    def _score_frame(self, df, method):
+        """دالة تحليل للسلسلة ترسل النصوص المنظفة إلى مجمع العمليات (تُستدعى من خيط)"""
+        texts = df['cleaned_text'].tolist()
+        langs = df['lang'].fillna('').tolist() if 'lang' in df.columns else [''] * len(texts)
+
+        columns = self._coalescer.submit(texts, langs, method).result(timeout=SCORING_SERVICE_TIMEOUT)
+        return df.join(pd.DataFrame(columns, index=df.index))
+
+    def _store_result(self, result_id, params, result):
+        """حفظ نتيجة تحليل للاستعلام اللاحق (LRU)"""
+        self._results[result_id] = {'params': params, **result}
+        self._results.move_to_end(result_id)
+        while len(self._results) > self.results_size:
+            self._results.popitem(last=False)
+
+    async def _analyze(self, params):
+        """تشغيل السلسلة الكاملة مع مشاركة الطلبات المتطابقة الجارية"""
+        key = pipeline_key(params['query'], params['count'], params['search_type'], params['lang']) \
+            + (params['method'],)
+        result_id = _result_id(key)
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            app_logger.info(f"مشاركة تحليل جارٍ لنفس الاستعلام: {params['query']}")
+            return await asyncio.shield(inflight)
+
+        loop = asyncio.get_running_loop()
+        task = loop.create_future()
+        self._inflight[key] = task
+
+        try:
+            token = CancellationToken(params['timeout']) if params['timeout'] else None
+            result = await loop.run_in_executor(None, lambda: run_pipeline(
+                params['query'], params['count'], params['search_type'], params['lang'], params['method'],
+                score=self._score_frame, token=token
+            ))
+
+            self._store_result(result_id, params, result)
+            response = {
+                'id': result_id,
+                'count': len(result['results_df']),
+                'partial': result['partial'],
+                'cached': result['cached'],
+                'stats': {name: _finite(value) for name, value in result['stats'].items()},
+                'top_words': result['word_freq_df'].to_dict('records'),
+                'timings': result.get('timings')
+            }
+            task.set_result(response)
+            return response
+        except Exception as e:
+            task.set_exception(e)
+            raise
+        finally:
+            # إلغاء الطلب الأول (انقطاع العميل أو إيقاف الخادم) لا يمر عبر except Exception؛
+            # الطلبات المشاركة تحصل على خطأ بدلاً من انتظار لا ينتهي
+            if not task.done():
+                task.set_exception(HTTPError(503, "analysis was interrupted, please retry"))
+            # تجنب تحذير "exception was never retrieved" عند عدم وجود طلبات مشاركة
+            task.exception()
+            del self._inflight[key]
+
+    def _get_result(self, result_id):
+        """نتيجة محفوظة أو خطأ 404"""
+        result = self._results.get(result_id)
+        if result is None:
+            raise HTTPError(404, f"unknown result id: {result_id}")
+        self._results.move_to_end(result_id)
+        return result
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+
+    async def _read_json(self, receive):
+        """قراءة جسم الطلب كـ JSON مع حد للحجم"""
+        max_bytes = API_MAX_BODY_MB * 1024 * 1024
+        chunks = []
+        size = 0
+
+        while True:
+            message = await receive()
+            body = message.get('body', b'')
+            size += len(body)
+            if size > max_bytes:
+                raise HTTPError(413, "request body too large")
+            chunks.append(body)
+            if not message.get('more_body', False):
+                break
+
+        try:
+            payload = json.loads(b''.join(chunks).decode('utf-8') or '{}')
+        except (ValueError, UnicodeDecodeError) as e:
+            raise HTTPError(400, f"invalid JSON: {str(e)}")
+
+        if not isinstance(payload, dict):
+            raise HTTPError(400, "JSON object expected")
+        return payload
+
+    @staticmethod
+    async def _send_json(send, status, payload):
+        """إرسال استجابة JSON (NaN ليس JSON صالحاً فيُرفض بدلاً من إرساله)"""
+        body = json.dumps(payload, ensure_ascii=False, allow_nan=False, default=_json_default).encode('utf-8')
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [
+                (b'content-type', b'application/json; charset=utf-8'),
+                (b'content-length', str(len(body)).encode('ascii'))
+            ]
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def _route(self, method, path, query, receive):
+        """توجيه الطلب إلى النقطة المناسبة"""
+        if method == 'GET' and path == '/health':
+            return {'status': 'ok', 'workers': self.workers, 'results': len(self._results)}
+
+        if method == 'POST' and path == '/score':
+            payload = await self._read_json(receive)
+            try:
+                texts, langs, method = _parse_score_payload(payload)
+            except ValueError as e:
+                raise HTTPError(400, str(e))
+
+            columns = await self._score_texts(texts, langs, method)
+            return {'columns': columns}
+
+        if method == 'POST' and path == '/analyze':
+            payload = await self._read_json(receive)
+            try:
+                params = {
+                    'query': str(payload['query']).strip(),
+                    'count': int(payload.get('count', 100)),
+                    'search_type': payload.get('search_type', 'keyword'),
+                    'lang': payload.get('lang', 'all'),
+                    'method': payload.get('method', 'textblob'),
+                    'timeout': float(payload['timeout']) if payload.get('timeout') else None
+                }
+                if not params['query']:
+                    raise ValueError("query is required")
+            except (KeyError, TypeError, ValueError) as e:
+                raise HTTPError(400, str(e))
+
+            return await self._analyze(params)
+
+        if method == 'GET' and path.startswith('/stats/'):
+            result = self._get_result(path[len('/stats/'):])
+            stats = {name: _finite(value) for name, value in result['stats'].items()}
+            return {'params': result['params'], 'partial': result['partial'], 'stats': stats}
+
+        if method == 'GET' and path.startswith('/timeline/'):
+            result = self._get_result(path[len('/timeline/'):])
+            freq = query.get('freq', ['hour'])[0]
+            if freq not in TIMELINE_FREQUENCIES:
+                raise HTTPError(400, f"freq must be one of {list(TIMELINE_FREQUENCIES)}")
+
+            timeline = get_sentiment_analyzer().analyze_sentiment_over_time(result['results_df'], freq=freq)
+            return {
+                'freq': freq,
+                'labels': [str(column) for column in timeline.columns],
+                'points': [
+                    {'time': index.isoformat(), 'values': [_finite(float(value)) for value in row]}
+                    for index, row in zip(timeline.index, timeline.to_numpy())
+                ]
+            }
+
+        raise HTTPError(404, "not found")
+
+    async def __call__(self, scope, receive, send):
+        """نقطة دخول ASGI"""
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+
+        if scope['type'] != 'http':
+            return
+
+        if self._coalescer is None:
+            await asyncio.get_running_loop().run_in_executor(None, self.start)
+
+        query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+
+        try:
+            payload = await self._route(scope['method'], scope['path'], query, receive)
+            await self._send_json(send, 200, payload)
+        except HTTPError as e:
+            await self._send_json(send, e.status, {'error': str(e)})
+        except AnalysisError as e:
+            await self._send_json(send, 400, {'error': str(e)})
+        except Exception as e:
+            app_logger.error(f"خطأ في واجهة التحليل: {str(e)}")
+            await self._send_json(send, 500, {'error': str(e)})
+
+
+app = SentimentAPI()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sentiment analysis ASGI API")
+    parser.add_argument('--host', default=API_HOST)
+    parser.add_argument('--port', type=int, default=API_PORT)
+    parser.add_argument('--workers', type=int, default=API_WORKERS, help="scoring processes")
+    args = parser.parse_args()
+
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit("uvicorn is required to serve the API: pip install uvicorn")
+
+    app.workers = args.workers
+    uvicorn.run(app, host=args.host, port=args.port, log_level='warning')
@@ -0,0 +1,244 @@
+"""
+تشغيل دفعي لعدة استعلامات بدون Streamlit (مناسب لمهام cron)
+
+الاستخدام:
+    python -m src.batch queries.csv --workers 4 --timeout 120
+
+ملف الاستعلامات CSV بعمود query إلزامي وأعمدة اختيارية:
+    search_type (keyword/hashtag)، lang (ar/en/all)، count، method
+
+يكتب نتائج كل استعلام بصيغة Parquet وجدول ملخص في مجلد داخل OUTPUT_DIR.
+لا يستورد Streamlit أو Plotly حتى يبدأ بسرعة.
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from datetime import datetime
+import pandas as pd
+from config.settings import (
+    OUTPUT_DIR, DEFAULT_TWEETS, BATCH_WORKERS, CSV_ENCODING, COMPACT_RESULTS, SUPPORTED_LANGUAGES
+)
+from utils.logger import app_logger
+from utils.error_handler import DataProcessingError
+from src.pipeline import run_pipeline, PIPELINE_STAGES
+from src.data_fetcher import CancellationToken
+from src.engines import ENGINE_REGISTRY
+from src.sentiment_analyzer import compact_results
+
+
+QUERY_DEFAULTS = {
+    'search_type': 'keyword',
+    'lang': 'all',
+    'count': DEFAULT_TWEETS,
+    'method': 'textblob'
+}
+
+SEARCH_TYPES = ('keyword', 'hashtag')
+
+
+def _validate_query(params):
+    """
+    التحقق من معاملات استعلام قبل تشغيله
+
+    Args:
+        params: معاملات الاستعلام (count نص كما في الملف)
+
+    Returns:
+        str: رسالة الخطأ أو None إذا كانت المعاملات صالحة (count يُحوَّل إلى int)
+    """
+    # عمود count في الملخص أعداد صحيحة فقط (القيمة غير الصالحة تظهر في رسالة الخطأ)
+    value = params['count']
+    params['count'] = None
+    try:
+        count = int(value)
+    except ValueError:
+        return f"عدد غير صالح: {value!r}"
+    if count <= 0:
+        return f"العدد يجب أن يكون موجباً: {count}"
+    params['count'] = count
+
+    if params['method'] not in ENGINE_REGISTRY:
+        return f"طريقة تحليل غير معروفة: {params['method']} (المتاح: {', '.join(sorted(ENGINE_REGISTRY))})"
+    if params['search_type'] not in SEARCH_TYPES:
+        return f"نوع بحث غير معروف: {params['search_type']}"
+    if params['lang'] not in SUPPORTED_LANGUAGES:
+        return f"لغة غير مدعومة: {params['lang']}"
+    return None
+
+
+def load_queries(path):
+    """
+    قراءة ملف الاستعلامات
+
+    Args:
+        path: مسار ملف CSV
+
+    Returns:
+        list: قائمة dict بمعاملات كل استعلام (الصف غير الصالح يحمل 'error' ولا يُشغَّل)
+    """
+    queries_df = pd.read_csv(path, dtype=str, keep_default_na=False, encoding=CSV_ENCODING)
+    queries_df.columns = [col.strip().lower() for col in queries_df.columns]
+
+    if 'query' not in queries_df.columns:
+        raise DataProcessingError(f"ملف الاستعلامات يجب أن يحتوي على عمود query: {path}")
+
+    queries = []
+    for row in queries_df.to_dict('records'):
+        if not row['query'].strip():
+            continue
+
+        params = {'query': row['query'].strip()}
+        for column, default in QUERY_DEFAULTS.items():
+            value = str(row.get(column, '')).strip()
+            params[column] = value or default
+
+        error = _validate_query(params)
+        if error is not None:
+            app_logger.error(f"استعلام غير صالح '{params['query']}': {error}")
+            params['error'] = error
+        queries.append(params)
+
+    return queries
+
+
+def _output_name(index, query):
+    """اسم ملف آمن لنتائج استعلام"""
+    safe_query = re.sub(r'[^\w\-]+', '_', query).strip('_') or 'query'
+    return f"{index:03d}_{safe_query[:50]}.parquet"
+
+
+def run_query(index, params, output_dir, timeout=None):
+    """
+    تشغيل استعلام واحد وكتابة نتائجه
+
+    Args:
+        index: ترتيب الاستعلام
+        params: معاملات الاستعلام
+        output_dir: مجلد الإخراج
+        timeout: أقصى مدة للجلب بالثواني
+
+    Returns:
+        dict: صف الملخص (المعاملات والإحصائيات والأوقات)
+    """
+    summary = dict(params)
+    start_time = time.perf_counter()
+
+    # صف غير صالح في الملف: خطأ في الملخص بدون تشغيل
+    if 'error' in params:
+        summary['total_s'] = 0.0
+        return summary
+
+    try:
+        token = CancellationToken(timeout) if timeout else None
+        result = run_pipeline(
+            params['query'], params['count'], params['search_type'], params['lang'], params['method'],
+            cache=False, token=token
+        )
+
+        summary.update({f'{stage}_s': round(result['timings'][stage], 3) for stage in PIPELINE_STAGES})
+        summary['fetched'] = len(result['results_df'])
+        summary['partial'] = result['partial']
+        summary.update(result['stats'])
+
+        write_start = time.perf_counter()
+        if not result['results_df'].empty:
+            results_df = result['results_df']
+            if COMPACT_RESULTS:
+                results_df = compact_results(results_df)
+
+            path = os.path.join(output_dir, _output_name(index, params['query']))
+            results_df.to_parquet(path, index=False)
+            summary['file'] = os.path.basename(path)
+        summary['write_s'] = round(time.perf_counter() - write_start, 3)
+
+    except Exception as e:
+        app_logger.error(f"فشل الاستعلام '{params['query']}': {str(e)}")
+        summary['error'] = str(e)
+
+    summary['total_s'] = round(time.perf_counter() - start_time, 3)
+    return summary
+
+
+def run_batch(queries, output_dir=None, workers=BATCH_WORKERS, timeout=None, use_processes=False):
+    """
+    تشغيل كل الاستعلامات بالتوازي
+
+    Args:
+        queries: قائمة معاملات الاستعلامات
+        output_dir: مجلد الإخراج (مجلد جديد داخل OUTPUT_DIR افتراضياً)
+        workers: عدد الاستعلامات المتوازية
+        timeout: أقصى مدة للجلب لكل استعلام
+        use_processes: عمليات بدلاً من خيوط (للتحليل الثقيل على المعالج)
+
+    Returns:
+        tuple: (DataFrame الملخص، مجلد الإخراج)
+    """
+    if output_dir is None:
+        output_dir = os.path.join(OUTPUT_DIR, f"batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    os.makedirs(output_dir, exist_ok=True)
+
+    executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    with executor_class(max_workers=max(1, workers)) as executor:
+        futures = [
+            executor.submit(run_query, index, params, output_dir, timeout)
+            for index, params in enumerate(queries, start=1)
+        ]
+        rows = [future.result() for future in futures]
+
+    summary_df = pd.DataFrame(rows)
+    summary_df.to_csv(os.path.join(output_dir, 'summary.csv'), index=False, encoding=CSV_ENCODING)
+    summary_df.to_parquet(os.path.join(output_dir, 'summary.parquet'), index=False)
+
+    return summary_df, output_dir
+
+
+def format_timings(summary_df):
+    """
+    جدول أوقات المراحل لكل استعلام مع المجموع
+
+    Args:
+        summary_df: DataFrame الملخص
+
+    Returns:
+        str: الجدول كنص
+    """
+    columns = [f'{stage}_s' for stage in PIPELINE_STAGES] + ['write_s', 'total_s']
+    columns = [col for col in columns if col in summary_df.columns]
+
+    timings_df = summary_df.set_index('query')[columns].fillna(0.0)
+    timings_df.loc['TOTAL'] = timings_df.sum()
+    return timings_df.round(3).to_string()
+
+
+def main(argv=None):
+    """نقطة الدخول من سطر الأوامر"""
+    parser = argparse.ArgumentParser(description="Batch sentiment analysis without the Streamlit UI")
+    parser.add_argument('queries', help="CSV file with a 'query' column (optional: search_type, lang, count, method)")
+    parser.add_argument('--workers', type=int, default=BATCH_WORKERS, help="queries run in parallel")
+    parser.add_argument('--timeout', type=float, default=None, help="fetch deadline per query in seconds")
+    parser.add_argument('--output-dir', default=None, help="output directory (default: new folder in OUTPUT_DIR)")
+    parser.add_argument('--processes', action='store_true', help="use processes instead of threads")
+    args = parser.parse_args(argv)
+
+    queries = load_queries(args.queries)
+    if not queries:
+        print("No queries found", file=sys.stderr)
+        return 1
+
+    start_time = time.perf_counter()
+    summary_df, output_dir = run_batch(
+        queries, args.output_dir, args.workers, args.timeout, args.processes
+    )
+
+    print(format_timings(summary_df))
+    failed = int(summary_df['error'].notna().sum()) if 'error' in summary_df.columns else 0
+    print(f"\n{len(queries) - failed}/{len(queries)} queries in {time.perf_counter() - start_time:.2f}s -> {output_dir}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
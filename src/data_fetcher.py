@@ -5,22 +5,184 @@ import tweepy
 import pandas as pd
 from datetime import datetime, timedelta
 import os
+import threading
+import time
+from collections import deque
 from dotenv import load_dotenv
 from utils.logger import app_logger
 from utils.error_handler import TwitterAPIError, handle_api_error
-from config.settings import MAX_TWEETS
+from config.settings import MAX_TWEETS, RATE_LIMIT_WINDOW, MAX_REQUESTS_PER_WINDOW
 
 # تحميل المتغيرات البيئية
 load_dotenv()
 
 
+class CancellationToken:
+    """إشارة إيقاف للجلب تُفحص بين الصفحات (إلغاء يدوي أو موعد نهائي)"""
+
+    def __init__(self, timeout=None):
+        """
+        تهيئة الإشارة
+
+        Args:
+            timeout: المهلة بالثواني من الآن (None بدون موعد نهائي)
+        """
+        self._event = threading.Event()
+        self.deadline = None
+        self.reason = None
+        # يضبطه مصدر الصفحات عندما يتوقف بسبب الإشارة قبل جلب العدد المطلوب
+        self.interrupted = False
+        if timeout:
+            self.set_deadline(timeout)
+
+    def set_deadline(self, timeout):
+        """
+        تحديد الموعد النهائي
+
+        Args:
+            timeout: المهلة بالثواني من الآن
+        """
+        self.deadline = time.monotonic() + timeout
+
+    def cancel(self, reason='cancelled'):
+        """
+        إيقاف الجلب
+
+        الإلغاء اليدوي يحل محل سبب 'deadline': المهمة تستمر بعد الموعد النهائي في
+        تحليل الصفحات التي وصلت، فإلغاؤها بعده هو ما يوقفها ويجب ألا يُعرض كانتهاء مهلة.
+
+        Args:
+            reason: سبب الإيقاف
+        """
+        if self.reason is None or (reason == 'cancelled' and self.reason == 'deadline'):
+            self.reason = reason
+        self._event.set()
+
+    def remaining(self):
+        """الوقت المتبقي حتى الموعد النهائي بالثواني (None بدون موعد)"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    @property
+    def stopped(self):
+        """هل يجب إيقاف الجلب"""
+        if not self._event.is_set() and self.deadline is not None and time.monotonic() >= self.deadline:
+            self.cancel('deadline')
+        return self._event.is_set()
+
+    def wait(self, seconds):
+        """
+        انتظار مع الاستيقاظ فور الإلغاء أو حلول الموعد النهائي
+
+        Args:
+            seconds: مدة الانتظار
+
+        Returns:
+            bool: True إذا توقف الجلب أثناء الانتظار
+        """
+        remaining = self.remaining()
+        if remaining is not None:
+            seconds = min(seconds, remaining)
+        self._event.wait(max(0.0, seconds))
+        return self.stopped
+
+
+class RateLimiter:
+    """ميزانية طلبات مشتركة بنافذة منزلقة (تتقاسمها كل عمليات الجلب المتزامنة)"""
+
+    def __init__(self, max_requests=MAX_REQUESTS_PER_WINDOW, window=RATE_LIMIT_WINDOW * 60):
+        """
+        تهيئة المحدد
+
+        Args:
+            max_requests: أقصى عدد طلبات في النافذة
+            window: طول النافذة بالثواني
+        """
+        self.max_requests = max_requests
+        self.window = window
+        self._timestamps = deque()
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        """حجز طلب إن أمكن، وإلا مدة الانتظار بالثواني"""
+        with self._lock:
+            now = time.monotonic()
+            while self._timestamps and now - self._timestamps[0] >= self.window:
+                self._timestamps.popleft()
+
+            if len(self._timestamps) < self.max_requests:
+                self._timestamps.append(now)
+                return 0.0
+            return self.window - (now - self._timestamps[0])
+
+    def acquire(self, token=None):
+        """
+        انتظار مكان في الميزانية قبل إرسال طلب
+
+        Args:
+            token: CancellationToken لانتظار قابل للإلغاء
+
+        Returns:
+            bool: False إذا توقف الجلب أثناء الانتظار
+        """
+        while True:
+            delay = self._reserve()
+            if delay <= 0:
+                return True
+
+            app_logger.warning(f"ميزانية الطلبات المشتركة مستنفدة، انتظار {delay:.0f} ثانية")
+            if token is None:
+                time.sleep(delay)
+            elif token.wait(delay):
+                return False
+
+    def get_stats(self):
+        """عدد الطلبات المستخدمة في النافذة الحالية"""
+        with self._lock:
+            now = time.monotonic()
+            used = sum(1 for stamp in self._timestamps if now - stamp < self.window)
+        return {'used': used, 'limit': self.max_requests, 'window': self.window}
+
+
+# ميزانية مشتركة على مستوى العملية (بين كل الجلسات والمهام)
+_limiter_lock = threading.Lock()
+_shared_limiter = None
+
+
+def get_rate_limiter():
+    """
+    الحصول على محدد الطلبات المشترك
+
+    Returns:
+        RateLimiter: المحدد المشترك
+    """
+    global _shared_limiter
+
+    if _shared_limiter is None:
+        with _limiter_lock:
+            if _shared_limiter is None:
+                _shared_limiter = RateLimiter()
+
+    return _shared_limiter
+
+
 class TwitterDataFetcher:
     """فئة لجلب البيانات من Twitter API"""
 
-    def __init__(self):
-        """تهيئة الاتصال بـ Twitter API"""
+    def __init__(self, wait_on_rate_limit=True, rate_limiter=None):
+        """
+        تهيئة الاتصال بـ Twitter API
+
+        Args:
+            wait_on_rate_limit: انتظار داخل tweepy عند تجاوز حد الطلبات
+                (False لانتظار قابل للإلغاء داخل iter_tweet_pages)
+            rate_limiter: ميزانية الطلبات (الافتراضية: المشتركة في العملية)
+        """
         self.client = None
         self.api = None
+        self.wait_on_rate_limit = wait_on_rate_limit
+        self.rate_limiter = rate_limiter or get_rate_limiter()
         self._setup_api()
 
     def _setup_api(self):
@@ -45,7 +207,7 @@ class TwitterDataFetcher:
                 consumer_secret=api_secret,
                 access_token=access_token,
                 access_token_secret=access_token_secret,
-                wait_on_rate_limit=True
+                wait_on_rate_limit=self.wait_on_rate_limit
             )
 
             app_logger.info("تم الاتصال بنجاح بـ Twitter API")
@@ -54,6 +216,111 @@ class TwitterDataFetcher:
             app_logger.error(f"فشل الاتصال بـ Twitter API: {str(e)}")
             raise TwitterAPIError(f"فشل الاتصال: {str(e)}")
 
+    def _build_query(self, query, search_type='keyword', lang='all'):
+        """
+        تنسيق استعلام البحث
+
+        Args:
+            query: نص البحث أو الهاشتاغ
+            search_type: نوع البحث ('keyword' أو 'hashtag')
+            lang: اللغة ('ar', 'en', 'all')
+
+        Returns:
+            str: الاستعلام النهائي
+        """
+        if search_type == 'hashtag':
+            if not query.startswith('#'):
+                query = f"#{query}"
+
+        # إضافة فلتر اللغة
+        if lang != 'all':
+            query = f"{query} lang:{lang}"
+
+        # إزالة الـ retweets للحصول على محتوى أصلي
+        return f"{query} -is:retweet"
+
+    def _rate_limit_delay(self, error):
+        """عدد الثواني حتى إعادة تعيين حد الطلبات"""
+        try:
+            reset = int(error.response.headers.get('x-rate-limit-reset'))
+            return max(1.0, reset - time.time() + 1)
+        except (AttributeError, TypeError, ValueError):
+            return RATE_LIMIT_WINDOW * 60
+
+    def iter_tweet_pages(self, query, count=100, search_type='keyword', lang='all', token=None):
+        """
+        جلب التغريدات صفحة بصفحة (حتى 100 تغريدة لكل طلب)
+
+        Args:
+            query: نص البحث أو الهاشتاغ
+            count: العدد الكلي المطلوب
+            search_type: نوع البحث ('keyword' أو 'hashtag')
+            lang: اللغة ('ar', 'en', 'all')
+            token: CancellationToken يُفحص قبل كل طلب؛ عند الإيقاف ينتهي الجلب
+                بالصفحات التي وصلت (token.reason يبين السبب)
+
+        Yields:
+            DataFrame: تغريدات كل صفحة
+        """
+        query = self._build_query(query, search_type, lang)
+        app_logger.info(f"جاري البحث عن: {query}")
+
+        remaining = count
+        next_token = None
+        page_number = 0
+
+        while remaining > 0:
+            if token is not None and token.stopped:
+                app_logger.warning(f"توقف الجلب ({token.reason}) بعد {count - remaining} تغريدة")
+                token.interrupted = True
+                return
+
+            # كل الاستعلامات المتزامنة تسحب من نفس الميزانية
+            if not self.rate_limiter.acquire(token):
+                app_logger.warning(f"توقف الجلب ({token.reason}) أثناء انتظار الميزانية")
+                token.interrupted = True
+                return
+
+            try:
+                tweets = self.client.search_recent_tweets(
+                    query=query,
+                    max_results=max(10, min(remaining, 100)),  # API limits per request
+                    next_token=next_token,
+                    tweet_fields=['created_at', 'public_metrics', 'lang', 'author_id'],
+                    expansions=['author_id'],
+                    user_fields=['username', 'name']
+                )
+            except tweepy.TooManyRequests as e:
+                if self.wait_on_rate_limit or token is None:
+                    success, message = handle_api_error(e, "fetch_tweets")
+                    raise TwitterAPIError(message)
+
+                # انتظار قابل للإلغاء بدلاً من نوم tweepy الذي لا يمكن مقاطعته
+                delay = self._rate_limit_delay(e)
+                app_logger.warning(f"تجاوز حد الطلبات، انتظار {delay:.0f} ثانية")
+                token.wait(delay)
+                continue
+            except tweepy.TweepyException as e:
+                success, message = handle_api_error(e, "fetch_tweets")
+                raise TwitterAPIError(message)
+            except Exception as e:
+                app_logger.error(f"خطأ غير متوقع: {str(e)}")
+                raise TwitterAPIError(f"خطأ في جلب البيانات: {str(e)}")
+
+            if not tweets.data:
+                break
+
+            page_df = self._parse_tweets(tweets).head(remaining)
+            remaining -= len(page_df)
+            page_number += 1
+
+            app_logger.info(f"الصفحة {page_number}: {len(page_df)} تغريدة")
+            yield page_df
+
+            next_token = (tweets.meta or {}).get('next_token')
+            if not next_token:
+                break
+
     def fetch_tweets(self, query, count=100, search_type='keyword', lang='all'):
         """
         جلب التغريدات حسب نوع البحث
@@ -67,46 +334,18 @@ class TwitterDataFetcher:
         Returns:
             DataFrame: بيانات التغريدات
         """
-        try:
-            # تنسيق الاستعلام
-            if search_type == 'hashtag':
-                if not query.startswith('#'):
-                    query = f"#{query}"
-
-            # إضافة فلتر اللغة
-            if lang != 'all':
-                query = f"{query} lang:{lang}"
-
-            # إزالة الـ retweets للحصول على محتوى أصلي
-            query = f"{query} -is:retweet"
-
-            app_logger.info(f"جاري البحث عن: {query}")
-
-            # جلب التغريدات من API v2
-            tweets = self.client.search_recent_tweets(
-                query=query,
-                max_results=min(count, 100),  # API limit per request
-                tweet_fields=['created_at', 'public_metrics', 'lang', 'author_id'],
-                expansions=['author_id'],
-                user_fields=['username', 'name']
-            )
+        pages = list(self.iter_tweet_pages(query, count, search_type, lang))
 
-            if not tweets.data:
-                app_logger.warning("لم يتم العثور على تغريدات")
-                return pd.DataFrame()
+        if not pages:
+            app_logger.warning("لم يتم العثور على تغريدات")
+            return pd.DataFrame()
 
-            # معالجة البيانات
-            tweets_data = self._parse_tweets(tweets)
+        tweets_data = pd.concat(pages, ignore_index=True)
+        if 'created_at' in tweets_data.columns:
+            tweets_data = tweets_data.sort_values('created_at', ascending=False).reset_index(drop=True)
 
-            app_logger.info(f"تم جلب {len(tweets_data)} تغريدة بنجاح")
-            return tweets_data
-
-        except tweepy.TweepyException as e:
-            success, message = handle_api_error(e, "fetch_tweets")
-            raise TwitterAPIError(message)
-        except Exception as e:
-            app_logger.error(f"خطأ غير متوقع: {str(e)}")
-            raise TwitterAPIError(f"خطأ في جلب البيانات: {str(e)}")
+        app_logger.info(f"تم جلب {len(tweets_data)} تغريدة بنجاح")
+        return tweets_data
 
     def _parse_tweets(self, tweets_response):
         """
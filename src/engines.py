@@ -0,0 +1,355 @@
+"""
+محركات تحليل المشاعر القابلة للتبديل وتقسيم الدفعات التلقائي
+"""
+import threading
+import time
+import numpy as np
+from config.settings import (
+    CASCADE_MARGIN, ENGINE_BATCH_LATENCY, ENGINE_MIN_BATCH, ENGINE_MAX_BATCH
+)
+from utils.error_handler import AnalysisError
+
+
+class SentimentEngine:
+    """
+    الواجهة الأساسية لمحركات التحليل
+
+    كل محرك يحلل دفعة نصوص ويرجع أعمدة النتائج كمصفوفات NumPy
+    (يجب أن تحتوي على عمود 'sentiment').
+    """
+
+    name = None
+
+    def __init__(self, analyzer):
+        """
+        تهيئة المحرك
+
+        Args:
+            analyzer: SentimentAnalyzer المالك للمحرك
+        """
+        self.analyzer = analyzer
+
+        # متوسط زمن النص الواحد (يستخدمه MicroBatcher لتحديد حجم الدفعة)
+        self.seconds_per_item = None
+
+    def score_batch(self, texts):
+        """
+        تحليل دفعة من النصوص
+
+        Args:
+            texts: قائمة النصوص
+
+        Returns:
+            dict: اسم العمود -> مصفوفة NumPy بطول texts
+        """
+        raise NotImplementedError
+
+    def align_columns(self, results, method):
+        """
+        تحويل أعمدة المحرك إلى أعمدة الطريقة المطلوبة (للمحركات الخاصة بلغة)
+
+        Args:
+            results: نتائج score_batch
+            method: طريقة التحليل المختارة
+
+        Returns:
+            dict: الأعمدة بعد التحويل
+        """
+        return results
+
+    def warm_up(self):
+        """تحميل الموارد مسبقاً بتحليل نص تجريبي"""
+        self.score_batch(["good"])
+
+
+class TextBlobEngine(SentimentEngine):
+    """محرك TextBlob"""
+
+    name = 'textblob'
+
+    def score_batch(self, texts):
+        polarity = np.zeros(len(texts))
+        subjectivity = np.zeros(len(texts))
+        sentiment = np.empty(len(texts), dtype=object)
+
+        for i, text in enumerate(texts):
+            analysis = self.analyzer.analyze_with_textblob(text)
+            polarity[i] = analysis['polarity']
+            subjectivity[i] = analysis['subjectivity']
+            sentiment[i] = analysis['sentiment']
+
+        return {
+            'polarity': polarity,
+            'subjectivity': subjectivity,
+            'sentiment': sentiment
+        }
+
+
+class VaderEngine(SentimentEngine):
+    """محرك VADER"""
+
+    name = 'vader'
+
+    def score_batch(self, texts):
+        compound = np.zeros(len(texts))
+        pos_score = np.zeros(len(texts))
+        neu_score = np.zeros(len(texts))
+        neg_score = np.zeros(len(texts))
+        sentiment = np.empty(len(texts), dtype=object)
+
+        for i, text in enumerate(texts):
+            analysis = self.analyzer.analyze_with_vader(text)
+            compound[i] = analysis['compound']
+            pos_score[i] = analysis['pos']
+            neu_score[i] = analysis['neu']
+            neg_score[i] = analysis['neg']
+            sentiment[i] = analysis['sentiment']
+
+        return {
+            'compound': compound,
+            'pos_score': pos_score,
+            'neu_score': neu_score,
+            'neg_score': neg_score,
+            'sentiment': sentiment
+        }
+
+
+class BothEngine(SentimentEngine):
+    """محرك TextBlob و VADER بتقسيم مشترك للنص"""
+
+    name = 'both'
+
+    def score_batch(self, texts):
+        return self.analyzer._score_both_batch(texts)
+
+
+class CascadeEngine(SentimentEngine):
+    """محرك متدرج: VADER ثم TextBlob للنصوص غير المحسومة"""
+
+    name = 'cascade'
+
+    def __init__(self, analyzer, margin=CASCADE_MARGIN):
+        super().__init__(analyzer)
+        self.margin = margin
+
+    def score_batch(self, texts):
+        return self.analyzer._score_cascade_batch(texts, self.margin)
+
+
+class ArabicLexiconEngine(SentimentEngine):
+    """محرك قاموس المشاعر العربي"""
+
+    name = 'arabic_lexicon'
+
+    def score_batch(self, texts):
+        score = np.zeros(len(texts))
+        subjectivity = np.zeros(len(texts))
+        pos = np.zeros(len(texts))
+        neu = np.zeros(len(texts))
+        neg = np.zeros(len(texts))
+        sentiment = np.empty(len(texts), dtype=object)
+
+        for i, text in enumerate(texts):
+            analysis = self.analyzer.analyze_with_arabic_lexicon(text)
+            score[i] = analysis['score']
+            subjectivity[i] = analysis['subjectivity']
+            pos[i] = analysis['pos']
+            neu[i] = analysis['neu']
+            neg[i] = analysis['neg']
+            sentiment[i] = analysis['sentiment']
+
+        return {
+            'score': score,
+            'subjectivity': subjectivity,
+            'pos': pos,
+            'neu': neu,
+            'neg': neg,
+            'sentiment': sentiment
+        }
+
+    def align_columns(self, results, method):
+        # نفس أعمدة الطريقة المختارة حتى تبقى النتائج موحدة
+        if method == 'textblob':
+            return {
+                'polarity': results['score'],
+                'subjectivity': results['subjectivity'],
+                'sentiment': results['sentiment']
+            }
+        if method == 'vader':
+            return {
+                'compound': results['score'],
+                'pos_score': results['pos'],
+                'neu_score': results['neu'],
+                'neg_score': results['neg'],
+                'sentiment': results['sentiment']
+            }
+        if method in ('both', 'cascade'):
+            return {
+                'tb_polarity': results['score'],
+                'tb_subjectivity': results['subjectivity'],
+                'vader_compound': results['score'],
+                'sentiment': results['sentiment']
+            }
+        return results
+
+
+class UnsupportedLanguageEngine(SentimentEngine):
+    """
+    محرك للغات بدون محرك يقرؤها: تصنيف محايد ودرجات فارغة (NaN)
+
+    بدلاً من درجات واثقة من محركات إنجليزية لنص لا تفهمه.
+    """
+
+    name = 'unsupported'
+
+    # أعمدة الدرجات لكل طريقة (تُملأ بـ NaN)
+    METHOD_COLUMNS = {
+        'textblob': ('polarity', 'subjectivity'),
+        'vader': ('compound', 'pos_score', 'neu_score', 'neg_score'),
+        'both': ('tb_polarity', 'tb_subjectivity', 'vader_compound'),
+        'cascade': ('tb_polarity', 'tb_subjectivity', 'vader_compound')
+    }
+
+    def score_batch(self, texts):
+        sentiment = np.empty(len(texts), dtype=object)
+        sentiment[:] = 'محايد'
+        return {'sentiment': sentiment}
+
+    def align_columns(self, results, method):
+        count = len(results['sentiment'])
+        aligned = {column: np.full(count, np.nan) for column in self.METHOD_COLUMNS.get(method, ())}
+        aligned['sentiment'] = results['sentiment']
+        return aligned
+
+    def warm_up(self):
+        pass
+
+
+# سجل المحركات: الاسم -> الفئة
+ENGINE_REGISTRY = {}
+_registry_lock = threading.Lock()
+
+
+def register_engine(engine_class, name=None):
+    """
+    تسجيل محرك جديد
+
+    Args:
+        engine_class: فئة مشتقة من SentimentEngine
+        name: اسم المحرك (الافتراضي engine_class.name)
+
+    Returns:
+        type: نفس الفئة (لاستخدامها كـ decorator)
+    """
+    name = name or engine_class.name
+    if not name:
+        raise AnalysisError("يجب تحديد اسم للمحرك")
+
+    with _registry_lock:
+        ENGINE_REGISTRY[name] = engine_class
+
+    return engine_class
+
+
+def available_engines():
+    """
+    أسماء المحركات المسجلة
+
+    Returns:
+        list: الأسماء
+    """
+    return sorted(ENGINE_REGISTRY)
+
+
+for _engine_class in (TextBlobEngine, VaderEngine, BothEngine, CascadeEngine, ArabicLexiconEngine,
+                      UnsupportedLanguageEngine):
+    register_engine(_engine_class)
+
+
+class MicroBatcher:
+    """تقسيم النصوص إلى دفعات يتكيف حجمها مع زمن استجابة مستهدف"""
+
+    def __init__(self, engine, target_latency=ENGINE_BATCH_LATENCY,
+                 min_batch=ENGINE_MIN_BATCH, max_batch=ENGINE_MAX_BATCH):
+        """
+        تهيئة المقسم
+
+        Args:
+            engine: SentimentEngine
+            target_latency: الزمن المستهدف لكل دفعة بالثواني
+                            (None لأكبر دفعة ممكنة، أي أعلى إنتاجية)
+            min_batch: أصغر حجم دفعة
+            max_batch: أكبر حجم دفعة
+        """
+        self.engine = engine
+        self.target_latency = target_latency
+        self.min_batch = min_batch
+        self.max_batch = max_batch
+
+    def next_batch_size(self):
+        """
+        حساب حجم الدفعة التالية من متوسط زمن النص الواحد
+
+        Returns:
+            int: حجم الدفعة
+        """
+        if self.target_latency is None:
+            return self.max_batch
+
+        if not self.engine.seconds_per_item:
+            return self.min_batch
+
+        size = int(self.target_latency / self.engine.seconds_per_item)
+        return max(self.min_batch, min(self.max_batch, size))
+
+    def _observe(self, count, elapsed):
+        """تحديث متوسط زمن النص الواحد (متوسط متحرك أسي)"""
+        if count == 0:
+            return
+
+        per_item = elapsed / count
+        if self.engine.seconds_per_item is None:
+            self.engine.seconds_per_item = per_item
+        else:
+            self.engine.seconds_per_item = 0.7 * self.engine.seconds_per_item + 0.3 * per_item
+
+    def iter_batches(self, texts):
+        """
+        تحليل النصوص دفعة بعد دفعة
+
+        Args:
+            texts: قائمة النصوص
+
+        Yields:
+            tuple: (موضع بداية الدفعة، نتائج الدفعة)
+        """
+        start = 0
+        while start < len(texts):
+            chunk = texts[start:start + self.next_batch_size()]
+
+            start_time = time.perf_counter()
+            results = self.engine.score_batch(chunk)
+            self._observe(len(chunk), time.perf_counter() - start_time)
+
+            yield start, results
+            start += len(chunk)
+
+    def score(self, texts):
+        """
+        تحليل كل النصوص ودمج نتائج الدفعات
+
+        Args:
+            texts: قائمة النصوص
+
+        Returns:
+            dict: اسم العمود -> مصفوفة NumPy بطول texts
+        """
+        batches = [results for _, results in self.iter_batches(texts)]
+
+        if not batches:
+            return self.engine.score_batch([])
+
+        return {
+            column: np.concatenate([batch[column] for batch in batches])
+            for column in batches[0]
+        }
@@ -0,0 +1,154 @@
+"""
+تصدير النتائج بعدة صيغ على دفعات من الصفوف
+
+كل دفعة تُحوَّل وتُكتب مباشرة إلى الملف، فلا تُنشأ نسخة كاملة من الجدول المحوَّل
+في الذاكرة (الأعمدة المختارة تُقتطع لكل دفعة أيضاً).
+
+الصيغ: parquet (zstd)، feather (zstd)، csv.gz، jsonl، csv
+"""
+import gzip
+import io
+import os
+from contextlib import contextmanager
+import pyarrow as pa
+import pyarrow.parquet as pq
+from config.settings import CSV_ENCODING, EXPORT_CHUNK_ROWS, EXPORT_COMPRESSION
+from utils.error_handler import DataProcessingError
+
+
+EXPORT_FORMATS = {
+    'parquet': {'label': 'Parquet (zstd)', 'extension': 'parquet', 'mime': 'application/vnd.apache.parquet'},
+    'feather': {'label': 'Feather', 'extension': 'feather', 'mime': 'application/vnd.apache.arrow.file'},
+    'csv.gz': {'label': 'CSV (gzip)', 'extension': 'csv.gz', 'mime': 'application/gzip'},
+    'jsonl': {'label': 'JSON Lines', 'extension': 'jsonl', 'mime': 'application/x-ndjson'},
+    'csv': {'label': 'CSV', 'extension': 'csv', 'mime': 'text/csv'}
+}
+
+
+def _arrow_schema(df, columns):
+    """
+    مخطط Arrow من كل صفوف الأعمدة المختارة (وليس من الدفعة الأولى فقط)
+
+    عمود نصي فارغ كله في الدفعة الأولى يُستنتج كنوع null فتفشل الدفعات التالية.
+    يُستنتج المخطط من الجدول كله ثم تُختار حقوله بدون نسخ الأعمدة.
+    """
+    full_schema = pa.Schema.from_pandas(df, preserve_index=False)
+    if columns is None:
+        return full_schema
+    return pa.schema([full_schema.field(col) for col in columns])
+
+
+def _iter_chunks(df, columns, chunk_rows):
+    """دفعات من الصفوف بالأعمدة المختارة (دفعة فارغة واحدة للجدول الفارغ حتى تُكتب الترويسة)"""
+    if columns is None:
+        columns = list(df.columns)
+
+    if df.empty:
+        yield df[columns]
+        return
+
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows][columns]
+
+
+@contextmanager
+def _binary_target(target):
+    """فتح المسار للكتابة أو استخدام كائن الملف كما هو (بدون إغلاقه)"""
+    if isinstance(target, (str, os.PathLike)):
+        with open(target, 'wb') as f:
+            yield f
+    else:
+        yield target
+
+
+@contextmanager
+def _text_target(binary, encoding):
+    """غلاف نصي فوق ملف ثنائي يُفصل في النهاية حتى لا يُغلق الملف الأصلي"""
+    text = io.TextIOWrapper(binary, encoding=encoding, newline='')
+    try:
+        yield text
+    finally:
+        text.flush()
+        text.detach()
+
+
+def _write_parquet(chunks, f, schema):
+    """Parquet: مجموعة صفوف لكل دفعة"""
+    with pq.ParquetWriter(f, schema, compression=EXPORT_COMPRESSION) as writer:
+        for chunk in chunks:
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+def _write_feather(chunks, f, schema):
+    """Feather (ملف Arrow IPC): دفعة سجلات لكل دفعة"""
+    options = pa.ipc.IpcWriteOptions(compression=EXPORT_COMPRESSION)
+    with pa.ipc.new_file(f, schema, options=options) as writer:
+        for chunk in chunks:
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+def _write_csv(chunks, f):
+    """CSV بترميز CSV_ENCODING (الترويسة مع الدفعة الأولى فقط)"""
+    with _text_target(f, CSV_ENCODING) as text:
+        for position, chunk in enumerate(chunks):
+            chunk.to_csv(text, header=position == 0, index=False)
+
+
+def _write_csv_gz(chunks, f):
+    """CSV مضغوط بـ gzip"""
+    with gzip.GzipFile(fileobj=f, mode='wb') as gz:
+        _write_csv(chunks, gz)
+
+
+def _write_jsonl(chunks, f):
+    """JSON Lines: سجل لكل سطر والتواريخ بصيغة ISO"""
+    with _text_target(f, 'utf-8') as text:
+        for chunk in chunks:
+            lines = chunk.to_json(orient='records', lines=True, force_ascii=False, date_format='iso')
+            if lines:
+                text.write(lines if lines.endswith('\n') else lines + '\n')
+
+
+_WRITERS = {
+    'parquet': _write_parquet,
+    'feather': _write_feather,
+    'csv.gz': _write_csv_gz,
+    'jsonl': _write_jsonl,
+    'csv': _write_csv
+}
+
+
+def export_frame(df, target, fmt='parquet', columns=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    تصدير DataFrame على دفعات
+
+    Args:
+        df: الجدول
+        target: مسار الملف أو كائن ملف ثنائي قابل للكتابة
+        fmt: الصيغة (من EXPORT_FORMATS)
+        columns: الأعمدة المطلوبة بالترتيب (None لكل الأعمدة)
+        chunk_rows: عدد الصفوف في كل دفعة
+
+    Returns:
+        int: عدد الصفوف المصدَّرة
+    """
+    if fmt not in _WRITERS:
+        raise DataProcessingError(f"صيغة تصدير غير مدعومة: {fmt}")
+
+    if columns is not None:
+        columns = list(columns)
+        if not columns:
+            raise DataProcessingError("لم يتم اختيار أي عمود للتصدير")
+        missing = [col for col in columns if col not in df.columns]
+        if missing:
+            raise DataProcessingError(f"أعمدة غير موجودة في النتائج: {missing}")
+
+    chunks = _iter_chunks(df, columns, max(1, chunk_rows))
+    with _binary_target(target) as f:
+        if fmt in ('parquet', 'feather'):
+            _WRITERS[fmt](chunks, f, _arrow_schema(df, columns))
+        else:
+            _WRITERS[fmt](chunks, f)
+
+    return len(df)
+
@@ -0,0 +1,454 @@
+"""
+مدير مهام التحليل في الخلفية (مستقل عن تشغيل سكربت Streamlit)
+
+كل مهمة تعمل في مجمع عمال محدود، ولها معرف وحالة وتقدم يمكن الاستعلام عنها،
+ويمكن إلغاؤها، وتُحفظ نتائجها على القرص لإعادة استخدامها من أي جلسة.
+"""
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from config.settings import JOB_WORKERS, JOB_HISTORY_SIZE, JOB_RESULTS_DIR, JOB_RESULTS_TTL
+from utils.logger import app_logger
+from src.aggregator import SentimentAggregate
+from src.data_fetcher import CancellationToken
+from src.pipeline import iter_pipeline, pipeline_key
+
+
+# حالات المهمة
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+JOB_CANCELLED = 'cancelled'
+
+FINISHED_STATES = (JOB_DONE, JOB_FAILED, JOB_CANCELLED)
+
+
+class JobCancelled(Exception):
+    """إلغاء المهمة أثناء التنفيذ"""
+    pass
+
+
+class AnalysisJob:
+    """مهمة تحليل واحدة وحالتها"""
+
+    def __init__(self, query, count, search_type='keyword', lang='all', method='textblob', timeout=None):
+        """
+        تهيئة المهمة
+
+        Args:
+            query: نص البحث
+            count: عدد التغريدات
+            search_type: نوع البحث
+            lang: رمز اللغة
+            method: طريقة التحليل
+            timeout: أقصى مدة للجلب بالثواني (None بدون حد)؛ عند انتهائها تكتمل المهمة
+                بالصفحات التي وصلت وتُعلَّم كنتيجة جزئية
+        """
+        self.id = uuid.uuid4().hex[:12]
+        self.params = {
+            'query': query,
+            'count': count,
+            'search_type': search_type,
+            'lang': lang,
+            'method': method
+        }
+        self.timeout = timeout
+        self.status = JOB_QUEUED
+        self.fetched = 0
+        self.error = None
+        self.cached = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cancelled_at = None
+        self.aggregate = None
+        self.result = None
+        self.partial = False
+        self.token = CancellationToken()
+        # الجلسات المشتركة في المهمة؛ تُلغى المهمة عند مغادرة آخرها
+        self.subscribers = set()
+
+    @property
+    def key(self):
+        """مفتاح المعاملات الموحدة (لمشاركة المهام المتطابقة)"""
+        params = self.params
+        return pipeline_key(params['query'], params['count'], params['search_type'], params['lang']) \
+            + (params['method'],)
+
+    @property
+    def progress(self):
+        """نسبة التقدم بين 0 و 1"""
+        if self.status == JOB_DONE:
+            return 1.0
+        return min(self.fetched / self.params['count'], 1.0) if self.params['count'] else 0.0
+
+    @property
+    def stop_by(self):
+        """الوقت (epoch) الذي يجب أن تتوقف عنده المهمة: الموعد النهائي أو وقت الإلغاء"""
+        times = []
+        if self.cancelled_at is not None:
+            times.append(self.cancelled_at)
+        if self.timeout and self.started_at is not None:
+            times.append(self.started_at + self.timeout)
+        return min(times) if times else None
+
+    def to_status(self):
+        """
+        حالة المهمة القابلة للعرض
+
+        Returns:
+            dict: الحالة (aggregate لقطة من الإحصائيات التراكمية الحالية)
+        """
+        return {
+            'id': self.id,
+            'status': self.status,
+            'progress': self.progress,
+            'fetched': self.fetched,
+            'params': dict(self.params),
+            'error': self.error,
+            'cached': self.cached,
+            'partial': self.partial,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'stop_by': self.stop_by,
+            'subscribers': len(self.subscribers),
+            'aggregate': self.aggregate
+        }
+
+
+class JobManager:
+    """مدير المهام: مجمع عمال محدود وسجل مهام وحفظ النتائج"""
+
+    def __init__(self, max_workers=JOB_WORKERS, results_dir=JOB_RESULTS_DIR,
+                 history_size=JOB_HISTORY_SIZE, score=None, results_ttl=JOB_RESULTS_TTL):
+        """
+        تهيئة المدير
+
+        Args:
+            max_workers: أقصى عدد مهام تعمل بالتوازي
+            results_dir: مجلد حفظ النتائج
+            history_size: عدد المهام المحفوظة (في الذاكرة وعلى القرص)
+            score: دالة تحليل (df, method) -> DataFrame (الافتراضية: المحلل المحلي)
+            results_ttl: مدة بقاء نتائج المهام على القرص بالثواني
+        """
+        self.results_dir = results_dir
+        self.history_size = history_size
+        self.score = score
+        self.results_ttl = results_ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='analysis-job')
+        self._jobs = OrderedDict()
+        self._active = {}
+        self._lock = threading.Lock()
+
+        self._prune_results()
+
+    def submit(self, query, count, search_type='keyword', lang='all', method='textblob', timeout=None,
+               subscriber=None):
+        """
+        إضافة مهمة تحليل (أو مشاركة مهمة مطابقة قيد التنفيذ)
+
+        Args:
+            query: نص البحث
+            count: عدد التغريدات
+            search_type: نوع البحث
+            lang: رمز اللغة
+            method: طريقة التحليل
+            timeout: أقصى مدة للجلب بالثواني
+            subscriber: معرف الجلسة الطالبة (يُمرر إلى cancel لمغادرة المهمة المشتركة)
+
+        Returns:
+            str: معرف المهمة
+        """
+        job = AnalysisJob(query, count, search_type, lang, method, timeout)
+        if subscriber is None:
+            subscriber = uuid.uuid4().hex
+
+        with self._lock:
+            active_id = self._active.get(job.key)
+            if active_id is not None:
+                self._jobs[active_id].subscribers.add(subscriber)
+                app_logger.info(f"مشاركة مهمة قائمة {active_id} لنفس الطلب")
+                return active_id
+
+            job.subscribers.add(subscriber)
+            self._jobs[job.id] = job
+            self._active[job.key] = job.id
+            evicted = self._trim_history()
+
+        for job_id in evicted:
+            shutil.rmtree(self._job_dir(job_id), ignore_errors=True)
+        self._prune_results()
+
+        self._executor.submit(self._run, job)
+        app_logger.info(f"تمت إضافة المهمة {job.id}: {query}")
+        return job.id
+
+    def _trim_history(self):
+        """
+        حذف أقدم المهام المنتهية من السجل (يُستدعى مع القفل)
+
+        Returns:
+            list: معرفات المهام المحذوفة (تُحذف مجلداتها خارج القفل)
+        """
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in FINISHED_STATES]
+        evicted = []
+        while len(self._jobs) > self.history_size and finished:
+            job_id = finished.pop(0)
+            del self._jobs[job_id]
+            evicted.append(job_id)
+        return evicted
+
+    def _prune_results(self):
+        """حذف مجلدات النتائج الأقدم من results_ttl (ومنها مجلدات تشغيل سابق)"""
+        if not os.path.isdir(self.results_dir):
+            return
+
+        cutoff = time.time() - self.results_ttl
+        with self._lock:
+            known = set(self._jobs)
+
+        for name in os.listdir(self.results_dir):
+            path = os.path.join(self.results_dir, name)
+            try:
+                if name not in known and os.path.getmtime(path) < cutoff:
+                    shutil.rmtree(path, ignore_errors=True)
+            except OSError:
+                continue
+
+    def _run(self, job):
+        """تنفيذ المهمة داخل عامل"""
+        if job.token.stopped:
+            self._finish(job, JOB_CANCELLED)
+            return
+
+        job.status = JOB_RUNNING
+        job.started_at = time.time()
+        if job.timeout:
+            job.token.set_deadline(job.timeout)
+
+        try:
+            for update in iter_pipeline(score=self.score, token=job.token, **job.params):
+                if update['stage'] == 'done':
+                    # الإلغاء اليدوي يتجاهل النتائج؛ الموعد النهائي يكمل بالعينة الجزئية
+                    if job.token.reason == 'cancelled':
+                        raise JobCancelled()
+
+                    job.result = {key: update[key] for key in ('results_df', 'stats', 'word_freq_df')}
+                    job.cached = update['cached']
+                    job.partial = update['partial']
+                    job.fetched = len(update['results_df'])
+                    job.aggregate = update['aggregate']
+                else:
+                    job.fetched = update['fetched']
+                    # لقطة مستقلة حتى لا تُقرأ الحالة أثناء تحديثها
+                    job.aggregate = SentimentAggregate.from_dict(update['aggregate'].to_dict())
+
+            if job.partial:
+                app_logger.warning(f"المهمة {job.id}: انتهت المهلة، نتيجة جزئية ({job.fetched} تغريدة)")
+
+            self._save_result(job)
+            self._finish(job, JOB_DONE)
+
+        except JobCancelled:
+            app_logger.info(f"تم إلغاء المهمة {job.id}")
+            self._finish(job, JOB_CANCELLED)
+        except Exception as e:
+            app_logger.error(f"فشلت المهمة {job.id}: {str(e)}")
+            job.error = str(e)
+            self._finish(job, JOB_FAILED)
+
+    def _finish(self, job, status):
+        """تسجيل انتهاء المهمة"""
+        job.status = status
+        job.finished_at = time.time()
+
+        with self._lock:
+            if self._active.get(job.key) == job.id:
+                del self._active[job.key]
+
+    def _job_dir(self, job_id):
+        """مجلد نتائج المهمة"""
+        return os.path.join(self.results_dir, job_id)
+
+    def _save_result(self, job):
+        """حفظ نتائج المهمة على القرص"""
+        job_dir = self._job_dir(job.id)
+        os.makedirs(job_dir, exist_ok=True)
+
+        job.result['results_df'].to_parquet(os.path.join(job_dir, 'results.parquet'))
+        job.result['word_freq_df'].to_parquet(os.path.join(job_dir, 'word_freq.parquet'))
+
+        meta = {
+            'id': job.id,
+            'params': job.params,
+            'partial': job.partial,
+            'stats': {key: float(value) if isinstance(value, float) else int(value)
+                      for key, value in job.result['stats'].items()},
+            'created_at': job.created_at,
+            'finished_at': time.time()
+        }
+        with open(os.path.join(job_dir, 'job.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+    def get_status(self, job_id):
+        """
+        حالة مهمة
+
+        Args:
+            job_id: معرف المهمة
+
+        Returns:
+            dict: الحالة أو None إذا لم توجد
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+
+        if job is not None:
+            return job.to_status()
+
+        meta_path = os.path.join(self._job_dir(job_id), 'job.json')
+        if not os.path.exists(meta_path):
+            return None
+
+        # مهمة منتهية خرجت من سجل الذاكرة
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+
+        return {
+            'id': job_id,
+            'status': JOB_DONE,
+            'progress': 1.0,
+            'fetched': meta['stats'].get('total', 0),
+            'params': meta['params'],
+            'error': None,
+            'cached': None,
+            'partial': meta.get('partial', False),
+            'created_at': meta['created_at'],
+            'started_at': None,
+            'finished_at': meta['finished_at'],
+            'stop_by': None,
+            'subscribers': 0,
+            'aggregate': None
+        }
+
+    def get_result(self, job_id):
+        """
+        نتائج مهمة منتهية (من الذاكرة أو من القرص)
+
+        Args:
+            job_id: معرف المهمة
+
+        Returns:
+            dict: results_df و stats و word_freq_df أو None إذا لم تكتمل
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            result = job.result if job is not None and job.status == JOB_DONE else None
+            if result is not None:
+                # تُسلَّم النتيجة من الذاكرة مرة واحدة؛ القراءات اللاحقة من القرص
+                # حتى لا يحتفظ سجل المهام بجداول كل المهام المنتهية
+                job.result = None
+
+        if result is not None:
+            return result
+
+        job_dir = self._job_dir(job_id)
+        meta_path = os.path.join(job_dir, 'job.json')
+        if not os.path.exists(meta_path):
+            return None
+
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+
+        return {
+            'results_df': pd.read_parquet(os.path.join(job_dir, 'results.parquet')),
+            'stats': meta['stats'],
+            'word_freq_df': pd.read_parquet(os.path.join(job_dir, 'word_freq.parquet'))
+        }
+
+    def cancel(self, job_id, subscriber=None):
+        """
+        إلغاء مهمة (تتوقف بين الصفحات)
+
+        مع subscriber تغادر الجلسة المهمة فقط، ولا تُلغى إلا عند مغادرة آخر جلسة
+        مشتركة فيها؛ بدونه تُلغى المهمة لكل الجلسات.
+
+        Args:
+            job_id: معرف المهمة
+            subscriber: معرف الجلسة المغادرة
+
+        Returns:
+            bool: True إذا كانت المهمة قيد الانتظار أو التنفيذ
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in FINISHED_STATES:
+                return False
+
+            if subscriber is not None:
+                job.subscribers.discard(subscriber)
+                if job.subscribers:
+                    app_logger.info(f"غادرت جلسة المهمة {job_id} ({len(job.subscribers)} مشترك متبقٍ)")
+                    return True
+
+        if job.cancelled_at is None:
+            job.cancelled_at = time.time()
+        job.token.cancel()
+        return True
+
+    def list_jobs(self):
+        """
+        حالات كل المهام في الذاكرة
+
+        Returns:
+            list: الحالات (الأحدث أولاً)
+        """
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [job.to_status() for job in reversed(jobs)]
+
+    def shutdown(self, wait=True):
+        """
+        إيقاف المدير وإلغاء المهام الجارية
+
+        Args:
+            wait: انتظار انتهاء العمال
+        """
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            job.token.cancel()
+        self._executor.shutdown(wait=wait)
+
+
+# مدير مشترك على مستوى العملية (بين جميع جلسات Streamlit)
+_manager_lock = threading.Lock()
+_shared_manager = None
+
+
+def get_job_manager(score=None):
+    """
+    الحصول على مدير المهام المشترك
+
+    Args:
+        score: دالة التحليل (تُستخدم عند الإنشاء الأول فقط)
+
+    Returns:
+        JobManager: المدير المشترك
+    """
+    global _shared_manager
+
+    if _shared_manager is None:
+        with _manager_lock:
+            if _shared_manager is None:
+                _shared_manager = JobManager(score=score)
+
+    return _shared_manager
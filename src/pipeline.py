@@ -0,0 +1,384 @@
+"""
+تشغيل سلسلة الجلب ← التنظيف ← التحليل مع ذاكرة مؤقتة مشتركة بين الجلسات
+
+كل صفحة مجلوبة تُنظف وتُحلل فوراً (iter_pipeline) لعرض نتائج أولية مبكراً.
+
+المرحلتان مخزنتان بشكل منفصل:
+    - الجلب: التغريدات المنظفة والكلمات الأكثر تكراراً (لا تعتمد على طريقة التحليل)
+    - التحليل: النتائج والإحصائيات لكل طريقة تحليل
+فتغيير طريقة التحليل فقط يعيد استخدام التغريدات المجلوبة والمنظفة.
+"""
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+import pandas as pd
+from config.settings import PIPELINE_CACHE_TTL, PIPELINE_CACHE_MAX_MB, PIPELINE_WORD_FREQ_TOP_N
+from utils.logger import app_logger
+
+
+def normalize_query(query, search_type='keyword'):
+    """
+    توحيد نص الاستعلام (البحث في تويتر لا يميز حالة الأحرف)
+
+    Args:
+        query: نص البحث
+        search_type: نوع البحث
+
+    Returns:
+        str: الاستعلام الموحد
+    """
+    normalized = ' '.join(str(query).split()).casefold()
+    if search_type == 'hashtag':
+        normalized = normalized.lstrip('#')
+    return normalized
+
+
+def pipeline_key(query, count, search_type='keyword', lang='all'):
+    """
+    مفتاح مرحلة الجلب من معاملات الطلب الموحدة
+
+    Returns:
+        tuple: المفتاح
+    """
+    return ('fetch', search_type, normalize_query(query, search_type), int(count), lang)
+
+
+def _estimate_size(value):
+    """تقدير حجم القيمة المخزنة في الذاكرة بالبايت"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, dict):
+        return sum(_estimate_size(item) for item in value.values()) + sys.getsizeof(value)
+    if isinstance(value, (list, tuple)):
+        return sum(_estimate_size(item) for item in value) + sys.getsizeof(value)
+    return sys.getsizeof(value)
+
+
+class PipelineCache:
+    """ذاكرة مؤقتة LRU بمدة صلاحية وحد أقصى للذاكرة"""
+
+    def __init__(self, ttl=PIPELINE_CACHE_TTL, max_bytes=PIPELINE_CACHE_MAX_MB * 1024 * 1024):
+        """
+        تهيئة الذاكرة المؤقتة
+
+        Args:
+            ttl: مدة صلاحية العنصر بالثواني
+            max_bytes: الحد الأقصى للحجم الكلي
+        """
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _remove(self, key):
+        """حذف عنصر (يُستدعى مع القفل)"""
+        entry = self._entries.pop(key)
+        self._total_bytes -= entry['size']
+
+    def _expire(self, now):
+        """حذف العناصر المنتهية (يُستدعى مع القفل)"""
+        expired = [key for key, entry in self._entries.items() if now - entry['created'] > self.ttl]
+        for key in expired:
+            self._remove(key)
+
+    def get(self, key):
+        """
+        الحصول على قيمة مخزنة
+
+        Args:
+            key: المفتاح
+
+        Returns:
+            القيمة أو None إذا لم توجد أو انتهت صلاحيتها
+        """
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or now - entry['created'] > self.ttl:
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry['value']
+
+    def put(self, key, value):
+        """
+        تخزين قيمة مع حذف الأقدم استخداماً عند تجاوز الحد
+
+        Args:
+            key: المفتاح
+            value: القيمة (يجب عدم تعديلها بعد التخزين)
+        """
+        size = _estimate_size(value)
+        if size > self.max_bytes:
+            app_logger.warning(f"النتيجة أكبر من حد الذاكرة المؤقتة ({size // 1024} KB)، لن تُخزن")
+            return
+
+        now = time.monotonic()
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._expire(now)
+            self._entries[key] = {'value': value, 'size': size, 'created': now}
+            self._total_bytes += size
+
+            while self._total_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def clear(self):
+        """مسح كل العناصر"""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def get_stats(self):
+        """
+        إحصائيات الذاكرة المؤقتة
+
+        Returns:
+            dict: عدد العناصر والحجم ونسب الإصابة
+        """
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+
+# ذاكرة مؤقتة مشتركة على مستوى العملية (بين جميع جلسات Streamlit)
+_cache_lock = threading.Lock()
+_shared_cache = None
+
+
+def get_pipeline_cache():
+    """
+    الحصول على الذاكرة المؤقتة المشتركة للنتائج
+
+    Returns:
+        PipelineCache: الذاكرة المشتركة
+    """
+    global _shared_cache
+
+    if _shared_cache is None:
+        with _cache_lock:
+            if _shared_cache is None:
+                _shared_cache = PipelineCache()
+
+    return _shared_cache
+
+
+# مراحل السلسلة (لقياس الوقت)
+PIPELINE_STAGES = ('fetch', 'clean', 'analyze', 'stats')
+
+_END_OF_PAGES = object()
+
+
+def _default_fetch_pages(query, count, search_type, lang, token=None):
+    """جلب التغريدات صفحة بصفحة عبر Twitter API (انتظار حد الطلبات قابل للإلغاء مع token)"""
+    from src.data_fetcher import TwitterDataFetcher
+    fetcher = TwitterDataFetcher(wait_on_rate_limit=token is None)
+    return fetcher.iter_tweet_pages(query, count, search_type, lang, token=token)
+
+
+def iter_pipeline(query, count, search_type='keyword', lang='all', method='textblob',
+                  fetch=None, fetch_pages=None, score=None, cache=None, freq='hour', token=None):
+    """
+    تشغيل السلسلة كتدفق: تنظيف وتحليل كل صفحة فور وصولها
+
+    Args:
+        query: نص البحث
+        count: عدد التغريدات
+        search_type: نوع البحث ('keyword' أو 'hashtag')
+        lang: رمز اللغة ('ar', 'en', 'all')
+        method: طريقة التحليل
+        fetch: دالة جلب كاملة (query, count, search_type, lang) -> DataFrame
+        fetch_pages: دالة جلب صفحات (query, count, search_type, lang) -> مكرر DataFrame
+        score: دالة تحليل (df, method) -> DataFrame
+        cache: PipelineCache (المشتركة افتراضياً، False لتعطيلها)
+        freq: دقة التوزيع الزمني التراكمي
+        token: CancellationToken؛ عند الإيقاف يكمل التحليل بالصفحات التي وصلت
+
+    Yields:
+        dict: بعد كل صفحة: stage='page' مع page_df و aggregate (SentimentAggregate تراكمي) و fetched؛
+              وأخيراً stage='done' مع results_df و stats و word_freq_df و aggregate و cached و partial
+              و timings (الثواني المستغرقة في كل مرحلة من PIPELINE_STAGES)
+    """
+    from src.text_cleaner import get_text_cleaner
+    from src.sentiment_analyzer import get_sentiment_analyzer
+    from src.aggregator import SentimentAggregate
+
+    if cache is None:
+        cache = get_pipeline_cache()
+
+    analyzer = get_sentiment_analyzer()
+    cleaner = get_text_cleaner()
+    fetch_key = pipeline_key(query, count, search_type, lang)
+    analysis_key = ('analysis',) + fetch_key[1:] + (method,)
+
+    # الوقت المستغرق داخل كل مرحلة (بدون وقت المستهلك بين الصفحات)
+    timings = dict.fromkeys(PIPELINE_STAGES, 0.0)
+
+    @contextmanager
+    def timed(stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            timings[stage] += time.perf_counter() - start
+
+    def score_frame(df):
+        with timed('analyze'):
+            if score is not None:
+                return score(df, method)
+            return analyzer.analyze_dataframe(df, method=method)
+
+    def finish(results_df, word_freq_df, aggregate, cached_stage, partial=False):
+        with timed('stats'):
+            stats = analyzer.get_sentiment_statistics(results_df)
+        return {
+            'stage': 'done',
+            'results_df': results_df,
+            'stats': stats,
+            'word_freq_df': word_freq_df,
+            'aggregate': aggregate,
+            'cached': cached_stage,
+            'partial': partial,
+            'timings': timings
+        }
+
+    if cache:
+        cached = cache.get(analysis_key)
+        if cached is not None:
+            app_logger.info(f"إعادة استخدام نتائج التحليل المخزنة: {query}")
+            yield dict(cached, stage='done', aggregate=SentimentAggregate(freq).update(cached['results_df']),
+                       cached='analysis', partial=False, timings=timings)
+            return
+
+        fetched = cache.get(fetch_key)
+        if fetched is not None:
+            app_logger.info(f"إعادة استخدام التغريدات المنظفة المخزنة: {query}")
+            results_df = score_frame(fetched['tweets_df'])
+            result = finish(results_df, fetched['word_freq_df'], SentimentAggregate(freq).update(results_df), 'fetch')
+            if not results_df.empty:
+                cache.put(analysis_key, {key: result[key] for key in ('results_df', 'stats', 'word_freq_df')})
+            yield result
+            return
+
+    with timed('fetch'):
+        if fetch is not None:
+            pages = iter([fetch(query, count, search_type, lang)])
+        elif fetch_pages is not None:
+            pages = iter(fetch_pages(query, count, search_type, lang))
+        else:
+            pages = _default_fetch_pages(query, count, search_type, lang, token=token)
+
+    aggregate = SentimentAggregate(freq)
+    cleaned_pages = []
+    scored_pages = []
+    fetched_count = 0
+
+    while True:
+        with timed('fetch'):
+            page_df = next(pages, _END_OF_PAGES)
+        if page_df is _END_OF_PAGES:
+            break
+
+        if page_df is None or page_df.empty:
+            continue
+
+        fetched_count += len(page_df)
+        with timed('clean'):
+            page_df = cleaner.clean_dataframe(page_df)
+        if page_df.empty:
+            continue
+
+        scored_df = score_frame(page_df)
+        with timed('stats'):
+            aggregate.update(scored_df)
+        cleaned_pages.append(page_df)
+        scored_pages.append(scored_df)
+
+        yield {
+            'stage': 'page',
+            'page_df': scored_df,
+            'aggregate': aggregate,
+            'fetched': fetched_count
+        }
+
+        # الصفحات التي وصلت تُحلل؛ لا تُطلب صفحات جديدة بعد الإيقاف. مصدر الصفحات
+        # يفحص الإشارة قبل كل طلب فينتهي فوراً ويضبط token.interrupted إذا بقيت صفحات؛
+        # مصدر لا يفحصها ويعيد صفحة أخرى يُعتبر قد توقف قبل اكتماله
+        if token is not None and token.stopped:
+            with timed('fetch'):
+                if next(pages, _END_OF_PAGES) is not _END_OF_PAGES:
+                    token.interrupted = True
+            break
+
+    # عينة جزئية فقط إذا توقف الجلب فعلاً قبل اكتماله (وليس إذا حل الموعد النهائي
+    # بعد وصول كل الصفحات، أو كانت الصفحة الأخيرة قصيرة لأن النتائج انتهت)
+    partial = token is not None and token.interrupted
+
+    if not scored_pages:
+        yield finish(pd.DataFrame(), pd.DataFrame(), aggregate, None, partial)
+        return
+
+    with timed('stats'):
+        tweets_df = pd.concat(cleaned_pages, ignore_index=True)
+        results_df = pd.concat(scored_pages, ignore_index=True)
+        word_freq_df = cleaner.get_word_frequency(tweets_df, top_n=PIPELINE_WORD_FREQ_TOP_N)
+    result = finish(results_df, word_freq_df, aggregate, None, partial)
+
+    # النتائج الجزئية لا تُخزن حتى لا تحل محل الجلب الكامل
+    if cache and not partial:
+        cache.put(fetch_key, {'tweets_df': tweets_df, 'word_freq_df': word_freq_df})
+        cache.put(analysis_key, {key: result[key] for key in ('results_df', 'stats', 'word_freq_df')})
+
+    yield result
+
+
+def run_pipeline(query, count, search_type='keyword', lang='all', method='textblob',
+                 fetch=None, fetch_pages=None, score=None, cache=None, token=None):
+    """
+    تشغيل السلسلة الكاملة مع إعادة استخدام المراحل المخزنة
+
+    Args:
+        query: نص البحث
+        count: عدد التغريدات
+        search_type: نوع البحث ('keyword' أو 'hashtag')
+        lang: رمز اللغة ('ar', 'en', 'all')
+        method: طريقة التحليل
+        fetch: دالة جلب كاملة (query, count, search_type, lang) -> DataFrame
+        fetch_pages: دالة جلب صفحات (query, count, search_type, lang) -> مكرر DataFrame
+        score: دالة تحليل (df, method) -> DataFrame
+        cache: PipelineCache (المشتركة افتراضياً، False لتعطيلها)
+        token: CancellationToken للإيقاف مع الاحتفاظ بالصفحات التي وصلت
+
+    Returns:
+        dict: results_df و stats و word_freq_df و aggregate و cached ('analysis' أو 'fetch' أو None)
+              و partial (True إذا توقف الجلب قبل اكتماله) و timings
+    """
+    result = None
+    for result in iter_pipeline(query, count, search_type, lang, method,
+                                fetch=fetch, fetch_pages=fetch_pages, score=score, cache=cache, token=token):
+        pass
+    return result
@@ -0,0 +1,308 @@
+"""
+إنشاء تقارير HTML مستقلة من نتائج التحليل (بدون Streamlit)
+
+الاستخدام:
+    from src.report import ReportBuilder
+    path = ReportBuilder().write_report(results_df, stats, word_freq_df, query='python')
+"""
+import html
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+import plotly.io as pio
+from plotly.offline import get_plotlyjs, get_plotlyjs_version
+from config.settings import OUTPUT_DIR, REPORT_EXTREMES_COUNT, REPORT_WORKERS
+from config.translations import get_text, get_direction
+from utils.logger import app_logger
+from src.visualizer import SentimentVisualizer
+
+
+_REPORT_STYLE = """
+body{font-family:-apple-system,'Segoe UI',Tahoma,sans-serif;margin:0;padding:24px;background:#f7f7f9;color:#222}
+h1{margin:0 0 4px}.meta{color:#666;margin-bottom:24px}
+.cards{display:flex;gap:16px;flex-wrap:wrap;margin-bottom:24px}
+.card{flex:1;min-width:160px;background:#fff;border-radius:8px;padding:16px;border-top:4px solid #999}
+.card .value{font-size:28px;font-weight:bold}.card .pct{color:#666}
+.chart{background:#fff;border-radius:8px;margin-bottom:24px;min-height:420px}
+table{width:100%;border-collapse:collapse;background:#fff;margin-bottom:24px}
+th,td{padding:8px;border-bottom:1px solid #eee;text-align:start;vertical-align:top}
+"""
+
+# يطبق القالب المشترك على كل رسم قبل عرضه
+_RENDER_SCRIPT = """
+(function(){
+var template=JSON.parse(document.getElementById('plotly-template').textContent);
+document.querySelectorAll('script[data-figure]').forEach(function(node){
+var fig=JSON.parse(node.textContent);fig.layout=fig.layout||{};fig.layout.template=template;
+Plotly.newPlot(node.getAttribute('data-figure'),fig.data,fig.layout,{responsive:true});
+});
+})();
+"""
+
+
+@lru_cache(maxsize=1)
+def _plotly_js():
+    """نص مكتبة plotly.js (يُقرأ مرة واحدة لكل عملية)"""
+    return get_plotlyjs()
+
+
+@lru_cache(maxsize=1)
+def _shared_template_json():
+    """قالب Plotly الافتراضي بصيغة JSON مضغوطة (يُضمَّن مرة واحدة في التقرير)"""
+    template = pio.templates[pio.templates.default]
+    return json.dumps(template.to_plotly_json(), separators=(',', ':'), default=str)
+
+
+def _script_safe(text):
+    """منع إنهاء وسم script من داخل بيانات JSON"""
+    return text.replace('</', '<\\/')
+
+
+class ReportBuilder:
+    """فئة لإنشاء تقارير HTML في ملف واحد"""
+
+    def __init__(self, visualizer=None, output_dir=OUTPUT_DIR, include_plotlyjs=True):
+        """
+        تهيئة منشئ التقارير
+
+        Args:
+            visualizer: SentimentVisualizer (يُنشأ تلقائياً إذا لم يُحدد)
+            output_dir: مجلد حفظ التقارير
+            include_plotlyjs: تضمين plotly.js في الملف (False لتحميلها من CDN)
+        """
+        self.visualizer = visualizer or SentimentVisualizer()
+        self.output_dir = output_dir
+        self.include_plotlyjs = include_plotlyjs
+
+    def _figure_payload(self, figure_json):
+        """
+        JSON مضغوط للرسم بدون القالب (القالب مشترك بين كل الرسوم)
+
+        Args:
+            figure_json: JSON الرسم من SentimentVisualizer.figure_json
+
+        Returns:
+            str: JSON الرسم
+        """
+        figure = json.loads(figure_json)
+        figure.get('layout', {}).pop('template', None)
+        return json.dumps(figure, separators=(',', ':'), ensure_ascii=False)
+
+    def _build_figures(self, df, word_freq_df, time_sentiment, lang):
+        """
+        بناء رسوم التقرير المتاحة حسب أعمدة البيانات
+
+        Returns:
+            list: أزواج (المعرف، JSON الرسم)
+        """
+        figures = []
+
+        if 'sentiment' in df.columns and not df.empty:
+            figures.append(('chart-distribution', self.visualizer.figure_json(
+                'plot_sentiment_pie', df['sentiment'].value_counts(), get_text('chart_sentiment_dist', lang)
+            )))
+
+        if word_freq_df is not None and not word_freq_df.empty:
+            figures.append(('chart-keywords', self.visualizer.figure_json(
+                'plot_word_frequency_bar', word_freq_df, get_text('chart_word_freq', lang), top_n=15
+            )))
+
+        if time_sentiment is not None and not time_sentiment.empty:
+            figures.append(('chart-timeline', self.visualizer.figure_json(
+                'plot_sentiment_timeline', time_sentiment, get_text('chart_timeline', lang)
+            )))
+
+        if {'likes', 'retweets', 'sentiment'}.issubset(df.columns) and not df.empty:
+            figures.append(('chart-engagement', self.visualizer.figure_json(
+                'plot_engagement_sentiment', df, get_text('chart_engagement', lang)
+            )))
+
+        return figures
+
+    def _stats_cards_html(self, stats, lang):
+        """بطاقات الإحصائيات من create_stats_cards"""
+        cards = self.visualizer.create_stats_cards(stats)
+        parts = [
+            f'<div class="card"><div>{html.escape(get_text("total_tweets", lang))}</div>'
+            f'<div class="value">{stats.get("total", 0)}</div></div>'
+        ]
+
+        for key, card in cards.items():
+            parts.append(
+                f'<div class="card" style="border-top-color:{card["color"]}">'
+                f'<div>{html.escape(get_text(key, lang))}</div>'
+                f'<div class="value">{card["value"]}</div>'
+                f'<div class="pct">{card["percentage"]}%</div></div>'
+            )
+
+        return f'<div class="cards">{"".join(parts)}</div>'
+
+    def _extremes_html(self, extremes, lang):
+        """جدول أكثر التغريدات إيجابية وسلبية"""
+        sections = []
+
+        for key in ('most_positive', 'most_negative'):
+            frame = extremes.get(key)
+            if frame is None or frame.empty:
+                continue
+
+            score_col = next((col for col in ('polarity', 'compound', 'score') if col in frame.columns), None)
+            text_col = 'text' if 'text' in frame.columns else 'cleaned_text'
+
+            rows = []
+            for _, row in frame.iterrows():
+                score = f'{row[score_col]:.3f}' if score_col else ''
+                rows.append(
+                    f'<tr><td dir="auto">{html.escape(str(row.get(text_col, "")))}</td>'
+                    f'<td>{html.escape(str(row.get("sentiment", "")))}</td><td>{score}</td></tr>'
+                )
+
+            sections.append(
+                f'<h2>{html.escape(get_text(key, lang))}</h2>'
+                f'<table><thead><tr><th>{html.escape(get_text("tab_tweets", lang))}</th>'
+                f'<th>{html.escape(get_text("column_sentiment", lang))}</th>'
+                f'<th>{html.escape(get_text("column_score", lang))}</th></tr></thead>'
+                f'<tbody>{"".join(rows)}</tbody></table>'
+            )
+
+        return ''.join(sections)
+
+    def build_html(self, df, stats, word_freq_df=None, query='', lang='en',
+                   time_sentiment=None, extremes=None):
+        """
+        بناء تقرير HTML كامل
+
+        Args:
+            df: DataFrame مع نتائج التحليل
+            stats: dict الإحصائيات (من get_sentiment_statistics)
+            word_freq_df: DataFrame الكلمات الأكثر تكراراً
+            query: الاستعلام
+            lang: لغة التقرير ('en' أو 'ar')
+            time_sentiment: التطور الزمني (يُحسب تلقائياً إذا لم يُحدد)
+            extremes: أكثر التغريدات تطرفاً (تُحسب تلقائياً إذا لم تُحدد)
+
+        Returns:
+            str: محتوى HTML
+        """
+        if time_sentiment is None or extremes is None:
+            from src.sentiment_analyzer import get_sentiment_analyzer
+            analyzer = get_sentiment_analyzer()
+
+            if time_sentiment is None and 'created_at' in df.columns:
+                try:
+                    time_sentiment = analyzer.analyze_sentiment_over_time(df)
+                except Exception as e:
+                    app_logger.warning(f"تعذر حساب التطور الزمني للتقرير: {str(e)}")
+
+            if extremes is None:
+                extremes = analyzer.get_extreme_sentiments(df, n=REPORT_EXTREMES_COUNT)
+
+        figures = self._build_figures(df, word_freq_df, time_sentiment, lang)
+
+        chart_divs = ''.join(f'<div class="chart" id="{fig_id}"></div>' for fig_id, _ in figures)
+        figure_scripts = ''.join(
+            f'<script type="application/json" data-figure="{fig_id}">{_script_safe(self._figure_payload(figure_json))}</script>'
+            for fig_id, figure_json in figures
+        )
+
+        if self.include_plotlyjs:
+            plotly_script = f'<script>{_plotly_js()}</script>'
+        else:
+            # نفس إصدار plotly.js المطابق لمكتبة plotly المثبتة (plotly-latest متوقف عند 1.58)
+            plotly_script = f'<script src="https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js"></script>'
+
+        title = html.escape(get_text('report_title', lang, query=query))
+        generated = html.escape(get_text('report_generated', lang, time=datetime.now().strftime('%Y-%m-%d %H:%M')))
+
+        return (
+            f'<!DOCTYPE html><html lang="{lang}" dir="{get_direction(lang)}"><head><meta charset="utf-8">'
+            f'<meta name="viewport" content="width=device-width,initial-scale=1">'
+            f'<title>{title}</title><style>{_REPORT_STYLE}</style>{plotly_script}</head><body>'
+            f'<h1>{title}</h1><div class="meta">{generated}</div>'
+            f'{self._stats_cards_html(stats, lang)}{chart_divs}'
+            f'{self._extremes_html(extremes or {}, lang)}'
+            f'<script type="application/json" id="plotly-template">{_script_safe(_shared_template_json())}</script>'
+            f'{figure_scripts}<script>{_RENDER_SCRIPT}</script></body></html>'
+        )
+
+    def write_report(self, df, stats, word_freq_df=None, query='', lang='en', filename=None, **kwargs):
+        """
+        حفظ التقرير في ملف داخل مجلد الإخراج
+
+        Args:
+            df: DataFrame مع نتائج التحليل
+            stats: dict الإحصائيات
+            word_freq_df: DataFrame الكلمات الأكثر تكراراً
+            query: الاستعلام
+            lang: لغة التقرير
+            filename: اسم الملف (يُولَّد من الاستعلام والوقت إذا لم يُحدد)
+            **kwargs: معاملات إضافية لـ build_html
+
+        Returns:
+            str: مسار الملف
+        """
+        content = self.build_html(df, stats, word_freq_df, query=query, lang=lang, **kwargs)
+
+        if filename is None:
+            safe_query = re.sub(r'[^\w\-]+', '_', query).strip('_') or 'report'
+            filename = f"sentiment_report_{safe_query}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, filename)
+
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+        app_logger.info(f"تم حفظ التقرير: {path} ({len(content) // 1024} KB)")
+        return path
+
+
+def _write_report_in_worker(output_dir, include_plotlyjs, report):
+    """إنشاء تقرير واحد داخل عملية عاملة"""
+    builder = ReportBuilder(output_dir=output_dir, include_plotlyjs=include_plotlyjs)
+    return builder.write_report(**report)
+
+
+def build_reports(reports, output_dir=OUTPUT_DIR, include_plotlyjs=True, max_workers=REPORT_WORKERS):
+    """
+    إنشاء تقارير لعدة استعلامات بالتوازي
+
+    Args:
+        reports: قائمة dict بمعاملات write_report (df, stats, word_freq_df, query, lang, ...)
+        output_dir: مجلد حفظ التقارير
+        include_plotlyjs: تضمين plotly.js في كل ملف
+        max_workers: عدد العمليات (1 للتنفيذ في العملية الحالية)
+
+    Returns:
+        list: مسارات الملفات بنفس ترتيب reports
+    """
+    if max_workers <= 1 or len(reports) <= 1:
+        builder = ReportBuilder(output_dir=output_dir, include_plotlyjs=include_plotlyjs)
+        return [builder.write_report(**report) for report in reports]
+
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(reports))) as executor:
+        futures = [
+            executor.submit(_write_report_in_worker, output_dir, include_plotlyjs, report)
+            for report in reports
+        ]
+        return [future.result() for future in futures]
+
+
+def quick_report(df, stats, word_freq_df=None, query='', lang='en'):
+    """
+    إنشاء تقرير سريع
+
+    Args:
+        df: DataFrame النتائج
+        stats: الإحصائيات
+        word_freq_df: الكلمات الأكثر تكراراً
+        query: الاستعلام
+        lang: اللغة
+
+    Returns:
+        str: مسار الملف
+    """
+    return ReportBuilder().write_report(df, stats, word_freq_df, query=query, lang=lang)
@@ -0,0 +1,401 @@
+"""
+مخزن نتائج الجلسات بحد ذاكرة مشترك
+
+كل جلسة Streamlit تحفظ جداول نتائجها هنا بدلاً من st.session_state. عند تجاوز
+الحد تُنقل جداول الجلسات الأقدم استخداماً إلى ملفات Feather مضغوطة على القرص
+وتُعاد إلى الذاكرة عند طلبها. الجلسات غير المستخدمة لمدة RESULT_STORE_TTL تُحذف.
+"""
+import os
+import shutil
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+import pandas as pd
+from config.settings import RESULT_STORE_MAX_MB, RESULT_STORE_DIR, RESULT_STORE_TTL
+from utils.logger import app_logger
+from src.pipeline import _estimate_size
+
+
+def process_rss():
+    """
+    ذاكرة العملية الحالية (RSS) بالبايت
+
+    Returns:
+        int: الحجم أو None إذا تعذرت القراءة
+    """
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+
+    try:
+        import resource
+        # القيمة القصوى وليست الحالية (بالبايت على macOS وبالكيلوبايت على غيره)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except (ImportError, OSError):
+        return None
+
+
+def _to_feather(df, path):
+    """
+    كتابة DataFrame بصيغة Feather (تتطلب فهرساً افتراضياً فيُحفظ الفهرس كأعمدة)
+
+    Returns:
+        dict: أعمدة الفهرس وأسماؤه الأصلية أو None للفهرس الافتراضي
+    """
+    index = df.index
+    if isinstance(index, pd.RangeIndex) and index.start == 0 and index.step == 1:
+        df.reset_index(drop=True).to_feather(path)
+        return None
+
+    index_columns = [f'__index_{level}__' for level in range(index.nlevels)]
+    df.rename_axis(index_columns).reset_index().to_feather(path)
+    return {'columns': index_columns, 'names': list(index.names)}
+
+
+def _from_feather(path, index_info):
+    """قراءة DataFrame من Feather واستعادة الفهرس"""
+    df = pd.read_feather(path)
+    if index_info is not None:
+        df = df.set_index(index_info['columns']).rename_axis(index_info['names'])
+    return df
+
+
+class SessionResultStore:
+    """جداول نتائج الجلسات: LRU في الذاكرة ضمن حد أقصى مع نقل الفائض إلى القرص"""
+
+    # المجلد الفرعي الخاص بالمخزن داخل spill_dir (وحده يُمسح عند البدء)
+    STORE_SUBDIR = 'result-store'
+
+    def __init__(self, max_bytes=RESULT_STORE_MAX_MB * 1024 * 1024, spill_dir=RESULT_STORE_DIR,
+                 ttl=RESULT_STORE_TTL):
+        """
+        تهيئة المخزن (ملفات تشغيل سابق في مجلده الفرعي داخل spill_dir تُحذف)
+
+        Args:
+            max_bytes: الحد الأقصى لحجم الجداول في الذاكرة لكل الجلسات
+            spill_dir: المجلد الذي يُنشأ فيه مجلد المخزن (STORE_SUBDIR)
+            ttl: مدة بقاء جلسة غير مستخدمة بالثواني
+        """
+        self.max_bytes = max_bytes
+        self.spill_dir = os.path.join(spill_dir, self.STORE_SUBDIR)
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._memory_bytes = 0
+        # حجم الجداول التي تُكتب الآن إلى القرص (لا تُختار مرة أخرى للنقل)
+        self._spilling_bytes = 0
+        self.spills = 0
+        self.reloads = 0
+
+        shutil.rmtree(self.spill_dir, ignore_errors=True)
+
+    def _session_dir(self, key):
+        """مجلد ملفات الجلسة"""
+        return os.path.join(self.spill_dir, key)
+
+    def _frame_path(self, key, entry, name):
+        """
+        ملف جدول منقول إلى القرص
+
+        الاسم يتضمن معرف الإدخال: كتابة جارية لإدخال حُذف أو استُبدل لا تمس ملفات الإدخال الجديد.
+        """
+        return os.path.join(self._session_dir(key), f"{name}-{entry['id']}.feather")
+
+    def _remove(self, key):
+        """
+        حذف جلسة من الذاكرة (يُستدعى مع القفل)
+
+        Returns:
+            str: مجلد ملفات الجلسة (يُحذف بعد ترك القفل بـ _discard)
+        """
+        entry = self._entries.pop(key)
+        if entry['frames'] is not None:
+            self._memory_bytes -= entry['size']
+
+        # نقل المجلد باسم مؤقت سريع؛ حذف محتواه (الجداول المنقولة وملفات التصدير) خارج القفل
+        session_dir = self._session_dir(key)
+        trash_dir = f"{session_dir}.deleted-{entry['id']}"
+        try:
+            os.rename(session_dir, trash_dir)
+        except OSError:
+            return None
+        return trash_dir
+
+    @staticmethod
+    def _discard(paths):
+        """حذف مجلدات الجلسات المحذوفة (بدون القفل)"""
+        for path in paths:
+            if path is not None:
+                shutil.rmtree(path, ignore_errors=True)
+
+    def _expire(self, now):
+        """حذف الجلسات غير المستخدمة (يُستدعى مع القفل)"""
+        expired = [key for key, entry in self._entries.items() if now - entry['used'] > self.ttl]
+        return [self._remove(key) for key in expired]
+
+    def _touch(self, key, entry):
+        """تسجيل استخدام الجلسة (يُستدعى مع القفل)"""
+        entry['used'] = time.monotonic()
+        self._entries.move_to_end(key)
+
+    def _select_spills(self, keep):
+        """
+        اختيار الجلسات الأقدم استخداماً لنقلها إلى القرص حتى يعود الحجم تحت الحد (يُستدعى مع القفل)
+
+        الجلسات المختارة تُعلَّم كجارية النقل؛ الكتابة نفسها في _spill بعد ترك القفل.
+
+        Returns:
+            list: (المفتاح، الإدخال، وقت آخر استخدام)
+        """
+        selected = []
+
+        def select(key, entry):
+            entry['spilling'] = True
+            self._spilling_bytes += entry['size']
+            selected.append((key, entry, entry['used']))
+
+        def over_budget():
+            return self._memory_bytes - self._spilling_bytes > self.max_bytes
+
+        for key, entry in self._entries.items():
+            if not over_budget():
+                break
+            if key != keep and entry['frames'] is not None and not entry['spilling']:
+                select(key, entry)
+
+        # الجلسة الحالية وحدها أكبر من الحد
+        entry = self._entries.get(keep)
+        if over_budget() and entry is not None and entry['frames'] is not None and not entry['spilling']:
+            select(keep, entry)
+
+        return selected
+
+    def _spill(self, key, entry, used):
+        """
+        نقل جداول جلسة إلى القرص (بدون القفل العام حتى لا تنتظر الجلسات الأخرى الكتابة)
+
+        تبقى الجداول في الذاكرة إذا استُخدمت الجلسة أثناء الكتابة، وتُحذف الملفات
+        إذا حُذفت الجلسة أو استُبدلت.
+        """
+        with entry['io']:
+            index = entry['index']
+            # الجداول لا تتغير بعد الحفظ، فملفات نقل سابق ما زالت صالحة
+            if index is None:
+                try:
+                    os.makedirs(self._session_dir(key), exist_ok=True)
+                    index = {
+                        name: _to_feather(df, self._frame_path(key, entry, name))
+                        for name, df in entry['frames'].items()
+                    }
+                except OSError as e:
+                    app_logger.error(f"تعذر نقل نتائج الجلسة {key} إلى القرص: {str(e)}")
+                    index = None
+
+            with self._lock:
+                entry['spilling'] = False
+                self._spilling_bytes -= entry['size']
+
+                current = self._entries.get(key) is entry
+                spilled = current and index is not None and entry['used'] == used
+                if current and index is not None:
+                    entry['index'] = index
+                if spilled:
+                    entry['frames'] = None
+                    self._memory_bytes -= entry['size']
+                    self.spills += 1
+
+            if not current and index is not None and entry['index'] is None:
+                for name in index:
+                    try:
+                        os.remove(self._frame_path(key, entry, name))
+                    except OSError:
+                        pass
+
+        if spilled:
+            app_logger.info(f"نقل نتائج الجلسة {key} إلى القرص ({entry['size'] // 1024} KB)")
+
+    def _run_spills(self, selected):
+        """تنفيذ النقل المختار بـ _select_spills (بدون القفل)"""
+        for key, entry, used in selected:
+            self._spill(key, entry, used)
+
+    def put(self, key, **frames):
+        """
+        حفظ جداول جلسة (تستبدل جداولها السابقة وتحذف ملفاتها)
+
+        تُحفظ نسخة من الجداول: الأصلية قد تكون مشتركة مع ذاكرة السلسلة المؤقتة،
+        فلا يحرر نقلها إلى القرص أي ذاكرة ويُحسب حجمها مرتين.
+
+        Args:
+            key: معرف الجلسة
+            **frames: الجداول بالاسم
+        """
+        frames = {name: df.copy() for name, df in frames.items()}
+        size = sum(_estimate_size(df) for df in frames.values())
+        now = time.monotonic()
+
+        with self._lock:
+            removed = [self._remove(key)] if key in self._entries else []
+            removed += self._expire(now)
+            self._entries[key] = {
+                'id': uuid.uuid4().hex[:8],
+                'frames': frames,
+                'index': None,
+                'size': size,
+                'used': now,
+                'spilling': False,
+                'io': threading.Lock()
+            }
+            self._memory_bytes += size
+            selected = self._select_spills(keep=key)
+
+        self._discard(removed)
+        self._run_spills(selected)
+
+    def get(self, key):
+        """
+        جداول جلسة (تُقرأ من القرص إذا نُقلت إليه)
+
+        القراءة من القرص تتم بدون القفل العام؛ قفل الإدخال يمنع قراءتين أو قراءة
+        ونقلاً متزامنين لنفس الجلسة.
+
+        Args:
+            key: معرف الجلسة
+
+        Returns:
+            dict: الجداول بالاسم أو None إذا لم توجد
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            frames = entry['frames']
+            if frames is not None:
+                self._touch(key, entry)
+                frames = dict(frames)
+                selected = self._select_spills(keep=key)
+
+        if frames is None:
+            with entry['io']:
+                with self._lock:
+                    if self._entries.get(key) is not entry:
+                        return None
+                    frames = entry['frames']
+                    index = entry['index']
+
+                # لم تقرأها جلسة أخرى أثناء الانتظار
+                if frames is None:
+                    try:
+                        frames = {
+                            name: _from_feather(self._frame_path(key, entry, name), index_info)
+                            for name, index_info in index.items()
+                        }
+                    except OSError:
+                        # حُذفت الجلسة أثناء القراءة
+                        return None
+
+                with self._lock:
+                    if self._entries.get(key) is not entry:
+                        return dict(frames)
+                    if entry['frames'] is None:
+                        entry['frames'] = frames
+                        self._memory_bytes += entry['size']
+                        self.reloads += 1
+                    self._touch(key, entry)
+                    frames = dict(entry['frames'])
+                    selected = self._select_spills(keep=key)
+
+        self._run_spills(selected)
+        return frames
+
+    def file_path(self, key, filename):
+        """
+        مسار ملف خاص بالجلسة على القرص (يُحذف مع الجلسة أو عند حفظ نتائج جديدة لها)
+
+        Args:
+            key: معرف الجلسة
+            filename: اسم الملف
+
+        Returns:
+            str: المسار أو None إذا لم توجد الجلسة
+        """
+        with self._lock:
+            if key not in self._entries:
+                return None
+
+        session_dir = self._session_dir(key)
+        os.makedirs(session_dir, exist_ok=True)
+        return os.path.join(session_dir, os.path.basename(filename))
+
+    def drop(self, key):
+        """
+        حذف جداول جلسة
+
+        Args:
+            key: معرف الجلسة
+        """
+        with self._lock:
+            removed = [self._remove(key)] if key in self._entries else []
+
+        self._discard(removed)
+
+    def get_stats(self):
+        """
+        إحصائيات المخزن واستهلاك ذاكرة العملية
+
+        Returns:
+            dict: عدد الجلسات في الذاكرة وعلى القرص والأحجام وعدد النقل والاسترجاع
+        """
+        with self._lock:
+            in_memory = sum(1 for entry in self._entries.values() if entry['frames'] is not None)
+            keys = list(self._entries)
+            stats = {
+                'sessions': len(self._entries),
+                'in_memory': in_memory,
+                'on_disk': len(self._entries) - in_memory,
+                'memory_bytes': self._memory_bytes,
+                'max_bytes': self.max_bytes,
+                'spills': self.spills,
+                'reloads': self.reloads
+            }
+
+        # أحجام الملفات تُقرأ خارج القفل
+        disk_bytes = 0
+        for key in keys:
+            try:
+                with os.scandir(self._session_dir(key)) as items:
+                    disk_bytes += sum(item.stat().st_size for item in items if item.is_file())
+            except OSError:
+                continue
+
+        stats['disk_bytes'] = disk_bytes
+        stats['rss_bytes'] = process_rss()
+        return stats
+
+
+# مخزن مشترك على مستوى العملية (بين جميع جلسات Streamlit)
+_store_lock = threading.Lock()
+_shared_store = None
+
+
+def get_result_store():
+    """
+    الحصول على مخزن النتائج المشترك
+
+    Returns:
+        SessionResultStore: المخزن المشترك
+    """
+    global _shared_store
+
+    if _shared_store is None:
+        with _store_lock:
+            if _shared_store is None:
+                _shared_store = SessionResultStore()
+
+    return _shared_store
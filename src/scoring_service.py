@@ -0,0 +1,361 @@
+"""
+خدمة تحليل محلية تجمع طلبات جلسات Streamlit في دفعات مشتركة
+
+التشغيل:
+    python -m src.scoring_service --port 8765 --workers 2
+
+ثم تعيين SCORING_SERVICE_URL=http://127.0.0.1:8765 في ملف .env
+"""
+import argparse
+import json
+import math
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FuturesTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pandas as pd
+import requests
+from config.settings import (
+    SCORING_SERVICE_HOST, SCORING_SERVICE_PORT, SCORING_SERVICE_WORKERS,
+    SCORING_SERVICE_MAX_WAIT, SCORING_SERVICE_MAX_BATCH, SCORING_SERVICE_TIMEOUT
+)
+from utils.logger import app_logger
+from utils.error_handler import AnalysisError
+from src.sentiment_analyzer import compact_results
+
+
+def _init_worker():
+    """تجهيز المحركات مرة واحدة في كل عملية عاملة"""
+    from src.sentiment_analyzer import warm_up_engines
+    warm_up_engines()
+
+
+def _score_in_worker(texts, langs, method):
+    """
+    تحليل دفعة مجمعة داخل عملية عاملة
+
+    Args:
+        texts: النصوص
+        langs: رمز لغة كل نص
+        method: طريقة التحليل
+
+    Returns:
+        dict: اسم العمود -> قائمة القيم
+    """
+    from src.sentiment_analyzer import get_sentiment_analyzer
+
+    df = pd.DataFrame({'cleaned_text': texts, 'lang': langs})
+    result = get_sentiment_analyzer().analyze_dataframe(df, method=method)
+
+    return {
+        column: result[column].tolist()
+        for column in result.columns
+        if column not in ('cleaned_text', 'lang')
+    }
+
+
+def _parse_score_payload(payload):
+    """
+    التحقق من جسم طلب /score
+
+    Args:
+        payload: JSON الطلب (dict)
+
+    Returns:
+        tuple: (texts, langs, method)
+
+    Raises:
+        ValueError: texts ليست قائمة نصوص أو langs لا تطابقها
+    """
+    texts = payload.get('texts')
+    if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+        raise ValueError("texts must be a list of strings")
+
+    langs = payload.get('langs') or [''] * len(texts)
+    if not isinstance(langs, list) or not all(lang is None or isinstance(lang, str) for lang in langs):
+        raise ValueError("langs must be a list of strings")
+    if len(langs) != len(texts):
+        raise ValueError("langs must match texts")
+
+    method = payload.get('method', 'textblob')
+    if not isinstance(method, str):
+        raise ValueError("method must be a string")
+
+    return texts, [lang or '' for lang in langs], method
+
+
+def _json_columns(columns):
+    """
+    أعمدة النتائج بقيم صالحة في JSON
+
+    أعمدة 'cascade' فيها NaN للنصوص التي لم تُحل إلى المحرك الثاني، و json.dumps
+    يكتبها NaN حرفياً وهو ليس JSON صالحاً لغير Python؛ تُحوَّل NaN و inf إلى null.
+    """
+    return {
+        column: [
+            None if isinstance(value, float) and not math.isfinite(value) else value
+            for value in values
+        ]
+        for column, values in columns.items()
+    }
+
+
+class RequestCoalescer:
+    """تجميع الطلبات المتزامنة في دفعات وإرسالها إلى مجموعة العمال"""
+
+    def __init__(self, executor, max_wait=SCORING_SERVICE_MAX_WAIT,
+                 max_batch=SCORING_SERVICE_MAX_BATCH):
+        """
+        تهيئة المجمّع
+
+        Args:
+            executor: مجموعة العمال (ProcessPoolExecutor)
+            max_wait: أقصى انتظار لتجميع طلبات إضافية بالثواني
+            max_batch: أقصى عدد نصوص في الدفعة الواحدة
+        """
+        self.executor = executor
+        self.max_wait = max_wait
+        self.max_batch = max_batch
+        self.requests = queue.Queue()
+
+        self._thread = threading.Thread(target=self._run, name='scoring-coalescer', daemon=True)
+        self._thread.start()
+
+    def submit(self, texts, langs, method):
+        """
+        إضافة طلب تحليل
+
+        Args:
+            texts: النصوص
+            langs: رمز لغة كل نص
+            method: طريقة التحليل
+
+        Returns:
+            Future: نتيجة الطلب (dict أعمدة)
+        """
+        future = Future()
+        self.requests.put((texts, langs, method, future))
+        return future
+
+    def _collect(self):
+        """انتظار أول طلب ثم جمع ما يصل خلال max_wait"""
+        pending = [self.requests.get()]
+        size = len(pending[0][0])
+        deadline = time.monotonic() + self.max_wait
+
+        while size < self.max_batch:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = self.requests.get(timeout=timeout)
+            except queue.Empty:
+                break
+            pending.append(item)
+            size += len(item[0])
+
+        return pending
+
+    def _run(self):
+        """حلقة التجميع الرئيسية"""
+        while True:
+            pending = self._collect()
+
+            by_method = {}
+            for item in pending:
+                # الطلبات الملغاة (انتهاء مهلة المنتظر) تُستبعد؛ والباقية لا يمكن إلغاؤها
+                # بعد الآن فلا يفشل set_result لها أثناء توزيع نتائج الدفعة
+                if item[3].set_running_or_notify_cancel():
+                    by_method.setdefault(item[2], []).append(item)
+
+            for method, items in by_method.items():
+                texts = [text for item in items for text in item[0]]
+                langs = [lang for item in items for lang in item[1]]
+
+                app_logger.info(f"دفعة مجمعة: {len(items)} طلب، {len(texts)} نص ({method})")
+
+                try:
+                    future = self.executor.submit(_score_in_worker, texts, langs, method)
+                except Exception as e:
+                    for item in items:
+                        item[3].set_exception(e)
+                    continue
+
+                future.add_done_callback(
+                    lambda done, items=items: self._dispatch(done, items)
+                )
+
+    @staticmethod
+    def _dispatch(done, items):
+        """توزيع نتائج الدفعة على الطلبات الأصلية"""
+        try:
+            columns = done.result()
+        except Exception as e:
+            for item in items:
+                item[3].set_exception(e)
+            return
+
+        offset = 0
+        for texts, _, _, future in items:
+            count = len(texts)
+            future.set_result({
+                column: values[offset:offset + count]
+                for column, values in columns.items()
+            })
+            offset += count
+
+
+class ScoringRequestHandler(BaseHTTPRequestHandler):
+    """معالج طلبات HTTP للخدمة"""
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False, allow_nan=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send_json(200, {'status': 'ok'})
+        else:
+            self._send_json(404, {'error': 'not found'})
+
+    def do_POST(self):
+        if self.path != '/score':
+            self._send_json(404, {'error': 'not found'})
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length).decode('utf-8'))
+            if not isinstance(payload, dict):
+                raise ValueError("JSON object expected")
+            texts, langs, method = _parse_score_payload(payload)
+        except (ValueError, KeyError, TypeError) as e:
+            self._send_json(400, {'error': str(e)})
+            return
+
+        future = self.server.coalescer.submit(texts, langs, method)
+        try:
+            columns = future.result(timeout=SCORING_SERVICE_TIMEOUT)
+            self._send_json(200, {'columns': _json_columns(columns)})
+        except FuturesTimeoutError:
+            # الطلب ما زال في طابور المجمّع: إلغاؤه حتى لا يُحلل بلا منتظر
+            future.cancel()
+            app_logger.error("انتهت مهلة طلب في خدمة التحليل")
+            self._send_json(504, {'error': 'scoring timed out'})
+        except Exception as e:
+            app_logger.error(f"خطأ في خدمة التحليل: {str(e)}")
+            self._send_json(500, {'error': str(e)})
+
+    def log_message(self, format, *args):
+        # تجنب طباعة كل طلب في stderr
+        pass
+
+
+def run_service(host=SCORING_SERVICE_HOST, port=SCORING_SERVICE_PORT,
+                workers=SCORING_SERVICE_WORKERS):
+    """
+    تشغيل خدمة التحليل (تعمل حتى الإيقاف)
+
+    Args:
+        host: عنوان الاستماع
+        port: المنفذ
+        workers: عدد العمليات العاملة
+    """
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        server = ThreadingHTTPServer((host, port), ScoringRequestHandler)
+        server.daemon_threads = True
+        server.coalescer = RequestCoalescer(executor)
+
+        app_logger.info(f"خدمة التحليل تعمل على http://{host}:{port} ({workers} عامل)")
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+
+
+class ScoringClient:
+    """عميل خفيف لخدمة التحليل المحلية"""
+
+    def __init__(self, url, timeout=SCORING_SERVICE_TIMEOUT):
+        """
+        تهيئة العميل
+
+        Args:
+            url: عنوان الخدمة (مثل http://127.0.0.1:8765)
+            timeout: مهلة الطلب بالثواني
+        """
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+
+    def is_available(self):
+        """
+        التحقق من أن الخدمة تعمل
+
+        Returns:
+            bool: الخدمة متاحة
+        """
+        try:
+            return requests.get(f"{self.url}/health", timeout=1).ok
+        except requests.RequestException:
+            return False
+
+    def analyze_dataframe(self, df, text_column='cleaned_text', method='textblob', lang_column='lang',
+                          compact=False):
+        """
+        تحليل DataFrame عبر الخدمة (نفس نتيجة SentimentAnalyzer.analyze_dataframe)
+
+        Args:
+            df: DataFrame يحتوي على النصوص
+            text_column: عمود النصوص
+            method: طريقة التحليل
+            lang_column: عمود اللغة
+            compact: أعمدة درجات float32 وعمود sentiment من نوع category
+
+        Returns:
+            DataFrame: مع أعمدة نتائج التحليل
+        """
+        if df.empty:
+            return df
+
+        payload = {
+            'texts': df[text_column].fillna('').astype(str).tolist(),
+            'langs': (
+                df[lang_column].fillna('').astype(str).tolist()
+                if lang_column in df.columns else None
+            ),
+            'method': method
+        }
+
+        try:
+            response = requests.post(f"{self.url}/score", json=payload, timeout=self.timeout)
+            response.raise_for_status()
+            columns = response.json()['columns']
+        except (requests.RequestException, ValueError, KeyError) as e:
+            raise AnalysisError(f"فشل الاتصال بخدمة التحليل: {str(e)}")
+
+        results_df = pd.DataFrame(columns, index=df.index)
+        # NaN تصل null، فعمود درجات فارغ كله يصبح object بدلاً من float
+        empty = [column for column in results_df.columns if results_df[column].isna().all()]
+        if empty:
+            results_df[empty] = results_df[empty].astype(float)
+        if compact:
+            results_df = compact_results(results_df)
+        return df.merge(results_df, left_index=True, right_index=True, how='left')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local sentiment scoring service")
+    parser.add_argument('--host', default=SCORING_SERVICE_HOST)
+    parser.add_argument('--port', type=int, default=SCORING_SERVICE_PORT)
+    parser.add_argument('--workers', type=int, default=SCORING_SERVICE_WORKERS)
+    args = parser.parse_args()
+
+    run_service(args.host, args.port, args.workers)
@@ -1,21 +1,47 @@
 """
 تحليل المشاعر باستخدام TextBlob و VADER
 """
+import threading
+import time
+import numpy as np
 import pandas as pd
 from textblob import TextBlob
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-from config.settings import POSITIVE_THRESHOLD, NEGATIVE_THRESHOLD
+from textblob.en import sentiment as pattern_sentiment
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer, SentiText, BOOSTER_DICT
+from config.settings import (
+    POSITIVE_THRESHOLD, NEGATIVE_THRESHOLD, LANGUAGE_ENGINES, UNDETERMINED_LANGUAGES,
+    METHOD_LANGUAGES, UNSUPPORTED_LANGUAGE_ENGINE,
+    ARABIC_POSITIVE_WORDS, ARABIC_NEGATIVE_WORDS, ARABIC_NEGATION_WORDS, CASCADE_MARGIN,
+    SENTIMENT_LABELS, TIMELINE_FREQUENCIES
+)
 from utils.logger import app_logger
-from src.text_cleaner import TextCleaner
+from utils.error_handler import AnalysisError
+from src.aggregator import to_utc_nanoseconds, label_codes, build_timeline_frame
+from src.text_cleaner import get_text_cleaner
+from src.engines import ENGINE_REGISTRY, CascadeEngine, MicroBatcher, register_engine
 
 
 class SentimentAnalyzer:
     """فئة لتحليل المشاعر"""
 
     def __init__(self):
-        """تهيئة المحلل"""
-        self.vader_analyzer = SentimentIntensityAnalyzer()
-        self.text_cleaner = TextCleaner()
+        """تهيئة المحلل (المحركات مشتركة ويتم تحميلها عند أول استخدام)"""
+        self.text_cleaner = get_text_cleaner()
+
+        # قاموس المشاعر العربي بعد توحيد الأحرف
+        normalize = self.text_cleaner._normalize_arabic
+        self.arabic_positive = {normalize(word) for word in ARABIC_POSITIVE_WORDS}
+        self.arabic_negative = {normalize(word) for word in ARABIC_NEGATIVE_WORDS}
+        self.arabic_negations = {normalize(word) for word in ARABIC_NEGATION_WORDS}
+
+        # محركات التحليل (تُنشأ عند أول استخدام)
+        self._engines = {}
+        self._engines_lock = threading.Lock()
+
+    @property
+    def vader_analyzer(self):
+        """محلل VADER المشترك على مستوى العملية"""
+        return get_vader_analyzer()
 
     def analyze_with_textblob(self, text):
         """
@@ -110,72 +136,500 @@ class SentimentAnalyzer:
                 'sentiment': 'محايد'
             }
 
-    def analyze_dataframe(self, df, text_column='cleaned_text', method='textblob'):
+    def _expand_emojis(self, text):
+        """
+        تحويل الإيموجي إلى وصفها النصي (نفس خطوة VADER)
+
+        Args:
+            text: النص
+
+        Returns:
+            str: النص بعد التحويل
+        """
+        emojis = self.vader_analyzer.emojis
+
+        # معظم النصوص المنظفة بدون إيموجي، فنتجنب إعادة بناء النص
+        if emojis.keys().isdisjoint(text):
+            return text.strip()
+
+        text_no_emoji = ""
+        prev_space = True
+        for char in text:
+            if char in emojis:
+                if not prev_space:
+                    text_no_emoji += ' '
+                text_no_emoji += emojis[char]
+                prev_space = False
+            else:
+                text_no_emoji += char
+                prev_space = char == ' '
+
+        return text_no_emoji.strip()
+
+    def _vader_from_tokens(self, sentitext):
+        """
+        حساب درجات VADER من نص مقسم مسبقاً
+
+        Args:
+            sentitext: كائن SentiText يحتوي على الكلمات
+
+        Returns:
+            dict: درجات VADER (neg, neu, pos, compound)
+        """
+        vader = self.vader_analyzer
+        words = sentitext.words_and_emoticons
+        sentiments = []
+
+        for i, item in enumerate(words):
+            valence = 0
+            item_lower = item.lower()
+            if item_lower in BOOSTER_DICT:
+                sentiments.append(valence)
+                continue
+            if i < len(words) - 1 and item_lower == "kind" and words[i + 1].lower() == "of":
+                sentiments.append(valence)
+                continue
+
+            sentiments = vader.sentiment_valence(valence, sentitext, item, i, sentiments)
+
+        sentiments = vader._but_check(words, sentiments)
+
+        return vader.score_valence(sentiments, sentitext.text)
+
+    def analyze_with_both(self, text):
+        """
+        تحليل المشاعر بـ TextBlob و VADER معاً بتقسيم واحد للنص
+
+        يتم تقسيم النص مرة واحدة (بطريقة VADER) وتمرير نفس الكلمات لقاموسي
+        TextBlob و VADER بدلاً من تحليلين مستقلين.
+
+        Args:
+            text: النص المراد تحليله
+
+        Returns:
+            dict: polarity و subjectivity من TextBlob و compound من VADER
+        """
+        if not text or text.strip() == "":
+            return {
+                'polarity': 0.0,
+                'subjectivity': 0.0,
+                'compound': 0.0
+            }
+
+        try:
+            sentitext = SentiText(self._expand_emojis(text))
+            words = [word.lower() for word in sentitext.words_and_emoticons]
+
+            polarity, subjectivity = pattern_sentiment(words)[:2]
+            compound = self._vader_from_tokens(sentitext)['compound']
+
+            return {
+                'polarity': round(polarity, 3),
+                'subjectivity': round(subjectivity, 3),
+                'compound': round(compound, 3)
+            }
+
+        except Exception as e:
+            app_logger.error(f"خطأ في التحليل المزدوج: {str(e)}")
+            return {
+                'polarity': 0.0,
+                'subjectivity': 0.0,
+                'compound': 0.0
+            }
+
+    def _score_both_batch(self, texts):
+        """
+        تحليل دفعة بكلا الطريقتين مع دمج النتائج على مصفوفات
+
+        Args:
+            texts: قائمة النصوص
+
+        Returns:
+            dict: أعمدة النتائج كمصفوفات NumPy
+        """
+        count = len(texts)
+        tb_polarity = np.zeros(count)
+        tb_subjectivity = np.zeros(count)
+        vader_compound = np.zeros(count)
+
+        for i, text in enumerate(texts):
+            analysis = self.analyze_with_both(text)
+            tb_polarity[i] = analysis['polarity']
+            tb_subjectivity[i] = analysis['subjectivity']
+            vader_compound[i] = analysis['compound']
+
+        # تحديد المشاعر النهائية بناءً على كلا التحليلين
+        avg_score = (tb_polarity + vader_compound) / 2
+        sentiment = np.select(
+            [avg_score > 0.05, avg_score < -0.05],
+            ['إيجابي', 'سلبي'],
+            default='محايد'
+        )
+
+        return {
+            'tb_polarity': tb_polarity,
+            'tb_subjectivity': tb_subjectivity,
+            'vader_compound': vader_compound,
+            'sentiment': sentiment
+        }
+
+    def _score_cascade_batch(self, texts, margin=CASCADE_MARGIN):
+        """
+        تحليل متدرج: VADER أولاً ثم TextBlob فقط للنصوص غير المحسومة
+
+        VADER هو الأرخص، والنصوص التي تقع درجتها ضمن margin من
+        POSITIVE_THRESHOLD أو NEGATIVE_THRESHOLD تُحال إلى TextBlob على نفس
+        الكلمات ويُحسب المتوسط كما في طريقة 'both'.
+
+        Args:
+            texts: قائمة النصوص
+            margin: هامش الثقة حول حدود التصنيف
+
+        Returns:
+            dict: أعمدة النتائج (tb_* تكون NaN للصفوف غير المحالة)
+        """
+        count = len(texts)
+        vader_compound = np.zeros(count)
+        tb_polarity = np.full(count, np.nan)
+        tb_subjectivity = np.full(count, np.nan)
+        sentitexts = [None] * count
+
+        # المرحلة الأولى: VADER لكل النصوص
+        for i, text in enumerate(texts):
+            if not text or text.strip() == "":
+                continue
+            try:
+                sentitexts[i] = SentiText(self._expand_emojis(text))
+                vader_compound[i] = round(self._vader_from_tokens(sentitexts[i])['compound'], 3)
+            except Exception as e:
+                app_logger.error(f"خطأ في تحليل VADER: {str(e)}")
+
+        escalate = (
+            (np.abs(vader_compound - POSITIVE_THRESHOLD) <= margin) |
+            (np.abs(vader_compound - NEGATIVE_THRESHOLD) <= margin)
+        )
+
+        # المرحلة الثانية: TextBlob على نفس الكلمات للصفوف غير المحسومة
+        for i in np.flatnonzero(escalate):
+            tb_polarity[i] = 0.0
+            tb_subjectivity[i] = 0.0
+            if sentitexts[i] is None:
+                continue
+            try:
+                words = [word.lower() for word in sentitexts[i].words_and_emoticons]
+                polarity, subjectivity = pattern_sentiment(words)[:2]
+                tb_polarity[i] = round(polarity, 3)
+                tb_subjectivity[i] = round(subjectivity, 3)
+            except Exception as e:
+                app_logger.error(f"خطأ في تحليل TextBlob: {str(e)}")
+
+        avg_score = (np.nan_to_num(tb_polarity) + vader_compound) / 2
+        sentiment = np.select(
+            [
+                escalate & (avg_score > 0.05),
+                escalate & (avg_score < -0.05),
+                ~escalate & (vader_compound > POSITIVE_THRESHOLD),
+                ~escalate & (vader_compound < NEGATIVE_THRESHOLD)
+            ],
+            ['إيجابي', 'سلبي', 'إيجابي', 'سلبي'],
+            default='محايد'
+        )
+
+        return {
+            'tb_polarity': tb_polarity,
+            'tb_subjectivity': tb_subjectivity,
+            'vader_compound': vader_compound,
+            'sentiment': sentiment
+        }
+
+    def _arabic_word_polarity(self, word):
+        """
+        البحث عن قطبية كلمة عربية في القاموس مع إزالة السوابق واللواحق الشائعة
+
+        Args:
+            word: الكلمة (بعد التوحيد)
+
+        Returns:
+            int: 1 إيجابي، -1 سلبي، 0 غير موجودة
+        """
+        candidates = [word]
+        for prefix in ('وال', 'بال', 'فال', 'كال', 'لل', 'ال', 'و', 'ب', 'ف'):
+            if word.startswith(prefix) and len(word) - len(prefix) >= 2:
+                candidates.append(word[len(prefix):])
+
+        for candidate in list(candidates):
+            for suffix in ('ات', 'ين', 'ه'):
+                if candidate.endswith(suffix) and len(candidate) - len(suffix) >= 2:
+                    candidates.append(candidate[:-len(suffix)])
+
+        for candidate in candidates:
+            if candidate in self.arabic_positive:
+                return 1
+            if candidate in self.arabic_negative:
+                return -1
+
+        return 0
+
+    def analyze_with_arabic_lexicon(self, text):
+        """
+        تحليل المشاعر العربية باستخدام قاموس كلمات بسيط
+
+        Args:
+            text: النص المراد تحليله
+
+        Returns:
+            dict: نتيجة التحليل (score بين -1 و 1)
+        """
+        if not text or text.strip() == "":
+            return {
+                'score': 0.0,
+                'subjectivity': 0.0,
+                'pos': 0.0,
+                'neu': 0.0,
+                'neg': 0.0,
+                'sentiment': 'محايد'
+            }
+
+        words = self.text_cleaner._normalize_arabic(text).split()
+
+        positive = 0
+        negative = 0
+        negate = False
+
+        for word in words:
+            if word in self.arabic_negations:
+                negate = True
+                continue
+
+            polarity = self._arabic_word_polarity(word)
+            if negate:
+                polarity = -polarity
+            negate = False
+
+            if polarity > 0:
+                positive += 1
+            elif polarity < 0:
+                negative += 1
+
+        matched = positive + negative
+        score = (positive - negative) / matched if matched else 0.0
+
+        if score > POSITIVE_THRESHOLD:
+            sentiment = 'إيجابي'
+        elif score < NEGATIVE_THRESHOLD:
+            sentiment = 'سلبي'
+        else:
+            sentiment = 'محايد'
+
+        total = len(words)
+        pos = positive / total if total else 0.0
+        neg = negative / total if total else 0.0
+
+        return {
+            'score': round(score, 3),
+            'subjectivity': round(matched / total, 3) if total else 0.0,
+            'pos': round(pos, 3),
+            'neu': round(1.0 - pos - neg, 3),
+            'neg': round(neg, 3),
+            'sentiment': sentiment
+        }
+
+    def _resolve_languages(self, df, texts, lang_column):
+        """
+        تحديد لغة كل صف من عمود اللغة أو بكشفها من النص
+
+        Args:
+            df: DataFrame
+            texts: Series النصوص
+            lang_column: عمود اللغة (مثل 'lang' من Twitter أو عمود لغة مكتشفة)
+
+        Returns:
+            Series: رمز اللغة لكل صف
+        """
+        if lang_column in df.columns:
+            langs = df[lang_column].fillna('').astype(str).str.lower()
+        else:
+            langs = pd.Series('', index=df.index)
+
+        # كشف اللغة فقط للصفوف غير المحددة
+        undetermined = langs.isin(UNDETERMINED_LANGUAGES)
+        if undetermined.any():
+            langs = langs.copy()
+            langs[undetermined] = texts[undetermined].apply(
+                self.text_cleaner.detect_language
+            )
+
+        return langs
+
+    def get_engine(self, name):
+        """
+        الحصول على محرك تحليل مسجل (يُنشأ مرة واحدة لكل محلل)
+
+        Args:
+            name: اسم المحرك في ENGINE_REGISTRY
+
+        Returns:
+            SentimentEngine: المحرك
+        """
+        engine = self._engines.get(name)
+
+        if engine is None:
+            if name not in ENGINE_REGISTRY:
+                raise AnalysisError(f"محرك تحليل غير معروف: {name}")
+            with self._engines_lock:
+                engine = self._engines.get(name)
+                if engine is None:
+                    engine = ENGINE_REGISTRY[name](self)
+                    self._engines[name] = engine
+
+        return engine
+
+    @staticmethod
+    def register_engine(engine_class, name=None):
+        """
+        تسجيل محرك تحليل جديد (مثل نموذج محلي محمّل من القرص)
+
+        Args:
+            engine_class: فئة مشتقة من SentimentEngine
+            name: اسم المحرك
+
+        Returns:
+            type: نفس الفئة
+        """
+        return register_engine(engine_class, name)
+
+    def analyze_dataframe(self, df, text_column='cleaned_text', method='textblob',
+                          lang_column='lang', route_by_language=True,
+                          cascade_margin=CASCADE_MARGIN, compact=False):
         """
         تحليل مشاعر DataFrame كامل
 
+        يتم توجيه كل صف إلى المحرك المسجل للغته في LANGUAGE_ENGINES
+        (مثل القاموس العربي)، وصفوف METHOD_LANGUAGES تُحلل بمحرك الطريقة المختارة،
+        وباقي اللغات تُعطى نتيجة محايدة بدون درجات (عددها في df.attrs['unsupported']).
+        كل مجموعة تُحلل على دفعات يحدد MicroBatcher حجمها.
+
         Args:
             df: DataFrame يحتوي على النصوص
             text_column: اسم عمود النصوص
-            method: طريقة التحليل ('textblob', 'vader', 'both')
+            method: اسم محرك مسجل ('textblob', 'vader', 'both', 'cascade'، ...)
+            lang_column: عمود اللغة المستخدم للتوجيه
+            route_by_language: توجيه الصفوف حسب اللغة
+            cascade_margin: هامش الثقة لطريقة 'cascade'
+            compact: أعمدة درجات float32 وعمود sentiment من نوع category
 
         Returns:
             DataFrame: مع أعمدة نتائج التحليل
+            (لطريقة 'cascade' يُحفظ تقرير الإحالة في df.attrs['cascade'])
         """
         if df.empty:
             app_logger.warning("DataFrame فارغ")
             return df
 
+        if method not in ENGINE_REGISTRY:
+            raise AnalysisError(f"محرك تحليل غير معروف: {method}")
+
         app_logger.info(f"جاري تحليل {len(df)} نص باستخدام {method}...")
 
-        results = []
-
-        for idx, row in df.iterrows():
-            text = row.get(text_column, "")
-
-            result = {'index': idx}
-
-            if method == 'textblob':
-                analysis = self.analyze_with_textblob(text)
-                result['polarity'] = analysis['polarity']
-                result['subjectivity'] = analysis['subjectivity']
-                result['sentiment'] = analysis['sentiment']
-
-            elif method == 'vader':
-                analysis = self.analyze_with_vader(text)
-                result['compound'] = analysis['compound']
-                result['pos_score'] = analysis['pos']
-                result['neu_score'] = analysis['neu']
-                result['neg_score'] = analysis['neg']
-                result['sentiment'] = analysis['sentiment']
-
-            elif method == 'both':
-                # استخدام كلا الطريقتين
-                tb_analysis = self.analyze_with_textblob(text)
-                vader_analysis = self.analyze_with_vader(text)
-
-                result['tb_polarity'] = tb_analysis['polarity']
-                result['tb_subjectivity'] = tb_analysis['subjectivity']
-                result['vader_compound'] = vader_analysis['compound']
-
-                # تحديد المشاعر النهائية بناءً على كلا التحليلين
-                avg_score = (tb_analysis['polarity'] + vader_analysis['compound']) / 2
-                if avg_score > 0.05:
-                    result['sentiment'] = 'إيجابي'
-                elif avg_score < -0.05:
-                    result['sentiment'] = 'سلبي'
-                else:
-                    result['sentiment'] = 'محايد'
+        if text_column in df.columns:
+            texts = df[text_column]
+        else:
+            texts = pd.Series("", index=df.index)
+
+        # تحديد المحرك لكل صف حسب اللغة
+        if route_by_language:
+            langs = self._resolve_languages(df, texts, lang_column)
+            engines = langs.map(lambda lang: LANGUAGE_ENGINES.get(
+                lang, method if lang in METHOD_LANGUAGES else UNSUPPORTED_LANGUAGE_ENGINE
+            ))
+            unsupported = langs[engines == UNSUPPORTED_LANGUAGE_ENGINE].value_counts()
+        else:
+            engines = pd.Series(method, index=df.index)
+            unsupported = pd.Series(dtype=np.int64)
+
+        results_frames = []
+        cascade_rows = 0
+        escalated_rows = 0
 
-            results.append(result)
+        for engine_name, index in engines.groupby(engines).groups.items():
+            app_logger.info(f"المحرك {engine_name}: {len(index)} نص")
+
+            engine = self.get_engine(engine_name)
+            if engine_name == 'cascade' and cascade_margin != engine.margin:
+                engine = CascadeEngine(self, cascade_margin)
+
+            batch_results = MicroBatcher(engine).score(texts.loc[index].tolist())
+            batch_results = engine.align_columns(batch_results, method)
+            results_frames.append(pd.DataFrame(batch_results, index=index))
+
+            if engine_name == 'cascade':
+                cascade_rows += len(index)
+                escalated_rows += int(np.count_nonzero(~np.isnan(batch_results['tb_polarity'])))
 
         # دمج النتائج مع DataFrame الأصلي
-        results_df = pd.DataFrame(results)
-        df = df.merge(results_df.drop('index', axis=1), left_index=True, right_index=True, how='left')
+        results_df = pd.concat(results_frames).reindex(df.index)
+        if compact:
+            results_df = compact_results(results_df)
+        df = df.merge(results_df, left_index=True, right_index=True, how='left')
+
+        if not unsupported.empty:
+            df.attrs['unsupported'] = {
+                'rows': int(unsupported.sum()),
+                'languages': {str(lang): int(count) for lang, count in unsupported.items()}
+            }
+            app_logger.warning(
+                f"{int(unsupported.sum())} نص بلغات غير مدعومة صُنفت كمحايدة: {df.attrs['unsupported']['languages']}"
+            )
+
+        if method == 'cascade':
+            escalated_pct = round(escalated_rows / cascade_rows * 100, 2) if cascade_rows else 0.0
+            df.attrs['cascade'] = {
+                'rows': cascade_rows,
+                'escalated': escalated_rows,
+                'escalated_pct': escalated_pct
+            }
+            app_logger.info(f"التحليل المتدرج: تمت إحالة {escalated_pct}% من النصوص إلى TextBlob")
 
         app_logger.info("اكتمل التحليل بنجاح")
         return df
 
+    def compare_cascade(self, df, text_column='cleaned_text', cascade_margin=CASCADE_MARGIN):
+        """
+        مقارنة طريقة 'cascade' مع 'both' الكاملة من حيث التطابق والزمن
+
+        Args:
+            df: DataFrame يحتوي على النصوص
+            text_column: عمود النصوص
+            cascade_margin: هامش الثقة
+
+        Returns:
+            dict: نسبة الإحالة ونسبة تطابق التصنيفات والأزمنة
+        """
+        if df.empty or text_column not in df.columns:
+            return {}
+
+        texts = df[text_column].tolist()
+
+        start_time = time.perf_counter()
+        both = self._score_both_batch(texts)
+        both_seconds = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        cascade = self._score_cascade_batch(texts, cascade_margin)
+        cascade_seconds = time.perf_counter() - start_time
+
+        escalated = int(np.count_nonzero(~np.isnan(cascade['tb_polarity'])))
+        agreement = np.mean(both['sentiment'] == cascade['sentiment']) * 100
+
+        return {
+            'rows': len(texts),
+            'escalated_pct': round(escalated / len(texts) * 100, 2),
+            'agreement_pct': round(float(agreement), 2),
+            'both_seconds': round(both_seconds, 4),
+            'cascade_seconds': round(cascade_seconds, 4),
+            'speedup': round(both_seconds / cascade_seconds, 2) if cascade_seconds else None
+        }
+
     def get_sentiment_statistics(self, df, sentiment_column='sentiment'):
         """
         حساب إحصائيات المشاعر
@@ -205,10 +659,10 @@ class SentimentAnalyzer:
 
         # حساب المتوسطات إذا كانت الأعمدة موجودة
         if 'polarity' in df.columns:
-            stats['avg_polarity'] = round(df['polarity'].mean(), 3)
+            stats['avg_polarity'] = round(float(df['polarity'].mean()), 3)
 
         if 'compound' in df.columns:
-            stats['avg_compound'] = round(df['compound'].mean(), 3)
+            stats['avg_compound'] = round(float(df['compound'].mean()), 3)
 
         return stats
 
@@ -249,34 +703,201 @@ class SentimentAnalyzer:
 
         return result
 
-    def analyze_sentiment_over_time(self, df, time_column='created_at', sentiment_column='sentiment'):
+    def analyze_sentiment_over_time(self, df, time_column='created_at', sentiment_column='sentiment',
+                                    freq='hour', weight_column=None):
         """
         تحليل تطور المشاعر عبر الزمن
 
+        لا يعدّل DataFrame الأصلي؛ تُحسب أرقام الفترات بالقسمة الصحيحة على
+        قيم datetime64 ويُبنى جدول العدّ بـ np.bincount على أرقام التسميات.
+        التواريخ ذات المنطقة الزمنية تُجمَّع حسب الوقت المحلي (مثل dt.floor) لا حسب UTC.
+
         Args:
             df: DataFrame مع التواريخ والمشاعر
             time_column: عمود التاريخ
             sentiment_column: عمود المشاعر
+            freq: دقة التجميع ('minute', 'hour', 'day')
+            weight_column: عمود أوزان اختياري، أو 'engagement' للوزن
+                           1 + likes + retweets (العمود الناقص منهما يُحسب صفراً)
 
         Returns:
-            DataFrame: التوزيع الزمني للمشاعر
+            DataFrame: التوزيع الزمني للمشاعر (نسب مئوية)
         """
         if df.empty or time_column not in df.columns or sentiment_column not in df.columns:
             return pd.DataFrame()
 
-        # التأكد من أن العمود من نوع datetime
-        if not pd.api.types.is_datetime64_any_dtype(df[time_column]):
-            df[time_column] = pd.to_datetime(df[time_column])
+        if freq not in TIMELINE_FREQUENCIES:
+            raise AnalysisError(f"دقة زمنية غير مدعومة: {freq}")
+
+        times = df[time_column]
+        if not pd.api.types.is_datetime64_any_dtype(times):
+            times = pd.to_datetime(times)
+
+        # الوقت المحلي بدون منطقة: فترات الساعة واليوم تبدأ عند حدود التوقيت المحلي
+        # (ساعات Asia/Kolkata تبدأ عند :30 بتوقيت UTC)
+        timezone = str(times.dt.tz) if times.dt.tz is not None else None
+        if timezone:
+            times = times.dt.tz_localize(None)
+
+        nanoseconds = to_utc_nanoseconds(times)
+        codes = label_codes(df[sentiment_column])
+        valid = (codes >= 0) & (nanoseconds != np.iinfo(np.int64).min)
+
+        if not valid.any():
+            return pd.DataFrame()
+
+        # الأوزان (عدد التغريدات افتراضياً)
+        weights = None
+        if weight_column == 'engagement':
+            weights = np.ones(len(df))
+            for column in ('likes', 'retweets'):
+                if column in df.columns:
+                    weights += df[column].fillna(0).to_numpy(dtype=np.float64)
+                else:
+                    app_logger.warning(f"عمود {column} غير موجود، يُحسب التفاعل بدونه")
+        elif weight_column is not None:
+            if weight_column not in df.columns:
+                raise AnalysisError(f"عمود الأوزان غير موجود: {weight_column}")
+            weights = df[weight_column].to_numpy(dtype=np.float64)
+
+        # رقم الفترة لكل تغريدة بالقسمة الصحيحة
+        step = TIMELINE_FREQUENCIES[freq] * 1_000_000_000
+        bucket_ids = nanoseconds[valid] // step
+        first_bucket = bucket_ids.min()
+        offsets = bucket_ids - first_bucket
+        span = int(offsets.max()) + 1
+        labels_count = len(SENTIMENT_LABELS)
+
+        counts = np.bincount(
+            offsets * labels_count + codes[valid],
+            weights=weights[valid] if weights is not None else None,
+            minlength=span * labels_count
+        ).reshape(span, labels_count)
+
+        # حذف الفترات الفارغة
+        non_empty = counts.sum(axis=1) > 0
+        starts = (np.flatnonzero(non_empty) + first_bucket) * step
+
+        timeline = build_timeline_frame(starts, counts[non_empty], None, freq, sentiment_column)
+        if timezone:
+            # بدايات الفترات بالوقت المحلي؛ الساعة المكررة عند نهاية التوقيت الصيفي
+            # تُنسب إلى التوقيت الصيفي والساعة غير الموجودة تُزاح إلى ما بعدها
+            timeline.index = timeline.index.tz_localize(
+                timezone, ambiguous=np.ones(len(timeline), dtype=bool), nonexistent='shift_forward'
+            ).rename(freq)
+
+        return timeline
+
+
+def compact_results(results_df):
+    """
+    تصغير أنواع أعمدة النتائج لتقليل الذاكرة وتسريع التصفية
+
+    Args:
+        results_df: DataFrame أعمدة نتائج التحليل فقط
+
+    Returns:
+        DataFrame: الدرجات float32 و sentiment من نوع category بفئات ثابتة
+    """
+    columns = {}
+
+    for column in results_df.columns:
+        if column == 'sentiment':
+            columns[column] = pd.Categorical(results_df[column], categories=SENTIMENT_LABELS)
+        elif pd.api.types.is_float_dtype(results_df[column]):
+            columns[column] = results_df[column].astype(np.float32)
+        else:
+            columns[column] = results_df[column]
+
+    return pd.DataFrame(columns, index=results_df.index)
+
+
+# محركات مشتركة على مستوى العملية (بين جميع جلسات Streamlit)
+_engines_lock = threading.Lock()
+_vader_analyzer = None
+_shared_analyzer = None
+_warm_up_thread = None
+
+
+def get_vader_analyzer():
+    """
+    الحصول على محلل VADER المشترك (تحميل القاموس مرة واحدة فقط)
+
+    Returns:
+        SentimentIntensityAnalyzer: المحلل المشترك
+    """
+    global _vader_analyzer
+
+    if _vader_analyzer is None:
+        with _engines_lock:
+            if _vader_analyzer is None:
+                app_logger.info("جاري تحميل قاموس VADER...")
+                _vader_analyzer = SentimentIntensityAnalyzer()
+
+    return _vader_analyzer
+
+
+def get_sentiment_analyzer():
+    """
+    الحصول على محلل المشاعر المشترك
+
+    Returns:
+        SentimentAnalyzer: المحلل المشترك
+    """
+    global _shared_analyzer
+
+    if _shared_analyzer is None:
+        with _engines_lock:
+            if _shared_analyzer is None:
+                _shared_analyzer = SentimentAnalyzer()
+
+    return _shared_analyzer
+
 
-        # تجميع حسب الساعة والمشاعر
-        df['hour'] = df[time_column].dt.floor('H')
+def _warm_up():
+    """تحميل القواميس مسبقاً وتشغيل تحليل تجريبي"""
+    start_time = time.perf_counter()
+
+    try:
+        analyzer = get_sentiment_analyzer()
+        get_vader_analyzer()
+
+        # قاموس TextBlob يُحمل عند أول تحليل
+        pattern_sentiment("good")
+        for name in ENGINE_REGISTRY:
+            analyzer.get_engine(name).warm_up()
+
+        elapsed = time.perf_counter() - start_time
+        app_logger.info(f"تم تجهيز محركات التحليل خلال {elapsed:.2f} ثانية")
+
+    except Exception as e:
+        app_logger.error(f"فشل تجهيز محركات التحليل: {str(e)}")
+
+
+def warm_up_engines(background=False):
+    """
+    تجهيز محركات التحليل مسبقاً لتقليل زمن أول نتيجة
+
+    Args:
+        background: التجهيز في thread خلفي (مرة واحدة لكل عملية)
+
+    Returns:
+        Thread أو None: thread التجهيز إذا كان خلفياً
+    """
+    global _warm_up_thread
 
-        time_sentiment = df.groupby(['hour', sentiment_column]).size().unstack(fill_value=0)
+    if not background:
+        _warm_up()
+        return None
 
-        # حساب النسب
-        time_sentiment_pct = time_sentiment.div(time_sentiment.sum(axis=1), axis=0) * 100
+    with _engines_lock:
+        if _warm_up_thread is None:
+            _warm_up_thread = threading.Thread(
+                target=_warm_up, name='engines-warm-up', daemon=True
+            )
+            _warm_up_thread.start()
 
-        return time_sentiment_pct
+    return _warm_up_thread
 
 
 # دوال مساعدة للاستخدام السريع
@@ -291,7 +912,7 @@ def quick_analyze(text, method='textblob'):
     Returns:
         dict: نتيجة التحليل
     """
-    analyzer = SentimentAnalyzer()
+    analyzer = get_sentiment_analyzer()
 
     if method == 'textblob':
         return analyzer.analyze_with_textblob(text)
@@ -313,5 +934,5 @@ def quick_analyze_dataframe(df, text_column='cleaned_text', method='textblob'):
     Returns:
         DataFrame: مع نتائج التحليل
     """
-    analyzer = SentimentAnalyzer()
+    analyzer = get_sentiment_analyzer()
     return analyzer.analyze_dataframe(df, text_column, method)
@@ -2,6 +2,7 @@
 تنظيف ومعالجة النصوص
 """
 import re
+import threading
 import pandas as pd
 from config.settings import (
     REMOVE_URLS, REMOVE_MENTIONS, REMOVE_HASHTAGS,
@@ -247,6 +248,28 @@ class TextCleaner:
         return result_df
 
 
+# منظف مشترك على مستوى العملية
+_cleaner_lock = threading.Lock()
+_shared_cleaner = None
+
+
+def get_text_cleaner():
+    """
+    الحصول على منظف النصوص المشترك
+
+    Returns:
+        TextCleaner: المنظف المشترك
+    """
+    global _shared_cleaner
+
+    if _shared_cleaner is None:
+        with _cleaner_lock:
+            if _shared_cleaner is None:
+                _shared_cleaner = TextCleaner()
+
+    return _shared_cleaner
+
+
 # دوال مساعدة للاستخدام السريع
 def quick_clean(text):
     """
@@ -258,7 +281,7 @@ def quick_clean(text):
     Returns:
         str: النص المنظف
     """
-    cleaner = TextCleaner()
+    cleaner = get_text_cleaner()
     return cleaner.clean_text(text)
 
 
@@ -273,5 +296,5 @@ def quick_clean_dataframe(df, text_column='text'):
     Returns:
         DataFrame: مع النصوص المنظفة
     """
-    cleaner = TextCleaner()
+    cleaner = get_text_cleaner()
     return cleaner.clean_dataframe(df, text_column)
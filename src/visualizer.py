@@ -1,21 +1,221 @@
 """
 التصورات البيانية باستخدام Plotly
 """
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache, wraps
+import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
 import pandas as pd
-from config.settings import CHART_COLORS
+from config.settings import (
+    CHART_COLORS, ARABIC_TEXT_CACHE_SIZE, FIGURE_CACHE_SIZE,
+    ENGAGEMENT_WEBGL_THRESHOLD, ENGAGEMENT_DENSITY_THRESHOLD, ENGAGEMENT_DENSITY_BINS,
+    TIMELINE_MAX_POINTS, TIMELINE_MARKERS_MAX_POINTS
+)
 from utils.logger import app_logger
 import arabic_reshaper
 from bidi.algorithm import get_display
 
 
+# أحرف تحتاج إلى إعادة تشكيل أو ترتيب ثنائي الاتجاه
+_RTL_CHARS = re.compile(r'[\u0590-\u08FF\uFB1D-\uFDFF\uFE70-\uFEFF]')
+
+
+@lru_cache(maxsize=ARABIC_TEXT_CACHE_SIZE)
+def _reshape_rtl_text(text):
+    """
+    إعادة تشكيل النص العربي وترتيبه للعرض (مع ذاكرة مؤقتة مشتركة)
+
+    Args:
+        text: النص
+
+    Returns:
+        str: النص المعدل
+    """
+    # النصوص بدون أحرف عربية لا تتغير
+    if not _RTL_CHARS.search(text):
+        return text
+
+    try:
+        return get_display(arabic_reshaper.reshape(text))
+    except Exception:
+        return text
+
+
+def lttb_indices(x, y, threshold):
+    """
+    اختيار نقاط تمثيلية بخوارزمية Largest-Triangle-Three-Buckets
+
+    Args:
+        x: مصفوفة المحور الأفقي (أرقام متزايدة)
+        y: مصفوفة القيم
+        threshold: عدد النقاط المطلوب (3 على الأقل)
+
+    Returns:
+        ndarray: مواقع النقاط المختارة (مرتبة، تشمل الأولى والأخيرة)
+    """
+    count = len(y)
+    if threshold >= count or threshold < 3:
+        return np.arange(count)
+
+    # حدود المجموعات الداخلية (الأولى والأخيرة نقطتان ثابتتان)
+    edges = np.linspace(1, count - 1, threshold - 1).astype(np.int64)
+
+    # متوسط كل مجموعة مسبقاً (للمجموعة التالية في حساب المثلث)
+    sums_x = np.add.reduceat(x[1:count - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:count - 1], edges[:-1] - 1)
+    sizes = np.diff(edges)
+    avg_x = np.append(sums_x / sizes, x[-1])
+    avg_y = np.append(sums_y / sizes, y[-1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = count - 1
+    previous = 0
+
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_x, next_y = avg_x[bucket + 1], avg_y[bucket + 1]
+
+        # مساحة المثلث (النقطة السابقة، كل نقطة في المجموعة، متوسط المجموعة التالية)
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+
+    return selected
+
+
+# ذاكرة مؤقتة مشتركة للرسوم: المفتاح -> مواصفات الرسم (dict من Figure.to_dict) و JSON الرسم
+_figure_cache = OrderedDict()
+_figure_cache_lock = threading.Lock()
+
+
+def _fingerprint(data, columns=None):
+    """
+    بصمة سريعة لبيانات الرسم
+
+    Args:
+        data: DataFrame أو Series أو dict
+        columns: أعمدة DataFrame التي يعتمد عليها الرسم (الكل افتراضياً)
+
+    Returns:
+        str: البصمة
+    """
+    digest = hashlib.blake2b(digest_size=16)
+
+    if isinstance(data, pd.DataFrame):
+        if columns is not None:
+            data = data[[col for col in columns if col in data.columns]]
+        digest.update(repr((list(data.columns), [str(dtype) for dtype in data.dtypes])).encode('utf-8'))
+        digest.update(pd.util.hash_pandas_object(data, index=True).values.tobytes())
+    elif isinstance(data, pd.Series):
+        digest.update(repr((data.name, str(data.dtype))).encode('utf-8'))
+        digest.update(pd.util.hash_pandas_object(data, index=True).values.tobytes())
+    elif isinstance(data, dict):
+        # قيم مثل DataFrame لكل استعلام: repr مختصر ولا يصلح كبصمة
+        for key, value in data.items():
+            digest.update(repr(key).encode('utf-8'))
+            digest.update(_fingerprint(value, columns).encode('utf-8'))
+    else:
+        digest.update(repr(data).encode('utf-8'))
+
+    return digest.hexdigest()
+
+
+def _cached_figure(columns=None):
+    """
+    تخزين الرسوم المبنية مؤقتاً حسب بصمة البيانات والمعاملات (العنوان يحدد اللغة)
+
+    الدالة المزخرفة تقبل as_json=True لإرجاع JSON الرسم المخزن مباشرة بدون بناء
+    Figure أو تحويله مرة أخرى (يُحسب عند أول طلب ويُحفظ مع المواصفات).
+
+    Args:
+        columns: أعمدة DataFrame المستخدمة في البصمة
+
+    Returns:
+        function: decorator
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, data, *args, as_json=False, **kwargs):
+            if not self.use_cache:
+                fig = method(self, data, *args, **kwargs)
+                return fig.to_json() if as_json else fig
+
+            key = (
+                method.__name__,
+                _fingerprint(data, columns),
+                args,
+                tuple(sorted(kwargs.items()))
+            )
+
+            with _figure_cache_lock:
+                entry = _figure_cache.get(key)
+                if entry is not None:
+                    _figure_cache.move_to_end(key)
+
+            if entry is None:
+                fig = method(self, data, *args, **kwargs)
+                entry = {'spec': fig.to_dict(), 'json': None}
+                with _figure_cache_lock:
+                    _figure_cache[key] = entry
+                    while len(_figure_cache) > FIGURE_CACHE_SIZE:
+                        _figure_cache.popitem(last=False)
+                if not as_json:
+                    return fig
+
+            if as_json:
+                if entry['json'] is None:
+                    entry['json'] = go.Figure(entry['spec'], _validate=False).to_json()
+                return entry['json']
+
+            # كل مستدعٍ يحصل على رسم مستقل: تعديله (update_layout, add_trace) لا يغير النسخة
+            # المخزنة المشتركة بين الجلسات. المواصفات مأخوذة من رسم سليم فلا حاجة للتحقق منها
+            return go.Figure(entry['spec'], _validate=False)
+        return wrapper
+    return decorator
+
+
+def clear_figure_cache():
+    """مسح الذاكرة المؤقتة للرسوم"""
+    with _figure_cache_lock:
+        _figure_cache.clear()
+
+
 class SentimentVisualizer:
     """فئة لإنشاء الرسوم البيانية"""
 
-    def __init__(self):
-        """تهيئة الرسام"""
+    def __init__(self, use_cache=True):
+        """
+        تهيئة الرسام
+
+        Args:
+            use_cache: إعادة استخدام الرسوم المبنية لنفس البيانات
+        """
         self.colors = CHART_COLORS
+        self.use_cache = use_cache
+
+    def figure_json(self, plot, data, *args, **kwargs):
+        """
+        JSON رسم من الذاكرة المؤقتة مباشرة (بدون بناء Figure أو تحويله في كل مرة)
+
+        للمستدعين الذين لا يعدلون الرسم؛ من يعدله يستخدم دالة الرسم نفسها.
+
+        Args:
+            plot: اسم دالة الرسم (مثل 'plot_sentiment_pie')
+            data: بيانات الرسم
+            *args, **kwargs: بقية معاملات دالة الرسم
+
+        Returns:
+            str: JSON الرسم
+        """
+        return getattr(self, plot)(data, *args, as_json=True, **kwargs)
 
     def _fix_arabic_text(self, text):
         """
@@ -30,13 +230,30 @@ class SentimentVisualizer:
         if not isinstance(text, str):
             return str(text)
 
-        try:
-            reshaped = arabic_reshaper.reshape(text)
-            bidi_text = get_display(reshaped)
-            return bidi_text
-        except:
-            return text
+        return _reshape_rtl_text(text)
+
+    def _fix_arabic_texts(self, texts):
+        """
+        إصلاح عرض قائمة نصوص (كل نص مختلف يُعالج مرة واحدة)
+
+        Args:
+            texts: قائمة النصوص
+
+        Returns:
+            list: النصوص المعدلة بنفس الترتيب
+        """
+        fixed = {}
+        result = []
+
+        for text in texts:
+            key = text if isinstance(text, str) else str(text)
+            if key not in fixed:
+                fixed[key] = self._fix_arabic_text(key)
+            result.append(fixed[key])
+
+        return result
 
+    @_cached_figure()
     def plot_sentiment_pie(self, sentiment_counts, title="توزيع المشاعر"):
         """
         رسم دائري لتوزيع المشاعر
@@ -59,7 +276,7 @@ class SentimentVisualizer:
             return go.Figure()
 
         # إصلاح النصوص العربية
-        labels_display = [self._fix_arabic_text(label) for label in labels]
+        labels_display = self._fix_arabic_texts(labels)
         title_display = self._fix_arabic_text(title)
 
         # تحديد الألوان
@@ -101,6 +318,7 @@ class SentimentVisualizer:
 
         return fig
 
+    @_cached_figure()
     def plot_word_frequency_bar(self, word_freq_df, title="الكلمات الأكثر تكراراً", top_n=15):
         """
         رسم عمودي للكلمات الأكثر تكراراً
@@ -120,7 +338,7 @@ class SentimentVisualizer:
         df = word_freq_df.head(top_n).copy()
 
         # إصلاح النصوص العربية
-        df['word_display'] = df['word'].apply(self._fix_arabic_text)
+        df['word_display'] = self._fix_arabic_texts(df['word'].tolist())
         title_display = self._fix_arabic_text(title)
 
         # ترتيب تصاعدي للعرض (الأكثر في الأعلى)
@@ -164,13 +382,18 @@ class SentimentVisualizer:
 
         return fig
 
-    def plot_sentiment_timeline(self, time_sentiment_df, title="تطور المشاعر عبر الزمن"):
+    @_cached_figure()
+    def plot_sentiment_timeline(self, time_sentiment_df, title="تطور المشاعر عبر الزمن",
+                                max_points=TIMELINE_MAX_POINTS):
         """
         رسم خطي لتطور المشاعر عبر الوقت
 
+        السلاسل الأطول من max_points تُختصر بخوارزمية LTTB مع الحفاظ على القمم.
+
         Args:
             time_sentiment_df: DataFrame مع فهرس زمني وأعمدة المشاعر
             title: عنوان الرسم
+            max_points: أقصى عدد نقاط لكل سلسلة (None بدون اختصار)
 
         Returns:
             plotly.graph_objects.Figure
@@ -193,10 +416,12 @@ class SentimentVisualizer:
             color = sentiment_colors.get(col, '#999999')
             col_display = self._fix_arabic_text(col)
 
+            x_plot, y_plot, mode = self._downsample_series(time_sentiment_df.index, time_sentiment_df[col], max_points)
+
             fig.add_trace(go.Scatter(
-                x=time_sentiment_df.index,
-                y=time_sentiment_df[col],
-                mode='lines+markers',
+                x=x_plot,
+                y=y_plot,
+                mode=mode,
                 name=col_display,
                 line=dict(color=color, width=3),
                 marker=dict(size=6),
@@ -235,6 +460,166 @@ class SentimentVisualizer:
 
         return fig
 
+    def _downsample_series(self, x_values, y_values, max_points):
+        """
+        اختصار سلسلة زمنية بخوارزمية LTTB واختيار نمط الرسم
+
+        Args:
+            x_values: الفهرس الزمني
+            y_values: القيم
+            max_points: أقصى عدد نقاط (None بدون اختصار)
+
+        Returns:
+            tuple: (x, y, mode)
+        """
+        y_plot = np.asarray(y_values, dtype=np.float64)
+        x_plot = x_values
+
+        if max_points and len(y_plot) > max_points:
+            if isinstance(x_values, pd.DatetimeIndex):
+                x_numeric = x_values.asi8.astype(np.float64)
+            else:
+                x_numeric = np.arange(len(x_values), dtype=np.float64)
+
+            selected = lttb_indices(x_numeric, y_plot, max_points)
+            x_plot = x_values[selected]
+            y_plot = y_plot[selected]
+
+        # العلامات تثقل السلاسل الطويلة دون فائدة مرئية
+        mode = 'lines+markers' if len(y_plot) <= TIMELINE_MARKERS_MAX_POINTS else 'lines'
+        return x_plot, y_plot, mode
+
+    @_cached_figure()
+    def plot_comparison_timeline(self, timelines, title="مقارنة صافي المشاعر عبر الزمن",
+                                 max_points=TIMELINE_MAX_POINTS):
+        """
+        رسم خطي متراكب لصافي المشاعر (الإيجابي - السلبي) لعدة استعلامات
+
+        Args:
+            timelines: dict الاستعلام -> DataFrame التطور الزمني (من analyze_sentiment_over_time)
+            title: عنوان الرسم
+            max_points: أقصى عدد نقاط لكل سلسلة
+
+        Returns:
+            plotly.graph_objects.Figure
+        """
+        fig = go.Figure()
+        palette = px.colors.qualitative.Plotly
+
+        for position, (query, timeline) in enumerate(timelines.items()):
+            if timeline is None or timeline.empty:
+                continue
+
+            positive = timeline['إيجابي'] if 'إيجابي' in timeline.columns else 0.0
+            negative = timeline['سلبي'] if 'سلبي' in timeline.columns else 0.0
+            net = pd.Series(positive - negative, index=timeline.index)
+
+            x_plot, y_plot, mode = self._downsample_series(timeline.index, net, max_points)
+
+            fig.add_trace(go.Scatter(
+                x=x_plot,
+                y=y_plot,
+                mode=mode,
+                name=self._fix_arabic_text(str(query)),
+                line=dict(color=palette[position % len(palette)], width=3),
+                marker=dict(size=6),
+                hovertemplate='<b>%{fullData.name}</b><br>الوقت: %{x}<br>الصافي: %{y:.1f}%<extra></extra>'
+            ))
+
+        fig.add_hline(y=0, line=dict(color='lightgray', width=1, dash='dash'))
+
+        fig.update_layout(
+            title=dict(
+                text=self._fix_arabic_text(title),
+                font=dict(size=20, family='Arial'),
+                x=0.5,
+                xanchor='center'
+            ),
+            xaxis=dict(
+                title=self._fix_arabic_text('الوقت'),
+                showgrid=True,
+                gridcolor='lightgray'
+            ),
+            yaxis=dict(
+                title=self._fix_arabic_text('الإيجابي - السلبي (%)'),
+                showgrid=True,
+                gridcolor='lightgray',
+                range=[-100, 100]
+            ),
+            legend=dict(
+                orientation="h",
+                yanchor="bottom",
+                y=-0.3,
+                xanchor="center",
+                x=0.5
+            ),
+            height=500,
+            plot_bgcolor='white',
+            hovermode='x unified'
+        )
+
+        return fig
+
+    @_cached_figure()
+    def plot_comparison_distribution(self, stats_by_query, title="مقارنة توزيع المشاعر"):
+        """
+        أعمدة متجاورة لنسب المشاعر في كل استعلام
+
+        Args:
+            stats_by_query: dict الاستعلام -> الإحصائيات (من get_sentiment_statistics)
+            title: عنوان الرسم
+
+        Returns:
+            plotly.graph_objects.Figure
+        """
+        queries = [str(query) for query in stats_by_query]
+        queries_display = self._fix_arabic_texts(queries)
+
+        fig = go.Figure()
+
+        for label, key in (('إيجابي', 'positive'), ('سلبي', 'negative'), ('محايد', 'neutral')):
+            percentages = [float(stats.get(f'{key}_pct', 0)) for stats in stats_by_query.values()]
+            counts = [int(stats.get(key, 0)) for stats in stats_by_query.values()]
+
+            fig.add_trace(go.Bar(
+                x=queries_display,
+                y=percentages,
+                name=self._fix_arabic_text(label),
+                marker=dict(color=self.colors[key]),
+                customdata=counts,
+                text=[f'{pct:.1f}%' for pct in percentages],
+                textposition='outside',
+                hovertemplate='<b>%{x}</b><br>%{fullData.name}: %{y:.1f}%<br>العدد: %{customdata}<extra></extra>'
+            ))
+
+        fig.update_layout(
+            title=dict(
+                text=self._fix_arabic_text(title),
+                font=dict(size=20, family='Arial'),
+                x=0.5,
+                xanchor='center'
+            ),
+            barmode='group',
+            yaxis=dict(
+                title=self._fix_arabic_text('النسبة (%)'),
+                showgrid=True,
+                gridcolor='lightgray',
+                range=[0, 110]
+            ),
+            legend=dict(
+                orientation="h",
+                yanchor="bottom",
+                y=-0.3,
+                xanchor="center",
+                x=0.5
+            ),
+            height=500,
+            plot_bgcolor='white'
+        )
+
+        return fig
+
+    @_cached_figure(columns=('likes', 'retweets', 'sentiment'))
     def plot_engagement_sentiment(self, df, title="التفاعل مقابل المشاعر"):
         """
         رسم نقطي يربط بين التفاعل والمشاعر
@@ -256,16 +641,19 @@ class SentimentVisualizer:
 
         title_display = self._fix_arabic_text(title)
 
-        # حساب التفاعل الكلي
-        df_plot = df.copy()
-        df_plot['total_engagement'] = df_plot['likes'] + df_plot['retweets']
+        # حساب التفاعل الكلي بدون نسخ DataFrame
+        likes = df['likes'].to_numpy(dtype=np.float64)
+        retweets = df['retweets'].to_numpy(dtype=np.float64)
 
         # تصفية القيم الصفرية أو السالبة للـ log scale
-        df_plot = df_plot[df_plot['total_engagement'] > 0]
-
-        if df_plot.empty:
+        mask = (likes + retweets) > 0
+        if not mask.any():
             return go.Figure()
 
+        likes = likes[mask]
+        retweets = retweets[mask]
+        codes, sentiments = pd.factorize(df['sentiment'].to_numpy()[mask])
+
         # تعيين الألوان
         sentiment_colors = {
             'إيجابي': self.colors['positive'],
@@ -274,24 +662,31 @@ class SentimentVisualizer:
         }
 
         fig = go.Figure()
+        point_count = len(likes)
 
-        for sentiment in df_plot['sentiment'].unique():
-            df_sentiment = df_plot[df_plot['sentiment'] == sentiment]
-            sentiment_display = self._fix_arabic_text(sentiment)
-
-            fig.add_trace(go.Scatter(
-                x=df_sentiment['likes'],
-                y=df_sentiment['retweets'],
-                mode='markers',
-                name=sentiment_display,
-                marker=dict(
-                    size=8,
-                    color=sentiment_colors.get(sentiment, '#999999'),
-                    opacity=0.6,
-                    line=dict(width=1, color='white')
-                ),
-                hovertemplate='<b>%{fullData.name}</b><br>الإعجابات: %{x}<br>إعادة التغريد: %{y}<extra></extra>'
-            ))
+        if point_count > ENGAGEMENT_DENSITY_THRESHOLD:
+            # تجميع مسبق في خلايا لوغاريتمية لكل فئة (عدد نقاط محدود)
+            self._add_engagement_density(fig, likes, retweets, codes, sentiments, sentiment_colors)
+        else:
+            # WebGL للأعداد الكبيرة، و SVG للأعداد الصغيرة
+            scatter = go.Scattergl if point_count > ENGAGEMENT_WEBGL_THRESHOLD else go.Scatter
+
+            for code, sentiment in enumerate(sentiments):
+                selected = codes == code
+
+                fig.add_trace(scatter(
+                    x=likes[selected],
+                    y=retweets[selected],
+                    mode='markers',
+                    name=self._fix_arabic_text(sentiment),
+                    marker=dict(
+                        size=8,
+                        color=sentiment_colors.get(sentiment, '#999999'),
+                        opacity=0.6,
+                        line=dict(width=1, color='white')
+                    ),
+                    hovertemplate='<b>%{fullData.name}</b><br>الإعجابات: %{x}<br>إعادة التغريد: %{y}<extra></extra>'
+                ))
 
         fig.update_layout(
             title=dict(
@@ -326,6 +721,60 @@ class SentimentVisualizer:
 
         return fig
 
+    def _add_engagement_density(self, fig, likes, retweets, codes, sentiments, sentiment_colors):
+        """
+        إضافة خلايا كثافة لوغاريتمية لكل فئة مشاعر (حجم النقطة حسب العدد)
+
+        Args:
+            fig: الرسم
+            likes: مصفوفة الإعجابات
+            retweets: مصفوفة إعادات التغريد
+            codes: رقم فئة المشاعر لكل تغريدة
+            sentiments: أسماء الفئات
+            sentiment_colors: ألوان الفئات
+        """
+        # النقاط الصفرية لا تظهر على المحاور اللوغاريتمية
+        positive = (likes > 0) & (retweets > 0)
+        likes = likes[positive]
+        retweets = retweets[positive]
+        codes = codes[positive]
+
+        if likes.size == 0:
+            return
+
+        # حدود خلايا مشتركة لكل الفئات
+        x_edges = np.logspace(0, np.log10(likes.max()) + 1e-6, ENGAGEMENT_DENSITY_BINS + 1)
+        y_edges = np.logspace(0, np.log10(retweets.max()) + 1e-6, ENGAGEMENT_DENSITY_BINS + 1)
+        x_centers = np.sqrt(x_edges[:-1] * x_edges[1:])
+        y_centers = np.sqrt(y_edges[:-1] * y_edges[1:])
+
+        histograms = [
+            np.histogram2d(likes[codes == code], retweets[codes == code], bins=[x_edges, y_edges])[0]
+            for code in range(len(sentiments))
+        ]
+        max_count = max(histogram.max() for histogram in histograms)
+
+        for sentiment, histogram in zip(sentiments, histograms):
+            x_index, y_index = np.nonzero(histogram)
+            counts = histogram[x_index, y_index]
+            if counts.size == 0:
+                continue
+
+            fig.add_trace(go.Scatter(
+                x=x_centers[x_index],
+                y=y_centers[y_index],
+                mode='markers',
+                name=self._fix_arabic_text(sentiment),
+                customdata=counts,
+                marker=dict(
+                    size=4 + 20 * np.log1p(counts) / np.log1p(max_count),
+                    color=sentiment_colors.get(sentiment, '#999999'),
+                    opacity=0.6,
+                    line=dict(width=1, color='white')
+                ),
+                hovertemplate='<b>%{fullData.name}</b><br>الإعجابات: ~%{x:.0f}<br>إعادة التغريد: ~%{y:.0f}<br>العدد: %{customdata}<extra></extra>'
+            ))
+
     def create_stats_cards(self, stats):
         """
         إنشاء بطاقات إحصائية (للاستخدام مع Streamlit metrics)